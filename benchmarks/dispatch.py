@@ -0,0 +1,90 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: micro benchmark of the processor dispatch
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+# python benchmarks/dispatch.py [--json] [--check]
+#
+# time one dispatch with SPECIFIC_SITES plus N synthetic sites, for the dispatch index
+# and for the linear scan over SPECIFIC_SITES used before it. --check fails if the
+# index cost with the most sites is more than 2x the cost with the builtin sites
+
+import os
+import re
+import sys
+import json
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from miuc.web_parser import SPECIFIC_SITES, DispatchIndex
+
+URLS = [
+    "https://github.com/luzhixing12345/miuc",
+    "https://luzhixing12345.github.io/zood/",
+    "https://www.zhihu.com/question/446988424",
+    "https://docs.kernel.org/mm/hmm.html",
+    # not a specific site, the linear scan tries every pattern
+    "https://docs.python.org/zh-cn/3/library/urllib.parse.html",
+]
+
+EXTRA_SITES = [0, 100, 1000, 10000]
+
+
+def linear_match(sites: dict, url: str):
+    for specific_page_url in sites:
+        if re.match(specific_page_url, url):
+            return sites[specific_page_url]
+    return None
+
+
+def build_sites(extra: int) -> dict:
+    sites = dict(SPECIFIC_SITES)
+    for i in range(extra):
+        sites[rf"^https://site{i}\.example\.com/.*"] = object
+    return sites
+
+
+def per_url(func, number: int) -> float:
+    """
+    seconds of one dispatch, the best of 5 rounds
+    """
+    func()
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number / len(URLS)
+
+
+def main():
+    parser = argparse.ArgumentParser("dispatch benchmark")
+    parser.add_argument("--json", action="store_true", help="print machine readable results")
+    parser.add_argument("--check", action="store_true", help="fail if the index cost grows with the sites")
+    args = parser.parse_args()
+
+    results = []
+    for extra in EXTRA_SITES:
+        sites = build_sites(extra)
+        index = DispatchIndex(sites)
+        index_time = per_url(lambda: [index.match(url) for url in URLS], number=2000)
+        linear_time = per_url(lambda: [linear_match(sites, url) for url in URLS], number=max(1, 2000 // (extra + 35)))
+        results.append({"sites": len(sites), "index_us": index_time * 1e6, "linear_us": linear_time * 1e6})
+
+    if args.json:
+        print(json.dumps({"benchmark": "dispatch", "results": results}))
+    else:
+        print(f"{'sites':>8} {'index (us)':>12} {'linear (us)':>12}")
+        for result in results:
+            print(f"{result['sites']:>8} {result['index_us']:>12.2f} {result['linear_us']:>12.2f}")
+
+    ratio = results[-1]["index_us"] / results[0]["index_us"]
+    if args.check and ratio > 2:
+        print(f"dispatch cost grows with the number of sites: x{ratio:.2f}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
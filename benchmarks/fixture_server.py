@@ -0,0 +1,194 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: local stand-in server replaying the recorded responses of fixtures.json
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import http.server
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from miuc.breaker import host_breakers
+from miuc.session import create_session
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures.json")
+
+FILLER_LINE = '<div class="filler"><a href="/related">related article</a><span>lorem ipsum dolor sit amet</span></div>\n'
+
+
+def load_fixtures(path: str = FIXTURES_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fixture_key(url: str) -> str:
+    """
+    https://github.com/a/b?c -> /github.com/a/b?c, the path FixtureAdapter requests
+    """
+    return "/" + url.split("://", 1)[1].split("#", 1)[0]
+
+
+def filler(size: int) -> str:
+    return (FILLER_LINE * (size // len(FILLER_LINE) + 1))[:size]
+
+
+def build_page(fixture: dict) -> bytes:
+    """
+    the recorded element padded to the size of the real page
+    """
+    if not fixture["content_type"].startswith("text/html"):
+        return fixture["body"].encode("utf-8")
+    page = (
+        "<!DOCTYPE html>\n<html>\n<head>\n"
+        + filler(fixture["before"])
+        + "\n</head>\n<body>\n"
+        + fixture["body"]
+        + "\n"
+        + filler(fixture["after"])
+        + "</body>\n</html>\n"
+    )
+    return page.encode("utf-8")
+
+
+def fixture_pages(fixtures: list) -> dict:
+    """
+    the pages of FixtureServer serving the recorded responses of the fixtures
+    """
+    pages = {}
+    for fixture in fixtures:
+        url = fixture.get("fetch_url", fixture["url"])
+        pages[fixture_key(url)] = (fixture["content_type"], build_page(fixture))
+    return pages
+
+
+# seconds between two chunks of a dripping page
+DRIP_DELAY = 0.2
+
+
+class FixtureServer:
+    """
+    local stand-in for the real sites on 127.0.0.1, use session() to send every request of miuc here
+
+    pages are keyed by "/{host}{path}", a page is
+      - bytes: a text/html page
+      - (content type, bytes): a page of that type
+      - int: an answer of that status without body
+      - list: a text/html page dripping its chunks, one every DRIP_DELAY seconds
+      - str: a redirect there
+    """
+
+    def __init__(self, pages: dict) -> None:
+        server = self
+        self.pages = pages
+        # (path, client address, headers) of every request
+        self.requests = []
+        # the bodies of the POST requests
+        self.posted = []
+        # {path: etag}, a request whose If-None-Match is the etag of its page answers 304
+        self.etags = {}
+        # {path: seconds} to wait before answering
+        self.delays = {}
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                server.posted.append(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                self.do_GET()
+
+            def do_GET(self):
+                server.requests.append((self.path, self.client_address, dict(self.headers)))
+                time.sleep(server.delays.get(self.path, 0))
+                page = server.pages.get(self.path)
+                if isinstance(page, str):
+                    self.send_response(302)
+                    self.send_header("Location", page)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if isinstance(page, list):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(sum(map(len, page))))
+                    self.end_headers()
+                    for chunk in page:
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                        time.sleep(DRIP_DELAY)
+                    return
+                etag = server.etags.get(self.path)
+                if etag is not None and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                if page is None or isinstance(page, int):
+                    self.send_response(page or 404)
+                    body = b""
+                else:
+                    content_type, body = page if isinstance(page, tuple) else ("text/html; charset=utf-8", page)
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    if etag is not None:
+                        self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionError:
+                    # miuc closes the connection once the title is found
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def session(self, **kwargs):
+        """
+        a miuc session sending every request to this server
+        """
+        session = create_session(**kwargs)
+        adapter = FixtureAdapter(self.url, pool_maxsize=kwargs.get("pool_maxsize", 8))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def __enter__(self):
+        # a previous run may have opened the circuits of the hosts served here
+        host_breakers.reset()
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FixtureAdapter(HTTPAdapter):
+    """
+    send https://host/path to http://127.0.0.1:port/host/path
+    """
+
+    def __init__(self, base_url: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + fixture_key(request.url)
+        return super().send(request, **kwargs)
@@ -0,0 +1,182 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: benchmark suite of miuc against the offline fixture server
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+# python benchmarks/run.py [-o result.json] [--compare baseline.json]
+#
+# dispatch  per url cost of finding the processor
+# extract   per processor cost of parse + format over the recorded page, no network
+# startup   wall time of `python -c "import miuc.main"` and the -X importtime total
+# batch     end to end parse_urls throughput against the local fixture server
+
+import os
+import re
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fixture_server import FixtureServer, build_page, fixture_pages, load_fixtures
+from miuc.main import VERSION
+from miuc.batch import parse_urls
+from miuc.arxiv import EXPORT_URL
+from miuc.ratelimit import host_limits
+from miuc.stream import read_text
+from miuc.web_parser import match_processor
+from miuc.cache import split_markdown_url
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def best_of(func, number: int, repeat: int = 5) -> float:
+    """
+    seconds of one call, the best of `repeat` rounds
+    """
+    func()
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_dispatch(urls: list) -> dict:
+    seconds = best_of(lambda: [match_processor(url) for url in urls], number=2000)
+    return {"urls": len(urls), "per_url_us": seconds / len(urls) * 1e6}
+
+
+def replay_processor(processor_class, page: bytes):
+    """
+    the processor reading `page` from memory the way it reads a response, without network
+    """
+
+    class Replay(processor_class):
+        def fetch(self, url, headers=None, pattern=None):
+            chunks = (page[i : i + self.chunk_size] for i in range(0, len(page), self.chunk_size))
+            return read_text(chunks, pattern, "utf-8", self.max_bytes)
+
+    return Replay
+
+
+def bench_extract(fixtures: list) -> dict:
+    results = {}
+    for fixture in fixtures:
+        processor_class = match_processor(fixture["url"])
+        # one processor serves every lookup, as in parse_url
+        processor = replay_processor(processor_class, build_page(fixture))()
+        seconds = best_of(lambda: processor(fixture["url"]), number=20)
+        results[fixture["url"]] = {"processor": processor_class.__name__, "us": seconds * 1e6}
+    return results
+
+
+def bench_startup(rounds: int = 5) -> dict:
+    command = [sys.executable, "-c", "import miuc.main"]
+    wall = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True)
+        wall.append(time.perf_counter() - start)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import miuc.main"], cwd=ROOT, check=True, stderr=subprocess.PIPE
+    )
+    # import time:   self [us] | cumulative | imported package
+    cumulative = 0
+    for line in process.stderr.decode().splitlines():
+        res = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)", line)
+        if res and res.group(2) == "miuc.main":
+            cumulative = int(res.group(1))
+    return {"wall_ms": min(wall) * 1e3, "importtime_us": cumulative}
+
+
+def bench_batch(fixtures: list, jobs: int, rounds: int, repeat: int = 3) -> dict:
+    urls = [fixture["url"] for fixture in fixtures] * rounds
+    with FixtureServer(fixture_pages(fixtures)) as server:
+        session = server.session(pool_maxsize=jobs)
+        # the fixture server does not need protecting
+        for fixture in fixtures:
+            host = fixture.get("fetch_url", fixture["url"]).split("/")[2]
+            host_limits.configure(host, None, max_in_flight=jobs)
+        # the fixtures have no export feed, the arxiv papers take the per page path
+        host_limits.configure(EXPORT_URL.split("/")[2], None, max_in_flight=jobs)
+        # threads make the throughput noisy, keep the best pass
+        seconds = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = list(parse_urls(urls, use_cache=False, jobs=jobs, session=session))
+            seconds = min(seconds, time.perf_counter() - start)
+    # a failed lookup falls back to the title guessed by the url, a wrong one is as bad
+    titles = {fixture["url"]: fixture["title"] for fixture in fixtures}
+    failed = [url for url, markdown_url in results if split_markdown_url(markdown_url)[0] != titles[url]]
+    return {
+        "urls": len(urls),
+        "jobs": jobs,
+        "seconds": seconds,
+        "urls_per_second": len(urls) / seconds,
+        "requests": len(server.requests) // repeat,
+        "failed": len(failed),
+    }
+
+
+def flatten(result: dict, prefix: str = "") -> dict:
+    values = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[f"{prefix}{key}"] = value
+    return values
+
+
+def compare(baseline: dict, result: dict) -> None:
+    old_values = flatten(baseline["benchmarks"])
+    new_values = flatten(result["benchmarks"])
+    print(f"{'metric':<100} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for key, new in new_values.items():
+        old = old_values.get(key)
+        if old is None:
+            continue
+        ratio = new / old if old else float("inf")
+        print(f"{key:<100} {old:>12.2f} {new:>12.2f} {ratio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser("miuc benchmark")
+    parser.add_argument("-o", "--output", type=str, help="write the json result to a file")
+    parser.add_argument("--compare", type=str, help="compare with the json result of another version")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="workers of the batch benchmark")
+    parser.add_argument("--rounds", type=int, default=20, help="times each fixture url is resolved in batch")
+    args = parser.parse_args()
+
+    data = load_fixtures()
+    fixtures = data["fixtures"]
+    urls = [fixture["url"] for fixture in fixtures] + data["offline_urls"]
+    result = {
+        "version": ".".join(map(str, VERSION)),
+        "python": platform.python_version(),
+        "benchmarks": {
+            "dispatch": bench_dispatch(urls),
+            "extract": bench_extract(fixtures),
+            "startup": bench_startup(),
+            "batch": bench_batch(fixtures, args.jobs, args.rounds),
+        },
+    }
+
+    text = json.dumps(result, indent=4, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+    elif not args.output:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: micro benchmark of the html scanner against the regex extraction
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+# python benchmarks/scanner.py [--json] [--after BYTES]
+#
+# time the regexes the processors used before the scanner and the targets they declare
+# now over the recorded fixture pages, as recorded and minified to a single line. the
+# filler after the title of the minified pages is cut to --after bytes, a greedy regex
+# backtracks quadratically over a long line and would not finish on the full page
+
+import os
+import re
+import sys
+import json
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fixture_server import load_fixtures, build_page
+from miuc.scanner import scan, TITLE, OG_TITLE
+from miuc.site_processor import Acm, Arxiv, Bilibili, CSDN, Github, Stackoverflow, USENIX, Zhihu
+
+# processor: (regex used before, target declared now)
+CASES = {
+    "Github": (r'<bdi class="js-issue-title markdown-title">(.*?)</bdi>', Github.issue_title),
+    "Stackoverflow": (r'<a .*class="question-hyperlink">(.*?)</a>', Stackoverflow.question_title),
+    "Zhihu": (r'<h1 class="QuestionHeader-title">(.*?)</h1>', Zhihu.question_title),
+    "Bilibili": (r"<h1 .*>(.*?)</h1>", Bilibili.video_title),
+    "CSDN": (r'<h1 class="title-article" id="articleContentId">(.*?)</h1>', CSDN.article_title),
+    "Acm": (r"<h1.*>(.*?)</h1.*>", Acm.article_title),
+    "Arxiv": (r"<h1 class=\"title mathjax\"><span class=\"descriptor\">Title:</span>(.*?)</h1>", Arxiv.article_title),
+    "IEEE": (r"<title>(.*) \| .* \| IEEE Xplore</title>", TITLE),
+    "USENIX": (r"<h1 id=\"page-title\">(.*?)</h1>", USENIX.article_title),
+    "UnixStackExchange": (
+        r"<meta name=\"twitter:title\" property=\"og:title\" itemprop=\"name\" content=\"(.*)\" />",
+        OG_TITLE,
+    ),
+}
+
+
+def best_of(func, number: int) -> float:
+    func()
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def pages(fixture: dict, after: int) -> dict:
+    minified = dict(fixture, after=min(fixture["after"], after))
+    return {
+        "large": build_page(fixture).decode("utf-8"),
+        "minified": build_page(minified).decode("utf-8").replace("\n", ""),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser("scanner benchmark")
+    parser.add_argument("--json", action="store_true", help="print machine readable results")
+    parser.add_argument("--after", type=int, default=32 * 1024, help="filler bytes after the title of minified pages")
+    args = parser.parse_args()
+
+    fixtures = {}
+    for fixture in load_fixtures()["fixtures"]:
+        fixtures.setdefault(fixture["processor"], fixture)
+
+    results = []
+    for name, (regex, target) in CASES.items():
+        pattern = re.compile(regex)
+        for kind, page in pages(fixtures[name], args.after).items():
+            regex_time = best_of(lambda: pattern.search(page), number=1)
+            scan_time = best_of(lambda: scan(page, target), number=5)
+            results.append(
+                {
+                    "processor": name,
+                    "page": kind,
+                    "bytes": len(page.encode("utf-8")),
+                    "regex_ms": regex_time * 1e3,
+                    "scan_ms": scan_time * 1e3,
+                }
+            )
+
+    if args.json:
+        print(json.dumps({"benchmark": "scanner", "results": results}))
+    else:
+        print(f"{'processor':<20} {'page':<10} {'bytes':>10} {'regex (ms)':>12} {'scan (ms)':>12}")
+        for result in results:
+            print(
+                f"{result['processor']:<20} {result['page']:<10} {result['bytes']:>10} "
+                f"{result['regex_ms']:>12.3f} {result['scan_ms']:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
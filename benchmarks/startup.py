@@ -0,0 +1,99 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: cold start budget of the miuc command line
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+# python benchmarks/startup.py [--json] [--check] [--budget-ms 50]
+#
+# the vscode extension may run one `miuc URL` per paste, so cold start is paid every time.
+# measure the -X importtime cumulative of miuc.main and the wall time of resolving urls
+# which need no network, and list the heavy modules they load. --check fails if the
+# import is over budget or a url without network loads requests, json or sqlite3
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# resolved from the url alone, or guessed
+OFFLINE_URLS = [
+    "https://en.wikipedia.org/wiki/GCC",
+    "https://www.geeksforgeeks.org/python-lists/",
+    "https://marketplace.visualstudio.com/items?itemName=ms-python.python",
+    "https://docs.python.org/3/library/re.html",
+]
+HEAVY_MODULES = ["requests", "json", "sqlite3", "asyncio"]
+
+PROBE = """
+import sys
+import miuc.main
+from miuc import parse_url
+for url in sys.argv[1:]:
+    parse_url(url, use_cache=False)
+print(" ".join(m for m in %r if m in sys.modules))
+""" % (HEAVY_MODULES,)
+
+
+def import_time_us(module: str) -> int:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, check=True, stderr=subprocess.PIPE
+    )
+    # import time:   self [us] | cumulative | imported package
+    for line in process.stderr.decode().splitlines():
+        res = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S+)", line)
+        if res and res.group(2) == module:
+            return int(res.group(1))
+    return 0
+
+
+def wall_ms(command: list) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.PIPE)
+    return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser("startup benchmark")
+    parser.add_argument("--json", action="store_true", help="print machine readable results")
+    parser.add_argument("--check", action="store_true", help="fail if the cold start is over budget")
+    parser.add_argument("--budget-ms", type=float, default=50, help="budget of the miuc.main import")
+    parser.add_argument("--rounds", type=int, default=7, help="runs of each measure, the median is kept")
+    args = parser.parse_args()
+
+    probe = [sys.executable, "-c", PROBE] + OFFLINE_URLS
+    result = {
+        "import_ms": statistics.median(import_time_us("miuc.main") for _ in range(args.rounds)) / 1e3,
+        "python_ms": statistics.median(wall_ms([sys.executable, "-c", "pass"]) for _ in range(args.rounds)),
+        "offline_urls_ms": statistics.median(wall_ms(probe) for _ in range(args.rounds)),
+        "heavy_modules": subprocess.run(probe, cwd=ROOT, check=True, stdout=subprocess.PIPE).stdout.decode().split(),
+    }
+
+    if args.json:
+        print(json.dumps({"benchmark": "startup", "result": result}))
+    else:
+        print(f"import miuc.main        {result['import_ms']:8.2f} ms (budget {args.budget_ms:.0f} ms)")
+        print(f"python -c pass          {result['python_ms']:8.2f} ms")
+        print(f"resolve offline urls    {result['offline_urls_ms']:8.2f} ms")
+        print(f"heavy modules loaded    {' '.join(result['heavy_modules']) or '-'}")
+
+    if args.check:
+        if result["import_ms"] > args.budget_ms:
+            print(f"import miuc.main takes {result['import_ms']:.2f} ms", file=sys.stderr)
+            sys.exit(1)
+        if result["heavy_modules"]:
+            print(f"urls without network load {' '.join(result['heavy_modules'])}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
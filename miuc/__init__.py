@@ -1 +1 @@
-from .web_parser import parse_url
\ No newline at end of file
+from .web_parser import parse_url, parse_url_progressive
\ No newline at end of file
@@ -0,0 +1,348 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: asyncio api of parse_url
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import re
+import time
+import asyncio
+import weakref
+from typing import Iterable, List
+from urllib.parse import unquote
+from .utils import guess_name_by_url
+from .cache import get_cache, normalize_url
+from .stream import open_search, DEFAULT_CHUNK_SIZE
+from .site_processor import CircuitOpenError, Error, StatusError, is_url_failure
+from .breaker import host_breakers, is_host_failure, negative_cache
+from . import arxiv, deadline, tracing
+from .ratelimit import host_limits
+from .singleflight import AsyncSingleFlight
+from .web_parser import parse_url, match_processor, rebase_markdown_url, _ZHIHU_LINK_RE
+
+# the processors keep their sync parse/format, a fetch they have not got yet raises
+# PendingFetch, the page is awaited with the async backend and the processor runs again
+# with every page fetched so far. parse only depends on the url and the pages, so the
+# rerun takes the same path and goes one fetch further
+
+
+class PendingFetch(Exception):
+    def __init__(self, url: str, headers: dict, pattern: re.Pattern) -> None:
+        super().__init__(url)
+        self.url = url
+        self.headers = headers
+        self.pattern = pattern
+
+
+class _ReplayProcessor:
+    """
+    mixed into a processor class, answer fetch from the pages awaited by parse_url_async
+    """
+
+    def fetch(self, url: str, headers: dict = None, pattern: re.Pattern = None) -> str:
+        key = (url, pattern)
+        if key in self._pages:
+            page = self._pages[key]
+            if isinstance(page, Exception):
+                # the processor may fall back to another page
+                raise page
+            return page
+        raise PendingFetch(url, headers, pattern)
+
+
+_replay_classes = {}
+# concurrent lookups of the same url on a loop share one fetch
+_flights = AsyncSingleFlight()
+
+
+def _replay_class(processor_class):
+    replay_class = _replay_classes.get(processor_class)
+    if replay_class is None:
+        # the pages of the lookup are a field of its context
+        context_class = type("Context", (processor_class.Context,), {"__slots__": ("_pages",)})
+        replay_class = type(processor_class.__name__, (_ReplayProcessor, processor_class), {"Context": context_class})
+        _replay_classes[processor_class] = replay_class
+    return replay_class
+
+
+class AiohttpBackend:
+    """
+    fetch pages with aiohttp, connections are pooled per host
+    """
+
+    def __init__(self, limit_per_host: int = 8, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        import aiohttp
+
+        self.aiohttp = aiohttp
+        self.limit_per_host = limit_per_host
+        self.chunk_size = chunk_size
+        self.session = None
+
+    async def fetch(self, url: str, headers: dict, pattern: re.Pattern, max_bytes: int, timeout: float) -> str:
+        if self.session is None:
+            connector = self.aiohttp.TCPConnector(limit_per_host=self.limit_per_host)
+            self.session = self.aiohttp.ClientSession(connector=connector)
+        client_timeout = self.aiohttp.ClientTimeout(total=timeout)
+        async with self.session.get(url, headers=headers, timeout=client_timeout, allow_redirects=True) as response:
+            if response.status != 200:
+                raise StatusError(url, self.__class__.__name__, response.status)
+            search = open_search(pattern, response.charset, max_bytes)
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                if search.feed(chunk):
+                    break
+            return search.close()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class HttpxBackend:
+    """
+    fetch pages with httpx, connections are pooled per host
+    """
+
+    def __init__(self, max_keepalive_connections: int = 32) -> None:
+        import httpx
+
+        self.httpx = httpx
+        self.max_keepalive_connections = max_keepalive_connections
+        self.client = None
+
+    async def fetch(self, url: str, headers: dict, pattern: re.Pattern, max_bytes: int, timeout: float) -> str:
+        if self.client is None:
+            limits = self.httpx.Limits(max_keepalive_connections=self.max_keepalive_connections)
+            self.client = self.httpx.AsyncClient(limits=limits, follow_redirects=True)
+        async with self.client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise StatusError(url, self.__class__.__name__, response.status_code)
+            search = open_search(pattern, response.charset_encoding, max_bytes)
+            async for chunk in response.aiter_bytes():
+                if search.feed(chunk):
+                    break
+            return search.close()
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+BACKENDS = [AiohttpBackend, HttpxBackend]
+
+# one default backend for each event loop, the pooled connections belong to the loop
+_default_backends = weakref.WeakKeyDictionary()
+
+
+def get_backend():
+    """
+    the default backend of the running event loop, aiohttp is preferred over httpx
+    """
+    loop = asyncio.get_event_loop()
+    backend = _default_backends.get(loop)
+    if backend is None:
+        for backend_class in BACKENDS:
+            try:
+                backend = backend_class()
+                break
+            except ImportError:
+                continue
+        else:
+            raise ImportError("parse_url_async needs aiohttp or httpx, pip install miuc[aiohttp]")
+        _default_backends[loop] = backend
+    return backend
+
+
+async def _resolve(processor_class, url: str, max_time_limit: float, backend) -> str:
+    pages = {}
+    processor = _replay_class(processor_class).shared()
+    while True:
+        try:
+            return processor(url, max_time_limit, _pages=pages)
+        except PendingFetch as fetch:
+            breaker = host_breakers.get(fetch.url, processor)
+            if not breaker.allow():
+                page = CircuitOpenError(url, processor.class_name, f"{fetch.url} skipped, its host keeps failing")
+            else:
+                budget = deadline.remaining()
+                # the backends fetch a page in one go, its whole time is the request phase
+                record = tracing.start_fetch(fetch.url)
+                status = None
+                # whether the breaker learnt something about the host from this fetch
+                recorded = False
+                start = time.perf_counter()
+                try:
+                    async with host_limits.get(fetch.url, processor).acquire_async():
+                        record.add("wait", time.perf_counter() - start)
+                        timeout = deadline.timeout(max_time_limit)
+                        with record.span("request"):
+                            page = await backend.fetch(
+                                fetch.url, fetch.headers, fetch.pattern, processor.max_bytes, timeout
+                            )
+                    status = 200
+                except StatusError as e:
+                    status = e.status_code
+                    if is_host_failure(e.status_code):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    recorded = True
+                    page = e
+                except Error as e:
+                    status = e.__class__.__name__
+                    page = e
+                except asyncio.CancelledError:
+                    status = "CancelledError"
+                    # the lookup is over max_time_limit, the host is slow unless the fetch started late
+                    if not deadline.late_start(budget, max_time_limit):
+                        breaker.record_failure()
+                        recorded = True
+                    raise
+                except Exception as e:
+                    status = e.__class__.__name__
+                    # a timeout of a fetch started with little of the lookup left says nothing of the host
+                    if not deadline.late_start(budget, max_time_limit):
+                        breaker.record_failure()
+                        recorded = True
+                    raise
+                else:
+                    breaker.record_success()
+                    recorded = True
+                finally:
+                    record.finish(status)
+                    if not recorded:
+                        # a probe which tells nothing gives its turn back
+                        breaker.release()
+            pages[(fetch.url, fetch.pattern)] = page
+
+
+async def parse_url_async(
+    url: str,
+    max_time_limit: float = 5,
+    use_cache: bool = True,
+    backend=None,
+    generic: bool = False,
+    offline: bool = False,
+) -> str:
+    """
+    parse url and return the tite for the page, the async counterpart of parse_url
+
+    the whole lookup is cancelled after max_time_limit seconds and the title is guessed by the url,
+    a lookup of an url already in flight on the loop waits for that one
+    """
+    if offline:
+        # nothing is awaited without the network
+        return parse_url(url, max_time_limit, use_cache, generic=generic, offline=True)
+    with deadline.deadline_scope(max_time_limit), tracing.lookup_scope(url):
+        return await _parse_url_async(url, max_time_limit, use_cache, backend, generic)
+
+
+async def _parse_url_async(url: str, max_time_limit: float, use_cache: bool, backend, generic: bool) -> str:
+    trace = tracing.current()
+    res = _ZHIHU_LINK_RE.match(url)
+    if res:
+        return await _parse_url_async(unquote(res.group("url")), max_time_limit, use_cache, backend, generic)
+    with tracing.span("dispatch"):
+        processor_class = match_processor(url, generic)
+    if processor_class is None:
+        trace.outcome = "unsupported"
+        return guess_name_by_url(url)
+    trace.processor = processor_class.__name__
+
+    if use_cache:
+        with tracing.span("cache"):
+            markdown_url = get_cache().get(url)
+            failed = markdown_url is None and url in negative_cache
+        if markdown_url is not None:
+            trace.outcome = "cache"
+            return markdown_url
+        if failed:
+            trace.outcome = "negative"
+            return guess_name_by_url(url)
+    backend = backend or get_backend()
+    key = (normalize_url(url), generic)
+    start = time.perf_counter()
+    try:
+        (leader_url, markdown_url), shared = await _flights.do(
+            key, _lookup, processor_class, url, max_time_limit, use_cache, backend, timeout=deadline.remaining()
+        )
+    except asyncio.TimeoutError:
+        # the lookup in flight was started with a later deadline
+        trace.add("shared", time.perf_counter() - start)
+        trace.outcome = "failed"
+        return guess_name_by_url(url)
+    if shared:
+        trace.add("shared", time.perf_counter() - start)
+        trace.outcome = "shared"
+        markdown_url = rebase_markdown_url(markdown_url, leader_url, url)
+    return markdown_url
+
+
+async def _lookup(processor_class, url: str, max_time_limit: float, use_cache: bool, backend):
+    trace = tracing.current()
+    try:
+        markdown_url = await asyncio.wait_for(
+            _resolve(processor_class, url, max_time_limit, backend), deadline.timeout(max_time_limit)
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:  # pragma: no cover
+        trace.outcome = "failed"
+        # running out of time or a failing host is not the url's fault
+        if use_cache and not deadline.expired() and is_url_failure(e):
+            negative_cache.add(url)
+        return url, guess_name_by_url(url)
+    trace.outcome = "resolved"
+    if use_cache:
+        with tracing.span("store"):
+            get_cache().set(url, markdown_url, ttl=processor_class.cache_ttl, site=processor_class.__name__)
+    return url, markdown_url
+
+
+async def _prefetch_arxiv(urls: List[str], use_cache: bool, backend, max_time_limit: float) -> None:
+    """
+    the async counterpart of arxiv.prefetch
+    """
+    export_urls = arxiv.export_urls(arxiv.pending_ids(urls, use_cache))
+    if not export_urls:
+        return
+    backend = backend or get_backend()
+    for export_url in export_urls:
+        try:
+            async with host_limits.get(export_url, arxiv.ExportApi).acquire_async():
+                text = await backend.fetch(export_url, {}, None, arxiv.MAX_FEED_BYTES, max_time_limit)
+            arxiv.store.update(arxiv.parse_feed(text))
+        except asyncio.CancelledError:  # pragma: no cover
+            raise
+        except Exception:  # pragma: no cover
+            continue
+
+
+async def parse_urls_async(
+    urls: Iterable[str],
+    max_time_limit: float = 5,
+    use_cache: bool = True,
+    backend=None,
+    limit: int = 100,
+    generic: bool = False,
+    offline: bool = False,
+) -> List[str]:
+    """
+    resolve the urls on the running event loop with at most `limit` lookups in flight
+
+    the titles of the arxiv papers are fetched in bulk before the lookups start
+    """
+    urls = list(urls)
+    if not offline:
+        await _prefetch_arxiv(urls, use_cache, backend, max_time_limit)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def parse(url: str) -> str:
+        async with semaphore:
+            return await parse_url_async(url, max_time_limit, use_cache, backend, generic, offline)
+
+    return await asyncio.gather(*[parse(url) for url in urls])
@@ -0,0 +1,128 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: titles of many arxiv papers at once from the export api
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+from .prefetch import PrefetchStore, uncached
+from .ratelimit import host_limits
+from .session import get_session
+from .stream import read_text
+
+# the abstract page of each paper is large, the export api answers many ids in one atom feed.
+# prefetch puts the titles of a batch of urls in the store which Arxiv.parse reads before
+# falling back to the abstract page, a paper missing from the feed or a failed request simply
+# takes the per page path
+
+# https://arxiv.org/abs/1706.03762v7, https://arxiv.org/pdf/1706.03762.pdf, https://arxiv.org/abs/hep-th/9901001
+ARXIV_URL_RE = re.compile(
+    r"^https?://(?:www\.)?arxiv\.org/(?:abs|pdf)/"
+    r"(?P<id>\d{4}\.\d{4,5}|[a-z-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?(?:\.pdf)?/?(?:[?#].*)?$"
+)
+# <id>http://arxiv.org/abs/1706.03762v7</id> of a feed entry
+ENTRY_ID_RE = re.compile(r"/abs/(?P<id>.+?)(?:v\d+)?$")
+WHITESPACE_RE = re.compile(r"\s+")
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+EXPORT_URL = "https://export.arxiv.org/api/query"
+# ids of one export request, each entry carries its whole abstract
+BATCH_SIZE = 100
+MAX_FEED_BYTES = 8 * 1024 * 1024
+
+
+class ExportApi:
+    """
+    the limits of export.arxiv.org, read by host_limits like the ones of a processor
+    """
+
+    # the api terms ask for no more than one request every three seconds
+    rate_limit = 1 / 3
+    rate_burst = 1
+    max_in_flight = 1
+
+
+# {paper id: title}
+store = PrefetchStore()
+
+
+def arxiv_id(url: str) -> Optional[str]:
+    """
+    the paper id of an abs or pdf url without its version, None for the other urls
+    """
+    res = ARXIV_URL_RE.match(url)
+    return res.group("id") if res else None
+
+
+def export_urls(ids: List[str]) -> List[str]:
+    """
+    the export api queries of the ids, BATCH_SIZE ids each
+    """
+    urls = []
+    for i in range(0, len(ids), BATCH_SIZE):
+        batch = ids[i : i + BATCH_SIZE]
+        query = urlencode({"id_list": ",".join(batch), "max_results": len(batch)}, safe=",/")
+        urls.append(f"{EXPORT_URL}?{query}")
+    return urls
+
+
+def parse_feed(text: str) -> Dict[str, str]:
+    """
+    {id: title} of the entries of an export api feed, an error entry has no paper id and is skipped
+    """
+    import xml.etree.ElementTree as ElementTree
+
+    titles = {}
+    for entry in ElementTree.fromstring(text).iter(f"{ATOM}entry"):
+        entry_id = entry.findtext(f"{ATOM}id") or ""
+        title = entry.findtext(f"{ATOM}title")
+        res = ENTRY_ID_RE.search(entry_id)
+        if res and title:
+            titles[res.group("id")] = WHITESPACE_RE.sub(" ", title).strip()
+    return titles
+
+
+def pending_ids(urls: Iterable[str], use_cache: bool = True) -> List[str]:
+    """
+    the unique ids of the arxiv urls which are neither prefetched nor cached
+    """
+    ids = {}
+    for url in uncached((url for url in urls if arxiv_id(url) is not None), use_cache):
+        paper_id = arxiv_id(url)
+        if paper_id not in store:
+            ids[paper_id] = None
+    return list(ids)
+
+
+def fetch_feed(url: str, session=None, max_time_limit: int = 5) -> Dict[str, str]:
+    session = session or get_session()
+    with host_limits.get(url, ExportApi).acquire():
+        response = session.get(url, timeout=max_time_limit, stream=True)
+        with response:
+            if response.status_code != 200:
+                return {}
+            chunks = response.iter_content(chunk_size=64 * 1024)
+            return parse_feed(read_text(chunks, encoding=response.encoding or "utf-8", max_bytes=MAX_FEED_BYTES))
+
+
+def prefetch(urls: Iterable[str], use_cache: bool = True, session=None, max_time_limit: int = 5) -> int:
+    """
+    fetch the titles of the arxiv urls in bulk, return the number of titles found
+
+    a failed request is ignored, Arxiv.parse reads the abstract page of the papers it missed
+    """
+    found = 0
+    for url in export_urls(pending_ids(urls, use_cache)):
+        try:
+            titles = fetch_feed(url, session, max_time_limit)
+        except Exception:  # pragma: no cover
+            continue
+        store.update(titles)
+        found += len(titles)
+    return found
+
@@ -0,0 +1,77 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: resolve many urls concurrently
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Tuple
+from .cache import get_cache
+from .web_parser import parse_url, revalidate
+from .prefetch import prefetch_stream, read_ahead
+
+
+def read_urls(stream) -> Iterator[str]:
+    """
+    one url per line, blank lines are ignored
+    """
+    for line in stream:
+        url = line.strip()
+        if url:
+            yield url
+
+
+def parse_urls(
+    urls: Iterable[str],
+    max_time_limit: float = 5,
+    use_cache: bool = True,
+    jobs: int = 8,
+    session=None,
+    generic: bool = False,
+    offline: bool = False,
+) -> Iterator[Tuple[str, str]]:
+    """
+    resolve the urls with at most `jobs` lookups in flight, yield (url, markdown_url) in input order
+
+    urls are consumed lazily, so a long stream is not read into memory up front, and the results
+    read so far are yielded whenever the input stalls. the titles of arxiv papers and github
+    issues are fetched in bulk for every few hundred urls
+    """
+    if offline:
+        urls = read_ahead(urls)
+    else:
+        urls = prefetch_stream(urls, use_cache, session, max_time_limit, stalls=True)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for url in urls:
+            if url is None:
+                # the input stalls, answer the urls read so far
+                while pending:
+                    url, future = pending.popleft()
+                    yield url, future.result()
+                continue
+            pending.append((url, executor.submit(parse_url, url, max_time_limit, use_cache, session, generic, offline)))
+            # keep the workers busy but do not run too far ahead of the consumer
+            if len(pending) >= jobs * 2:
+                url, future = pending.popleft()
+                yield url, future.result()
+        while pending:
+            url, future = pending.popleft()
+            yield url, future.result()
+
+
+def refresh_cache(older_than: float, max_time_limit: float = 5, jobs: int = 8, session=None) -> Dict[str, int]:
+    """
+    revalidate the cached titles resolved more than older_than seconds ago with `jobs` lookups in
+    flight, return the number of titles "not modified", "updated" and "failed"
+    """
+    counts = {"not modified": 0, "updated": 0, "failed": 0}
+    urls = [url for url, _ in get_cache().stale(older_than)]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for outcome in executor.map(lambda url: revalidate(url, max_time_limit, session), urls):
+            counts[outcome] += 1
+    return counts
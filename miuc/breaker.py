@@ -0,0 +1,185 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: stop asking the hosts and urls which keep failing
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from .cache import normalize_url
+
+# a host which is down or blocking us costs max_time_limit for each of its urls. after
+# failure_threshold failures in a row its circuit opens and the lookups go straight to the
+# guessed title for cool_down seconds, then one probe request decides whether it closes again
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def is_host_failure(status_code: int) -> bool:
+    """
+    the statuses which tell about the host rather than the url, a 404 is the url's fault
+    """
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, cool_down: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.state = CLOSED
+        self.failures = 0
+        # lookups sent to the fallback while open
+        self.rejected = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        whether a request may be sent now, only one probe goes through once the cool down is over
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cool_down:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """
+        end a request which tells nothing about the host, like one cut by the deadline. a probe
+        which ends so leaves the circuit open for another cool down, or no request would go again
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self._probing:
+                self._probing = False
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """
+        seconds before the next probe, 0 when closed
+        """
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self.cool_down - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in": round(self.retry_in(), 1),
+        }
+
+
+class HostBreakers:
+    """
+    the breaker of each host, created from the settings of the first processor fetching from it
+    """
+
+    def __init__(self) -> None:
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, failure_threshold: int = 5, cool_down: float = 30) -> None:
+        """
+        override the breaker of a host
+        """
+        with self._lock:
+            self.breakers[host] = CircuitBreaker(failure_threshold, cool_down)
+
+    def get(self, url: str, processor=None) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                if processor is None:
+                    breaker = CircuitBreaker()
+                else:
+                    breaker = CircuitBreaker(processor.failure_threshold, processor.cool_down)
+                self.breakers[host] = breaker
+            return breaker
+
+    def reset(self) -> None:
+        with self._lock:
+            self.breakers.clear()
+
+    def stats(self) -> dict:
+        """
+        the breakers which are not closed or have failures
+        """
+        with self._lock:
+            breakers = list(self.breakers.items())
+        return {
+            host: breaker.stats() for host, breaker in breakers if breaker.state != CLOSED or breaker.failures
+        }
+
+
+class NegativeCache:
+    """
+    the urls whose lookup failed lately, their title is guessed without asking again until ttl is over
+    """
+
+    def __init__(self, ttl: float = 120, max_entries: int = 4096) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, url: str) -> None:
+        key = normalize_url(url)
+        with self._lock:
+            self._expires[key] = time.monotonic() + self.ttl
+            self._expires.move_to_end(key)
+            while len(self._expires) > self.max_entries:
+                self._expires.popitem(last=False)
+
+    def __contains__(self, url: str) -> bool:
+        key = normalize_url(url)
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._expires[key]
+                return False
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires.clear()
+
+    def __len__(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for expires in self._expires.values() if expires >= now)
+
+
+host_breakers = HostBreakers()
+negative_cache = NegativeCache()
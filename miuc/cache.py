@@ -0,0 +1,313 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: persistent title cache
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MEMORY_ENTRIES = 1024
+# seconds between two writes of the access times of the memory hits to the database
+ACCESS_FLUSH_INTERVAL = 60
+
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def get_cache_dir() -> str:
+    """
+    directory of the cache database, `MIUC_CACHE_DIR` overrides the platform default
+    """
+    cache_dir = os.environ.get("MIUC_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    if os.name == "nt":  # pragma: no cover
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+    elif sys.platform == "darwin":  # pragma: no cover
+        base = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    return os.path.join(base, "miuc")
+
+
+def normalize_url(url: str) -> str:
+    """
+    cache key of the url, scheme and host are case insensitive and default ports are dropped
+    """
+    scheme, netloc, path, query, fragment = urlsplit(url.strip())
+    scheme = scheme.lower()
+    netloc = netloc.lower()
+    host, _, port = netloc.rpartition(":")
+    if host and _DEFAULT_PORTS.get(scheme) == port:
+        netloc = host
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+class Validators(NamedTuple):
+    """
+    the ETag and Last-Modified of the page a title was read from, sent back when the title is
+    refreshed so an unchanged page answers 304 without a body
+    """
+
+    page: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def split_markdown_url(markdown_url: str):
+    """
+    [title](url) -> (title, url)
+    """
+    index = markdown_url.rfind("](")
+    return markdown_url[1:index], markdown_url[index + 2 : -1]
+
+
+class TitleCache:
+    """
+    sqlite backed title cache with per entry expire time and LRU eviction
+
+    the recently used entries are also kept in memory, so a long running process
+    answers repeated urls without touching the database
+    """
+
+    def __init__(
+        self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, memory_entries: int = DEFAULT_MEMORY_ENTRIES
+    ) -> None:
+        if path is None:
+            path = os.path.join(get_cache_dir(), "titles.sqlite3")
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        # {key: time} of the memory hits not written to the database yet
+        self._accessed = {}
+        self._flushed = time.time()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> "sqlite3.Connection":
+        # sqlite3 is imported on the first lookup, not with miuc
+        import sqlite3
+
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1, check_same_thread=False, isolation_level=None)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS titles ("
+                "url TEXT PRIMARY KEY, title TEXT NOT NULL, target TEXT, site TEXT, "
+                "created REAL NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL, "
+                "page TEXT, etag TEXT, last_modified TEXT)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(titles)")}
+            for column in ("page", "etag", "last_modified"):
+                if column not in columns:
+                    # a cache written before the validators were kept
+                    conn.execute(f"ALTER TABLE titles ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS titles_accessed ON titles(accessed)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        return the cached markdown url, None if missing or expired
+        """
+        import sqlite3
+
+        key = normalize_url(url)
+        now = time.time()
+        try:
+            with self._lock:
+                entry = self._memory.get(key)
+                if entry is not None and entry[2] >= now:
+                    self._memory.move_to_end(key)
+                    self._accessed[key] = now
+                    if now - self._flushed >= ACCESS_FLUSH_INTERVAL:
+                        try:
+                            self._flush_accessed(self._connect())
+                        except sqlite3.Error:  # pragma: no cover
+                            pass
+                    title, target, _ = entry
+                    return f"[{title}]({target or url})"
+                conn = self._connect()
+                row = conn.execute("SELECT title, target, expires FROM titles WHERE url = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                title, target, expires = row
+                if expires < now:
+                    self._memory.pop(key, None)
+                    conn.execute("DELETE FROM titles WHERE url = ?", (key,))
+                    return None
+                conn.execute("UPDATE titles SET accessed = ? WHERE url = ?", (now, key))
+                self._remember(key, row)
+        except sqlite3.Error:  # pragma: no cover
+            return None
+        return f"[{title}]({target or url})"
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def set(
+        self, url: str, markdown_url: str, ttl: float = DEFAULT_TTL, site: str = None, validators: Validators = None
+    ) -> None:
+        """
+        store the markdown url returned by a processor, with the validators of the page it was
+        read from if any
+        """
+        import sqlite3
+
+        key = normalize_url(url)
+        title, target = split_markdown_url(markdown_url)
+        if target == url:
+            # render with the url of the caller on hit
+            target = None
+        page, etag, last_modified = validators or (None, None, None)
+        now = time.time()
+        try:
+            with self._lock:
+                self._remember(key, (title, target, now + ttl))
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO titles "
+                    "(url, title, target, site, created, expires, accessed, page, etag, last_modified) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, title, target, site, now, now + ttl, now, page, etag, last_modified),
+                )
+                self._flush_accessed(conn)
+                self._evict(conn)
+        except sqlite3.Error:  # pragma: no cover
+            pass
+
+    def _flush_accessed(self, conn: "sqlite3.Connection") -> None:
+        # the eviction orders by the access time, write the memory hits back before it runs
+        self._flushed = time.time()
+        if self._accessed:
+            accessed, self._accessed = self._accessed, {}
+            conn.executemany(
+                "UPDATE titles SET accessed = ? WHERE url = ? AND accessed < ?",
+                [(when, key, when) for key, when in accessed.items()],
+            )
+
+    def get_validators(self, url: str) -> Optional[Validators]:
+        """
+        the validators stored with the title of url, expired or not
+        """
+        import sqlite3
+
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT page, etag, last_modified FROM titles WHERE url = ?", (normalize_url(url),)
+                ).fetchone()
+        except sqlite3.Error:  # pragma: no cover
+            return None
+        if row is None or row[0] is None:
+            return None
+        return Validators(*row)
+
+    def renew(self, url: str, ttl: float = DEFAULT_TTL) -> bool:
+        """
+        keep the title of url for ttl more seconds as if it was resolved now, False if it is gone
+        """
+        import sqlite3
+
+        key = normalize_url(url)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                cursor = conn.execute("UPDATE titles SET created = ?, expires = ? WHERE url = ?", (now, now + ttl, key))
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory[key] = (entry[0], entry[1], now + ttl)
+                return cursor.rowcount > 0
+        except sqlite3.Error:  # pragma: no cover
+            return False
+
+    def stale(self, older_than: float) -> List[Tuple[str, Optional[str]]]:
+        """
+        (url, site) of the titles resolved more than older_than seconds ago, the oldest first
+        """
+        import sqlite3
+
+        try:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT url, site FROM titles WHERE created < ? ORDER BY created ASC", (time.time() - older_than,)
+                )
+                return rows.fetchall()
+        except sqlite3.Error:  # pragma: no cover
+            return []
+
+    def _evict(self, conn: "sqlite3.Connection") -> None:
+        (count,) = conn.execute("SELECT COUNT(*) FROM titles").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM titles WHERE url IN (SELECT url FROM titles ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def purge(self) -> None:
+        """
+        remove all the entries
+        """
+        import sqlite3
+
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            try:
+                self._connect().execute("DELETE FROM titles")
+            except sqlite3.Error:  # pragma: no cover
+                pass
+
+    def __len__(self) -> int:
+        import sqlite3
+
+        try:
+            with self._lock:
+                return self._connect().execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+        except sqlite3.Error:  # pragma: no cover
+            return 0
+
+    def close(self) -> None:
+        import sqlite3
+
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._flush_accessed(self._conn)
+                except sqlite3.Error:  # pragma: no cover
+                    pass
+                self._conn.close()
+                self._conn = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TitleCache:
+    """
+    the shared title cache of this process
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TitleCache()
+        return _cache
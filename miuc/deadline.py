@@ -0,0 +1,78 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: wall clock deadline of a lookup
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+# a socket timeout bounds each connect and each read, not the lookup: a page dripping one
+# byte at a time, a redirect chain or a processor fetching several pages can take many
+# times max_time_limit. parse_url opens a deadline_scope, every fetch under it shortens its
+# timeouts to what is left and stops reading the page once the deadline is over. the scope
+# lives in a context variable, so it follows the lookup into nested calls and asyncio tasks
+
+_deadline = contextvars.ContextVar("miuc_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    the code under it must be done within seconds, a scope nested in another one never extends it
+    """
+    deadline = _deadline.get()
+    if seconds is not None:
+        at = time.monotonic() + seconds
+        if deadline is None or at < deadline:
+            deadline = at
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    seconds left before the deadline, None without one
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def timeout(default: float) -> float:
+    """
+    a socket timeout of at most default seconds which does not go past the deadline
+    """
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+def until_expired(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    the chunks read before the deadline, the page is then searched as far as it got
+    """
+    for chunk in chunks:
+        yield chunk
+        if expired():
+            return
+
+
+def late_start(budget: Optional[float], default: float) -> bool:
+    """
+    whether a request given budget seconds had less than half its usual default timeout
+    """
+    return budget is not None and budget < default / 2
@@ -0,0 +1,185 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: titles of github issues, pull requests and commits from the github apis
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from .prefetch import PrefetchStore, uncached
+from .ratelimit import host_limits
+from .session import get_session
+
+# an issue page is several hundred KB for one title. with a token, prefetch asks the graphql
+# api for the titles of a whole batch of urls in one request. Github.parse reads the store,
+# then the small rest json of the issue or commit (without a token too, 60 requests an hour),
+# and only scrapes the html page as the last resort
+
+# ("issue", owner, repo, number) for issues and pull requests, which share their numbers,
+# ("commit", owner, repo, sha) for commits
+Ref = Tuple[str, str, str, str]
+
+GITHUB_REF_RE = re.compile(
+    r"^https://github\.com/(?P<owner>[\w.-]+)/(?P<repo>[\w.-]+)/"
+    r"(?:(?:issues|pull)/(?P<number>\d+)|commit/(?P<sha>[0-9a-fA-F]{7,40}))(?:[/?#].*)?$"
+)
+
+API_URL = "https://api.github.com"
+GRAPHQL_URL = f"{API_URL}/graphql"
+# refs of one graphql request
+BATCH_SIZE = 100
+TOKEN_ENVS = ["MIUC_GITHUB_TOKEN", "GITHUB_TOKEN"]
+
+# {ref: title}
+store = PrefetchStore()
+
+
+class GithubApi:
+    """
+    the limits of api.github.com, read by host_limits like the ones of a processor
+    """
+
+    rate_limit = 8
+    rate_burst = 8
+    max_in_flight = 4
+
+
+def github_ref(url: str) -> Optional[Ref]:
+    """
+    the ref of an issue, pull request or commit url, None for the other urls
+    """
+    res = GITHUB_REF_RE.match(url)
+    if res is None:
+        return None
+    owner, repo = res.group("owner").lower(), res.group("repo").lower()
+    if res.group("number"):
+        return ("issue", owner, repo, res.group("number"))
+    return ("commit", owner, repo, res.group("sha").lower())
+
+
+def get_token() -> Optional[str]:
+    for name in TOKEN_ENVS:
+        token = os.environ.get(name)
+        if token:
+            return token
+    return None
+
+
+def api_headers(token: str = None) -> dict:
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": "miuc"}
+    token = token or get_token()
+    if token:
+        headers["Authorization"] = f"bearer {token}"
+    return headers
+
+
+def rest_url(ref: Ref) -> str:
+    """
+    the rest api url of a ref, an issue url answers for a pull request as well
+    """
+    kind, owner, repo, name = ref
+    if kind == "issue":
+        return f"{API_URL}/repos/{owner}/{repo}/issues/{name}"
+    return f"{API_URL}/repos/{owner}/{repo}/commits/{name}"
+
+
+def rest_title(ref: Ref, data: dict) -> str:
+    if ref[0] == "issue":
+        return data["title"]
+    # the first line of the message, as the commit page shows it
+    return data["commit"]["message"].split("\n", 1)[0].strip()
+
+
+def graphql_query(refs: List[Ref]) -> str:
+    """
+    one query for all the refs, r<i> aliases a repository and i<j> or c<j> one of its refs
+    """
+    import json
+
+    repositories = {}
+    for ref in refs:
+        repositories.setdefault(ref[1:3], []).append(ref)
+    fields = []
+    for i, ((owner, repo), repo_refs) in enumerate(repositories.items()):
+        items = []
+        for j, (kind, _, _, name) in enumerate(repo_refs):
+            if kind == "issue":
+                items.append(
+                    f"i{j}: issueOrPullRequest(number: {int(name)}) "
+                    "{ ... on Issue { title } ... on PullRequest { title } }"
+                )
+            else:
+                items.append(f"c{j}: object(expression: {json.dumps(name)}) {{ ... on Commit {{ messageHeadline }} }}")
+        fields.append(f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ {' '.join(items)} }}")
+    return "query { " + " ".join(fields) + " }"
+
+
+def parse_graphql(refs: List[Ref], data: dict) -> Dict[Ref, str]:
+    """
+    {ref: title} of a graphql answer, the refs it could not resolve are left out
+    """
+    repositories = {}
+    for ref in refs:
+        repositories.setdefault(ref[1:3], []).append(ref)
+    titles = {}
+    for i, repo_refs in enumerate(repositories.values()):
+        repository = (data.get("data") or {}).get(f"r{i}") or {}
+        for j, ref in enumerate(repo_refs):
+            if ref[0] == "issue":
+                title = (repository.get(f"i{j}") or {}).get("title")
+            else:
+                title = (repository.get(f"c{j}") or {}).get("messageHeadline")
+            if title:
+                titles[ref] = title
+    return titles
+
+
+def pending_refs(urls: Iterable[str], use_cache: bool = True) -> List[Ref]:
+    """
+    the unique refs of the github urls which are neither prefetched nor cached
+    """
+    refs = {}
+    for url in uncached((url for url in urls if github_ref(url) is not None), use_cache):
+        ref = github_ref(url)
+        if ref not in store:
+            refs[ref] = None
+    return list(refs)
+
+
+def fetch_graphql(refs: List[Ref], token: str, session=None, max_time_limit: int = 5) -> Dict[Ref, str]:
+    session = session or get_session()
+    with host_limits.get(GRAPHQL_URL, GithubApi).acquire():
+        response = session.post(
+            GRAPHQL_URL, json={"query": graphql_query(refs)}, headers=api_headers(token), timeout=max_time_limit
+        )
+        with response:
+            if response.status_code != 200:
+                return {}
+            return parse_graphql(refs, response.json())
+
+
+def prefetch(urls: Iterable[str], use_cache: bool = True, session=None, max_time_limit: int = 5) -> int:
+    """
+    fetch the titles of the github urls with one graphql request per BATCH_SIZE refs, return the
+    number of titles found
+
+    the graphql api needs a token, from MIUC_GITHUB_TOKEN or GITHUB_TOKEN. without one, or when a
+    request fails, Github.parse looks each url up on its own
+    """
+    token = get_token()
+    if token is None:
+        return 0
+    refs = pending_refs(urls, use_cache)
+    found = 0
+    for i in range(0, len(refs), BATCH_SIZE):
+        try:
+            titles = fetch_graphql(refs[i : i + BATCH_SIZE], token, session, max_time_limit)
+        except Exception:  # pragma: no cover
+            continue
+        store.update(titles)
+        found += len(titles)
+    return found
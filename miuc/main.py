@@ -9,23 +9,284 @@
 
 import argparse
 from .web_parser import parse_url
+from .stream import DEFAULT_HEAD_BYTES
 import io
 import sys
 
+# the vscode extension may start one miuc per paste, so the modules of the other commands,
+# requests and sqlite3 are imported where they are used rather than here
+
 VERSION = (0, 2, 7)
 
+
+def add_generic_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--generic", action="store_true", help="read the title of unsupported sites from the page head")
+    parser.add_argument(
+        "--generic-max-bytes",
+        type=int,
+        metavar="BYTES",
+        help=f"max bytes of a page head read with --generic, default {DEFAULT_HEAD_BYTES}",
+    )
+
+
+def configure_generic(args) -> None:
+    if args.generic_max_bytes:
+        from .sites.generic import Generic
+
+        Generic.max_bytes = args.generic_max_bytes
+
+
+def serve(argv):
+    """
+    miuc serve: keep one process resident and answer newline delimited json requests
+    """
+    parser = argparse.ArgumentParser("miuc serve")
+    parser.add_argument("-t", "--max-time-limit", type=float, default=5, help="max seconds of each lookup")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the title cache")
+    parser.add_argument("--socket", type=str, help="listen on a unix domain socket instead of stdio")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="max concurrent lookups")
+    parser.add_argument(
+        "--offline", action="store_true", help="never open a socket, a title which needs the page is guessed"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, metavar="PORT", help="serve prometheus metrics at http://127.0.0.1:PORT/metrics"
+    )
+    parser.add_argument(
+        "--prefetch-workers", type=int, default=2, help="max background lookups of the prefetch requests"
+    )
+    add_generic_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from .server import Server, serve_metrics, serve_stdio, serve_unix
+    from .session import configure_session
+
+    # one keep-alive connection per worker for each host
+    configure_session(pool_maxsize=args.jobs + args.prefetch_workers)
+    configure_generic(args)
+    server = Server(
+        max_time_limit=args.max_time_limit,
+        use_cache=not args.no_cache,
+        max_workers=args.jobs,
+        generic=args.generic,
+        offline=args.offline,
+        prefetch_workers=args.prefetch_workers,
+    )
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    if args.socket:
+        serve_unix(server, args.socket)
+    else:
+        serve_stdio(server)
+
+
+def rewrite(argv):
+    """
+    miuc rewrite: complete the bare urls of markdown files in place
+    """
+    parser = argparse.ArgumentParser("miuc rewrite")
+    parser.add_argument("-t", "--max-time-limit", type=float, default=5, help="max seconds of each lookup")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the title cache")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="max concurrent lookups")
+    parser.add_argument("--diff", action="store_true", help="print a unified diff instead of changing the files")
+    parser.add_argument(
+        "--offline", action="store_true", help="never open a socket, a title which needs the page is guessed"
+    )
+    add_generic_arguments(parser)
+    parser.add_argument("paths", type=str, nargs="+", help="markdown files or directories")
+    args = parser.parse_args(argv)
+
+    from .rewrite import rewrite as rewrite_markdown
+    from .session import configure_session
+
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+    configure_session(pool_maxsize=args.jobs)
+    configure_generic(args)
+    changed = rewrite_markdown(
+        args.paths,
+        max_time_limit=args.max_time_limit,
+        use_cache=not args.no_cache,
+        jobs=args.jobs,
+        diff=args.diff,
+        generic=args.generic,
+        offline=args.offline,
+    )
+    print(f"{changed} lines {'to change' if args.diff else 'changed'}", file=sys.stderr)
+
+
+AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 24 * 3600, "w": 7 * 24 * 3600}
+
+
+def parse_age(text: str) -> float:
+    """
+    90 or 90s, 30m, 12h, 7d, 2w -> seconds
+    """
+    text = text.strip().lower()
+    unit = AGE_UNITS.get(text[-1:])
+    try:
+        return float(text[:-1] if unit else text) * (unit or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid age {text!r}, use 90s, 30m, 12h, 7d or 2w")
+
+
+def cache(argv):
+    """
+    miuc cache refresh: revalidate the cached titles, an unchanged page answers 304 without a body
+    """
+    parser = argparse.ArgumentParser("miuc cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    refresh = commands.add_parser("refresh", help="revalidate the titles resolved before --older-than")
+    refresh.add_argument(
+        "--older-than", type=parse_age, default=0, metavar="AGE", help="only the titles older than AGE, like 12h or 7d"
+    )
+    refresh.add_argument("-t", "--max-time-limit", type=float, default=5, help="max seconds of each lookup")
+    refresh.add_argument("-j", "--jobs", type=int, default=8, help="max concurrent lookups")
+    args = parser.parse_args(argv)
+
+    from .batch import refresh_cache
+    from .session import configure_session
+
+    configure_session(pool_maxsize=args.jobs)
+    counts = refresh_cache(args.older_than, max_time_limit=args.max_time_limit, jobs=args.jobs)
+    print(", ".join(f"{count} {outcome}" for outcome, count in counts.items()), file=sys.stderr)
+
+
+COMMANDS = {
+    "serve": serve,
+    "rewrite": rewrite,
+    "cache": cache,
+}
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]](sys.argv[2:])
 
     parser = argparse.ArgumentParser("Markdown Intelligence Url Complete")
     parser.add_argument("-s", "--site", action="store_true", help="add site info")
-    parser.add_argument("-t", "--max-time-limit", type=int, default=5, help="max time limit")
+    parser.add_argument("-t", "--max-time-limit", type=float, default=5, help="max seconds of each lookup")
     parser.add_argument("-v", "--version", action="version", version=".".join(map(str, VERSION)))
-    parser.add_argument("url", type=str, help="website url")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the title cache")
+    parser.add_argument("--purge-cache", action="store_true", help="remove all the cached titles")
+    parser.add_argument("-b", "--batch", type=str, metavar="FILE", help="read urls one per line from FILE, - for stdin")
+    parser.add_argument("-j", "--jobs", type=int, default=8, help="max concurrent lookups in batch mode")
+    parser.add_argument("--jsonl", action="store_true", help="print one json object per url in batch mode")
+    parser.add_argument(
+        "--stats", action="store_true", help="print the failing hosts and shared lookups to stderr once done"
+    )
+    parser.add_argument(
+        "--offline", action="store_true", help="never open a socket, a title which needs the page is guessed"
+    )
+    parser.add_argument("--trace", action="store_true", help="print the timing of each lookup as json to stderr")
+    parser.add_argument(
+        "--progressive",
+        action="store_true",
+        help="print the title found without the network right away, then the fetched one on a second line",
+    )
+    add_generic_arguments(parser)
+    parser.add_argument("url", type=str, nargs="?", help="website url")
     args = parser.parse_args()
 
-    markdown_url = parse_url(args.url, max_time_limit=args.max_time_limit)
+    if args.purge_cache:
+        from .cache import get_cache
+
+        get_cache().purge()
+        if args.url is None and args.batch is None:
+            return
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-    print(markdown_url)
+    configure_generic(args)
+    if args.trace:
+        print_traces()
+    if args.batch is not None:
+        batch(args)
+        return
+    if args.url is None:
+        parser.error("the following arguments are required: url")
+
+    if args.progressive and not args.offline:
+        from .web_parser import parse_url_progressive
+
+        # the last line printed is the final title
+        parse_url_progressive(
+            args.url,
+            lambda markdown_url, final: print(markdown_url, flush=True),
+            max_time_limit=args.max_time_limit,
+            use_cache=not args.no_cache,
+            generic=args.generic,
+        )
+    else:
+        markdown_url = parse_url(
+            args.url,
+            max_time_limit=args.max_time_limit,
+            use_cache=not args.no_cache,
+            generic=args.generic,
+            offline=args.offline,
+        )
+        print(markdown_url)
+    if args.stats:
+        print_stats()
+
+
+def print_traces() -> None:
+    """
+    print the trace of every lookup as one json line to stderr
+    """
+    import json
+    import threading
+    from . import tracing
+
+    lock = threading.Lock()
+
+    def write(trace) -> None:
+        line = json.dumps(trace.to_dict(), ensure_ascii=False)
+        with lock:
+            print(line, file=sys.stderr, flush=True)
+
+    tracing.subscribe(write)
+
+
+def print_stats() -> None:
+    """
+    print the failing hosts and shared lookups of this run as json to stderr
+    """
+    import json
+    from .web_parser import stats
+
+    print(json.dumps(stats(), ensure_ascii=False), file=sys.stderr)
+
+
+def batch(args):
+    import json
+    from .batch import read_urls, parse_urls
+    from .web_parser import requires_network
+    from .session import configure_session
+
+    if args.batch == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    else:
+        stream = open(args.batch, "r", encoding="utf-8")
+    configure_session(pool_maxsize=args.jobs)
+    with stream:
+        results = parse_urls(
+            read_urls(stream),
+            max_time_limit=args.max_time_limit,
+            use_cache=not args.no_cache,
+            jobs=args.jobs,
+            generic=args.generic,
+            offline=args.offline,
+        )
+        total = network = 0
+        for url, markdown_url in results:
+            if args.jsonl:
+                print(json.dumps({"url": url, "result": markdown_url}, ensure_ascii=False), flush=True)
+            else:
+                print(markdown_url, flush=True)
+            if args.offline:
+                total += 1
+                network += requires_network(url, use_cache=not args.no_cache, generic=args.generic)
+    if args.offline:
+        print(f"{network} of {total} urls need the network", file=sys.stderr)
+    if args.stats:
+        print_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: fetch the titles of many urls ahead of their lookups
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import os
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+# some sites answer many lookups in one api request. the batch apis call prefetch over a
+# window of urls, each site module puts the titles it got in its PrefetchStore and the
+# processor reads the store before fetching anything itself
+
+# urls read ahead by prefetch_stream to group their lookups. the first window is smaller so
+# the first results do not wait for several bulk requests, each window doubles up to the last
+PREFETCH_WINDOW = 500
+FIRST_WINDOW = 50
+# seconds without a new url after which the urls read so far go on, a slow producer of urls
+# gets its results as it goes instead of once a window is full
+STALL_TIMEOUT = 0.1
+
+# an editor knows the markdown file open long before a paste, and most pastes are links of
+# that file or of the files next to it. BackgroundPrefetcher resolves their uncached urls with
+# a few low priority workers, which hold back while an interactive lookup is in flight, so a
+# later paste or refresh hits a warm cache
+
+
+class PrefetchStore:
+    """
+    titles fetched ahead of their lookup, the oldest are dropped first beyond max_entries
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._titles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, titles: Dict[Hashable, str]) -> None:
+        with self._lock:
+            for key, title in titles.items():
+                self._titles[key] = title
+                self._titles.move_to_end(key)
+            while len(self._titles) > self.max_entries:
+                self._titles.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            return self._titles.get(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._titles.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._titles
+
+
+def uncached(urls: Iterable[str], use_cache: bool = True) -> Iterator[str]:
+    """
+    the urls without a title in the title cache
+    """
+    if not use_cache:
+        yield from urls
+        return
+    from .cache import get_cache
+
+    cache = get_cache()
+    for url in urls:
+        if cache.get(url) is None:
+            yield url
+
+
+def prefetch(urls: Iterable[str], use_cache: bool = True, session=None, max_time_limit: int = 5) -> int:
+    """
+    fetch the titles of the urls which some site answers in bulk, return the number found
+    """
+    from . import arxiv, github
+
+    urls = list(urls)
+    found = 0
+    for site in (arxiv, github):
+        found += site.prefetch(urls, use_cache, session, max_time_limit)
+    return found
+
+
+def read_ahead(urls: Iterable[str], stall_timeout: float = STALL_TIMEOUT) -> Iterator[Optional[str]]:
+    """
+    yield the urls, and None each time the input stalls for stall_timeout seconds
+
+    an input in memory never stalls, any other one is read in a thread
+    """
+    if hasattr(urls, "__len__"):
+        yield from urls
+        return
+    import queue
+
+    end = object()
+    # bounded, a long input is still not read into memory up front
+    buffer = queue.Queue(maxsize=PREFETCH_WINDOW * 2)
+
+    def read() -> None:
+        error = None
+        try:
+            for url in urls:
+                buffer.put(url)
+        except Exception as e:
+            error = e
+        buffer.put((end, error))
+
+    threading.Thread(target=read, name="miuc-read-ahead", daemon=True).start()
+    while True:
+        try:
+            item = buffer.get(timeout=stall_timeout)
+        except queue.Empty:
+            yield None
+            item = buffer.get()
+        if isinstance(item, tuple) and item[0] is end:
+            if item[1] is not None:
+                raise item[1]
+            return
+        yield item
+
+
+def prefetch_stream(
+    urls: Iterable[str],
+    use_cache: bool = True,
+    session=None,
+    max_time_limit: int = 5,
+    window: int = PREFETCH_WINDOW,
+    stalls: bool = False,
+) -> Iterator[Optional[str]]:
+    """
+    yield the urls, the titles of every window of urls are prefetched before they are yielded
+
+    a window is cut short when the input stalls, with stalls a None follows its urls then
+    """
+    size = min(FIRST_WINDOW, window)
+    buffer = []
+    for url in read_ahead(urls):
+        if url is not None:
+            buffer.append(url)
+            if len(buffer) < size:
+                continue
+        if buffer:
+            prefetch(buffer, use_cache, session, max_time_limit)
+            yield from buffer
+            buffer = []
+            size = min(size * 2, window)
+        if url is None and stalls:
+            yield None
+    if buffer:
+        prefetch(buffer, use_cache, session, max_time_limit)
+        yield from buffer
+
+
+def document_urls(path: str = None, text: str = None, siblings: bool = False) -> List[str]:
+    """
+    the unique urls of a markdown file or text, in the order they first appear. with siblings
+    the other markdown files of the directory of path follow
+    """
+    from .rewrite import MARKDOWN_EXTS, LineRewriter, collect_urls
+
+    urls = {}
+    if text is not None:
+
+        def collect(url: str) -> str:
+            urls[url] = None
+            return url
+
+        rewrite_line = LineRewriter(collect)
+        for line in text.splitlines():
+            rewrite_line(line)
+    if path is not None:
+        files = [path]
+        if siblings:
+            directory = os.path.dirname(os.path.abspath(path))
+            files += [
+                os.path.join(directory, file)
+                for file in sorted(os.listdir(directory))
+                if file.endswith(MARKDOWN_EXTS) and not os.path.samefile(os.path.join(directory, file), path)
+            ]
+        urls.update(collect_urls(files))
+    return list(urls)
+
+
+class BackgroundPrefetcher:
+    """
+    resolve urls ahead of their lookup with at most max_workers low priority parse_url calls
+
+    the workers take no new url while an interactive lookup runs under interactive(). the
+    urls of the last document submitted go first, the oldest are dropped beyond max_queued
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_time_limit: float = 5,
+        generic: bool = False,
+        session=None,
+        max_queued: int = 1000,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_time_limit = max_time_limit
+        self.generic = generic
+        self.session = session
+        self.max_queued = max_queued
+        # lookups done in the background
+        self.resolved = 0
+        self._queue = deque()
+        self._queued = set()
+        self._interactive = 0
+        self._busy = 0
+        self._workers = []
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def submit(self, urls: Iterable[str]) -> int:
+        """
+        queue the urls whose title is neither cached nor known without the network, return how many
+        """
+        from .web_parser import requires_network
+
+        with self._cond:
+            queued = set(self._queued)
+        # the cache is read out of the lock, an url queued meanwhile is dropped below
+        urls = [url for url in dict.fromkeys(urls) if url not in queued and requires_network(url, generic=self.generic)]
+        with self._cond:
+            if self._closed:
+                return 0
+            urls = [url for url in urls if url not in self._queued]
+            self._queue.extendleft(reversed(urls))
+            self._queued.update(urls)
+            while len(self._queue) > self.max_queued:
+                self._queued.discard(self._queue.pop())
+            while len(self._workers) < min(self.max_workers, len(self._queue)):
+                worker = threading.Thread(target=self._work, name="miuc-prefetch", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            self._cond.notify_all()
+        return len(urls)
+
+    @contextmanager
+    def interactive(self):
+        """
+        the background lookups take no new url until the code under it is done
+        """
+        with self._cond:
+            self._interactive += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._interactive -= 1
+                self._cond.notify_all()
+
+    def _work(self) -> None:
+        from .web_parser import parse_url
+
+        while True:
+            with self._cond:
+                while not self._closed and (not self._queue or self._interactive):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                url = self._queue.popleft()
+                self._busy += 1
+            try:
+                parse_url(url, self.max_time_limit, session=self.session, generic=self.generic)
+            except Exception:  # pragma: no cover
+                # the lookup is tried again on paste
+                pass
+            with self._cond:
+                self._queued.discard(url)
+                self._busy -= 1
+                self.resolved += 1
+                self._cond.notify_all()
+
+    def pending(self) -> int:
+        """
+        urls queued or being resolved
+        """
+        with self._cond:
+            return len(self._queue) + self._busy
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        wait until the queue is drained, False if timeout seconds went by first
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self) -> None:
+        """
+        drop the queued urls, the lookups in flight finish in their daemon threads
+        """
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._queued.clear()
+            self._cond.notify_all()
@@ -0,0 +1,165 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: per host rate limit and concurrency budget
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import time
+import weakref
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+class AcquireTimeout(TimeoutError):
+    """
+    the rate limit or the requests in flight of a host would keep a request waiting too long
+    """
+
+
+class TokenBucket:
+    """
+    allow `rate` requests per second on average and bursts of `burst` requests
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float = None) -> Optional[float]:
+        """
+        take a token, return the seconds to wait before the request may go
+
+        None when that would be more than max_wait seconds, the token is not taken then
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # the token is borrowed from the future, later callers queue behind
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def refund(self) -> None:
+        """
+        give back the token of a request which was not sent
+        """
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+class HostLimiter:
+    """
+    rate limit and max requests in flight of one host
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1, max_in_flight: int = 4) -> None:
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_in_flight = max_in_flight
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._async_semaphores = weakref.WeakKeyDictionary()
+
+    @contextmanager
+    def acquire(self, timeout: float = None):
+        """
+        wait for a slot and a token, AcquireTimeout if that would take more than timeout seconds
+        """
+        start = time.monotonic()
+        if not self._semaphore.acquire(timeout=timeout):
+            raise AcquireTimeout(f"no request slot within {timeout:.2f}s")
+        try:
+            if self.bucket is not None:
+                max_wait = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+                wait = self.bucket.reserve(max_wait)
+                if wait is None:
+                    raise AcquireTimeout(f"rate limited for more than {max_wait:.2f}s")
+                time.sleep(wait)
+            yield
+        finally:
+            self._semaphore.release()
+
+    def _async_semaphore(self) -> "asyncio.Semaphore":
+        import asyncio
+
+        # asyncio semaphores belong to the event loop
+        loop = asyncio.get_event_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._async_semaphores[loop] = semaphore
+        return semaphore
+
+    def acquire_async(self):
+        """
+        the `async with` counterpart of acquire
+        """
+        return _AsyncAcquire(self)
+
+
+class _AsyncAcquire:
+    def __init__(self, limiter: HostLimiter) -> None:
+        self.limiter = limiter
+        self.semaphore = None
+
+    async def __aenter__(self):
+        import asyncio
+
+        self.semaphore = self.limiter._async_semaphore()
+        await self.semaphore.acquire()
+        try:
+            if self.limiter.bucket is not None:
+                try:
+                    await asyncio.sleep(self.limiter.bucket.reserve())
+                except BaseException:
+                    # cancelled by the deadline while waiting for the token
+                    self.limiter.bucket.refund()
+                    raise
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class HostLimits:
+    """
+    the limiter of each host, created from the settings of the first processor fetching from it
+    """
+
+    def __init__(self) -> None:
+        self.limiters = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, rate: Optional[float], burst: int = 1, max_in_flight: int = 4) -> None:
+        """
+        override the limits of a host
+        """
+        with self._lock:
+            self.limiters[host] = HostLimiter(rate, burst, max_in_flight)
+
+    def get(self, url: str, processor=None) -> HostLimiter:
+        host = urlsplit(url).netloc
+        with self._lock:
+            limiter = self.limiters.get(host)
+            if limiter is None:
+                if processor is None:
+                    limiter = HostLimiter(None)
+                else:
+                    limiter = HostLimiter(processor.rate_limit, processor.rate_burst, processor.max_in_flight)
+                self.limiters[host] = limiter
+            return limiter
+
+
+host_limits = HostLimits()
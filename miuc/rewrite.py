@@ -0,0 +1,172 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: complete the urls of markdown files in place
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator
+from .batch import parse_urls
+
+MARKDOWN_EXTS = (".md", ".markdown")
+IGNORE_DIRS = ("node_modules",)
+
+# `code` | [url](url) | bare url
+TOKEN_RE = re.compile(
+    r"(?P<code>`+).*?(?P=code)"
+    r"|(?P<image>!?)\[(?P<text>[^\]\n]*)\]\((?P<link>https?://[^)\s]+)\)"
+    r"|(?<![\w(<\[\"'=/])(?P<bare>https?://[^\s<>\"'`()\[\]]*[^\s<>\"'`()\[\].,;:!?])"
+)
+# [id]: https://... is a link reference definition, leave it alone
+REFERENCE_RE = re.compile(r"^\s{0,3}\[[^\]]+\]:\s")
+FENCE_RE = re.compile(r"^\s{0,3}(?P<fence>```|~~~)")
+
+
+def iter_markdown_files(paths: Iterable[str]) -> Iterator[str]:
+    """
+    markdown files of the paths, directories are walked recursively
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in IGNORE_DIRS)
+                for file in sorted(files):
+                    if file.endswith(MARKDOWN_EXTS):
+                        yield os.path.join(root, file)
+        else:
+            yield path
+
+
+class LineRewriter:
+    """
+    call replace(url) for each bare url and [url](url) link of a line, urls inside code are kept
+
+    lines are fed one by one in file order, the state of fenced code blocks is tracked
+    """
+
+    def __init__(self, replace: Callable[[str], str]) -> None:
+        self.replace = replace
+        self.fence = None
+
+    def __call__(self, line: str) -> str:
+        res = FENCE_RE.match(line)
+        if res:
+            if self.fence is None:
+                self.fence = res.group("fence")
+            elif self.fence == res.group("fence"):
+                self.fence = None
+            return line
+        if self.fence is not None or REFERENCE_RE.match(line):
+            return line
+        return TOKEN_RE.sub(self._replace_token, line)
+
+    def _replace_token(self, res: re.Match) -> str:
+        if res.group("bare"):
+            return self.replace(res.group("bare"))
+        if res.group("link") and not res.group("image") and res.group("text") == res.group("link"):
+            return self.replace(res.group("link"))
+        return res.group(0)
+
+
+def collect_urls(files: Iterable[str]) -> Dict[str, None]:
+    """
+    the unique urls to complete in the files, in the order they first appear
+    """
+    urls = {}
+
+    def collect(url: str) -> str:
+        urls[url] = None
+        return url
+
+    for file in files:
+        rewrite_line = LineRewriter(collect)
+        with open(file, "r", encoding="utf-8", newline="") as f:
+            for line in f:
+                rewrite_line(line)
+    return urls
+
+
+def rewrite(
+    paths: Iterable[str],
+    max_time_limit: float = 5,
+    use_cache: bool = True,
+    jobs: int = 8,
+    diff: bool = False,
+    output=None,
+    generic: bool = False,
+    offline: bool = False,
+) -> int:
+    """
+    complete the urls of the markdown files, return the number of changed lines
+
+    every file is read twice as a stream: once to collect the urls, resolved concurrently
+    and only once each, then to write the new content to a temporary file which replaces
+    the original. with diff=True a unified diff is written to output instead
+    """
+    output = output or sys.stdout
+    files = list(iter_markdown_files(paths))
+    urls = collect_urls(files)
+    titles = dict(
+        parse_urls(
+            urls, max_time_limit=max_time_limit, use_cache=use_cache, jobs=jobs, generic=generic, offline=offline
+        )
+    )
+
+    changed = 0
+    for file in files:
+        if diff:
+            changed += _diff_file(file, titles, output)
+        else:
+            changed += _rewrite_file(file, titles)
+    return changed
+
+
+def _rewrite_file(file: str, titles: Dict[str, str]) -> int:
+    changed = 0
+    directory = os.path.dirname(os.path.abspath(file))
+    with open(file, "r", encoding="utf-8", newline="") as f, tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", dir=directory, prefix=".miuc-", delete=False
+    ) as temp:
+        rewrite_line = LineRewriter(lambda url: titles.get(url, url))
+        for line in f:
+            new_line = rewrite_line(line)
+            if new_line != line:
+                changed += 1
+            temp.write(new_line)
+    if changed:
+        shutil.copymode(file, temp.name)
+        os.replace(temp.name, file)
+    else:
+        os.remove(temp.name)
+    return changed
+
+
+def _diff_file(file: str, titles: Dict[str, str], output) -> int:
+    """
+    the rewrite never adds or removes a line, so the diff is streamed as one hunk per changed line
+    """
+    changed = 0
+    rewrite_line = LineRewriter(lambda url: titles.get(url, url))
+    with open(file, "r", encoding="utf-8", newline="") as f:
+        for number, line in enumerate(f, 1):
+            new_line = rewrite_line(line)
+            if new_line == line:
+                continue
+            if changed == 0:
+                output.write(f"--- {file}\n+++ {file}\n")
+            changed += 1
+            output.write(f"@@ -{number} +{number} @@\n-{_diff_line(line)}+{_diff_line(new_line)}")
+    return changed
+
+
+def _diff_line(line: str) -> str:
+    if line.endswith("\n"):
+        return line
+    return line + "\n\\ No newline at end of file\n"
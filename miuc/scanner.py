@@ -0,0 +1,330 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: single pass html scanner for the elements a processor wants
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import re
+import codecs
+from typing import Dict, Optional
+from .stream import DEFAULT_MAX_BYTES
+
+# the tokenizer never backtracks over the page: text is skipped with str.find, a tag is
+# matched from its `<` with a regex whose alternatives never overlap, and script, style
+# and comments are skipped by searching their terminator from where the last search ended.
+# values are returned raw, html entities are left for Processor.__call__ to unescape
+
+TAG_RE = re.compile(r"<(/?)([a-zA-Z][^\s/>]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>")
+ATTR_RE = re.compile(r"([^\s=/>\"']+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+)))?")
+WHITESPACE_RE = re.compile(r"\s+")
+COMMENT_END_RE = re.compile(r"-->")
+DECLARATION_END_RE = re.compile(r">")
+RAW_TEXT_END_RE = {
+    "script": re.compile(r"</script\s*>", re.I),
+    "style": re.compile(r"</style\s*>", re.I),
+}
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# a `<` followed by more than this without a complete tag is taken as text, an unclosed
+# quote in a broken tag would otherwise make the tag regex run to the end of the page
+MAX_TAG_LENGTH = 16 * 1024
+SEEK_TAIL = 32
+
+
+class Target:
+    """
+    something a processor wants from a page, matched against every start tag
+
+    tag, cls (one of the classes), id and attrs (exact values) must all match when given
+    """
+
+    def __init__(self, tag: str = None, cls: str = None, id: str = None, attrs: Dict[str, str] = None) -> None:
+        self.tag = tag
+        self.cls = cls
+        self.id = id
+        self.attrs = attrs or {}
+        self.key = (self.__class__.__name__, tag, cls, id, tuple(sorted(self.attrs.items())))
+
+    def matches(self, tag: str, attrs: Dict[str, str]) -> bool:
+        if self.tag is not None and self.tag != tag:
+            return False
+        if self.cls is not None and self.cls not in attrs.get("class", "").split():
+            return False
+        if self.id is not None and self.id != attrs.get("id"):
+            return False
+        for name, value in self.attrs.items():
+            if attrs.get(name) != value:
+                return False
+        return True
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Target) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"{self.key[0]}{self.key[1:]}"
+
+
+class Element(Target):
+    """
+    the text of the first matching element, nested tags are dropped and whitespace is collapsed
+    """
+
+
+class Attribute(Target):
+    """
+    the value of attribute `name` of the first matching element which has it
+    """
+
+    def __init__(self, name: str, tag: str = None, cls: str = None, id: str = None, attrs: Dict[str, str] = None):
+        super().__init__(tag, cls, id, attrs)
+        self.name = name
+        self.key += (name,)
+
+    def value(self, attrs: Dict[str, str]) -> Optional[str]:
+        return attrs.get(self.name)
+
+
+class Meta(Attribute):
+    """
+    the content of <meta name="..."> or <meta property="...">
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__("content", tag="meta")
+        self.meta_name = name
+        self.key += (name,)
+
+    def matches(self, tag: str, attrs: Dict[str, str]) -> bool:
+        return tag == "meta" and self.meta_name in (attrs.get("name"), attrs.get("property"))
+
+
+TITLE = Element("title")
+OG_TITLE = Meta("og:title")
+
+
+class Targets(tuple):
+    """
+    the targets of one fetch, pass it to Processor.fetch in place of a regex
+
+    <title> and og:title are always collected, the scan stops once the targets are all found,
+    or with head_only=True at the end of <head> as well
+    """
+
+    def __new__(cls, *targets: Target, head_only: bool = False):
+        self = super().__new__(cls, targets)
+        self.head_only = head_only
+        return self
+
+    def open_search(self, encoding: str = None, max_bytes: int = DEFAULT_MAX_BYTES) -> "ScanSearch":
+        return ScanSearch(self, encoding, max_bytes)
+
+
+class Scanner:
+    """
+    feed the text of a page piece by piece, the values found are kept in results
+    """
+
+    def __init__(self, targets: Targets) -> None:
+        self.targets = tuple(targets)
+        self.head_only = getattr(targets, "head_only", False)
+        # set at </head> or <body> with head_only
+        self.finished = False
+        self.watch = self.targets + tuple(t for t in (TITLE, OG_TITLE) if t not in self.targets)
+        # attributes are only parsed for the tags some target may match
+        self.tags = None if any(t.tag is None for t in self.watch) else {t.tag for t in self.watch}
+        # outside of the elements being collected, jump from one interesting `<` to the next
+        self.seek_re = None
+        if self.tags is not None:
+            names = self.tags | set(RAW_TEXT_END_RE) | ({"body", "/head"} if self.head_only else set())
+            names = "|".join(re.escape(tag) for tag in sorted(names))
+            self.seek_re = re.compile(rf"<(?:!|\?|(?:{names})(?=[\s/>]))", re.I)
+        self.results = {}
+        self.buffer = ""
+        # [target, tag, depth, parts] of the elements whose text is being collected
+        self.captures = []
+        # (regex, tag) of the comment, declaration or raw text being skipped
+        self.skip = None
+
+    def done(self) -> bool:
+        return self.finished or all(target in self.results for target in self.targets)
+
+    def feed(self, text: str) -> bool:
+        """
+        return True once every target is found
+        """
+        self.buffer += text
+        self._scan(final=False)
+        return self.done()
+
+    def close(self) -> Dict[Target, str]:
+        if not self.done():
+            self._scan(final=True)
+        return self.results
+
+    def _scan(self, final: bool) -> None:
+        buffer = self.buffer
+        pos = 0
+        size = len(buffer)
+        while pos < size:
+            if self.skip is not None:
+                regex, tag = self.skip
+                res = regex.search(buffer, pos)
+                if res is None:
+                    # only the end which may hold the start of the terminator is kept
+                    pos = max(pos, size - 16)
+                    break
+                self.skip = None
+                pos = res.end()
+                if tag is not None:
+                    self._end_tag(tag)
+                continue
+
+            if self.seek_re is not None and not self.captures:
+                res = self.seek_re.search(buffer, pos)
+                if res is None:
+                    # the end may hold the start of a tag
+                    pos = max(pos, size - SEEK_TAIL)
+                    break
+                pos = res.start()
+
+            lt = buffer.find("<", pos)
+            if lt == -1:
+                self._text(buffer[pos:])
+                pos = size
+                break
+            if lt > pos:
+                self._text(buffer[pos:lt])
+                pos = lt
+
+            if buffer.startswith("<!--", pos):
+                self.skip = (COMMENT_END_RE, None)
+                pos += 4
+                continue
+            if buffer.startswith("<!", pos) or buffer.startswith("<?", pos):
+                self.skip = (DECLARATION_END_RE, None)
+                pos += 2
+                continue
+            res = TAG_RE.match(buffer, pos, pos + MAX_TAG_LENGTH)
+            if res is None:
+                if pos + 1 >= size or (not final and size - pos < MAX_TAG_LENGTH and _may_be_tag(buffer, pos)):
+                    # wait for the rest of the tag
+                    break
+                self._text("<")
+                pos += 1
+                continue
+            pos = res.end()
+            tag = res.group(2).lower()
+            if res.group(1):
+                self._end_tag(tag)
+            else:
+                self._start_tag(tag, res.group(3))
+                if tag in RAW_TEXT_END_RE:
+                    self.skip = (RAW_TEXT_END_RE[tag], tag)
+            if self.done():
+                break
+        self.buffer = buffer[pos:]
+
+    def _start_tag(self, tag: str, attrs_text: str) -> None:
+        if self.head_only and tag == "body":
+            self.finished = True
+            return
+        for capture in self.captures:
+            if capture[1] == tag:
+                capture[2] += 1
+        if self.tags is not None and tag not in self.tags:
+            return
+        attrs = None
+        for target in self.watch:
+            if target in self.results:
+                continue
+            if attrs is None:
+                attrs = _parse_attrs(attrs_text)
+            if not target.matches(tag, attrs):
+                continue
+            if isinstance(target, Attribute):
+                value = target.value(attrs)
+                if value is not None:
+                    self.results[target] = value
+            elif not any(capture[0] == target for capture in self.captures):
+                if tag in VOID_ELEMENTS or attrs_text.rstrip().endswith("/"):
+                    self.results[target] = ""
+                else:
+                    self.captures.append([target, tag, 1, []])
+
+    def _end_tag(self, tag: str) -> None:
+        if self.head_only and tag == "head":
+            self.finished = True
+        for capture in self.captures[:]:
+            if capture[1] != tag:
+                continue
+            capture[2] -= 1
+            if capture[2] == 0:
+                self.captures.remove(capture)
+                self.results[capture[0]] = WHITESPACE_RE.sub(" ", "".join(capture[3])).strip()
+
+    def _text(self, text: str) -> None:
+        for capture in self.captures:
+            capture[3].append(text)
+
+
+def _may_be_tag(buffer: str, pos: int) -> bool:
+    # `<` then a letter or `/`, the rest of the tag may be in the next chunk
+    return buffer[pos + 1].isalpha() or buffer[pos + 1] == "/"
+
+
+def _parse_attrs(text: str) -> Dict[str, str]:
+    attrs = {}
+    for res in ATTR_RE.finditer(text):
+        name = res.group(1).lower()
+        if name not in attrs:
+            value = res.group(2)
+            if value is None:
+                value = res.group(3) if res.group(3) is not None else res.group(4)
+            attrs[name] = value if value is not None else ""
+    return attrs
+
+
+class ScanSearch:
+    """
+    the Scanner counterpart of stream.IncrementalSearch, decode the chunks and scan them
+    """
+
+    def __init__(self, targets: Targets, encoding: str = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.scanner = Scanner(targets)
+        self.max_bytes = max_bytes
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")
+        self.decoder = decoder(errors="replace")
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        return True once the targets are found or max_bytes is reached
+        """
+        self.size += len(chunk)
+        if self.scanner.feed(self.decoder.decode(chunk)):
+            return True
+        return self.size >= self.max_bytes
+
+    def close(self) -> Dict[Target, str]:
+        """
+        the value found for each target, <title> and og:title included
+        """
+        self.scanner.feed(self.decoder.decode(b"", final=True))
+        return self.scanner.close()
+
+
+def scan(text: str, *targets: Target) -> Dict[Target, str]:
+    """
+    scan a whole page at once
+    """
+    scanner = Scanner(Targets(*targets))
+    scanner.feed(text)
+    return scanner.close()
@@ -0,0 +1,250 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: long running miuc process serving newline delimited json
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import os
+import sys
+import json
+import stat
+import threading
+import socketserver
+from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from .web_parser import parse_url, provisional_title, stats
+from .prefetch import BackgroundPrefetcher, document_urls
+from . import tracing
+
+# request  {"id": 1, "method": "parse", "url": "https://github.com/luzhixing12345/miuc"}
+# response {"id": 1, "result": "[miuc](https://github.com/luzhixing12345/miuc)"}
+#          {"id": 1, "error": "..."}
+# "max_time_limit", "generic" and "offline" of a parse request override the server settings
+# {"id": 2, "method": "stats"} answers the failing hosts and the lookups shared, see web_parser.stats
+# a parse request with "progressive": true is answered right away with the title found without the
+# network, {"id": 1, "result": "...", "final": false}, then with the fetched one and "final": true.
+# the first answer is final already when the title needs no fetch, and is the only one then
+# with "trace": true the answer of a parse request has the phases of its lookup, see tracing.Trace.
+# {"id": 3, "method": "metrics"} answers the metrics of the lookups in the prometheus text format,
+# `miuc serve --metrics-port PORT` serves them over http at /metrics as well
+# {"id": 4, "method": "prefetch", "path": "notes.md", "siblings": true} (or "text": "...") answers
+# {"queued": n} at once and resolves the uncached urls of the document in the background, the
+# background lookups hold back while a parse request is in flight
+
+
+class Server:
+    """
+    answer the requests of one or more clients, the lookups run in a thread pool
+    so a slow site does not block the other requests
+    """
+
+    def __init__(
+        self,
+        max_time_limit: float = 5,
+        use_cache: bool = True,
+        max_workers: int = 8,
+        generic: bool = False,
+        offline: bool = False,
+        prefetch_workers: int = 2,
+    ):
+        self.max_time_limit = max_time_limit
+        self.use_cache = use_cache
+        self.generic = generic
+        self.offline = offline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.prefetcher = BackgroundPrefetcher(prefetch_workers, max_time_limit, generic)
+        self.methods = {
+            "parse": self.parse,
+            "ping": self.ping,
+            "stats": self.stats,
+            "metrics": self.metrics,
+            "prefetch": self.prefetch,
+        }
+
+    def parse(self, request: dict) -> str:
+        url = request["url"]
+        max_time_limit = request.get("max_time_limit", self.max_time_limit)
+        generic = request.get("generic", self.generic)
+        offline = request.get("offline", self.offline)
+        with self.prefetcher.interactive():
+            return parse_url(
+                url, max_time_limit=max_time_limit, use_cache=self.use_cache, generic=generic, offline=offline
+            )
+
+    def prefetch(self, request: dict) -> dict:
+        # the titles resolved in the background are only of use through the cache
+        if self.offline or not self.use_cache:
+            return {"queued": 0}
+        urls = document_urls(request.get("path"), request.get("text"), request.get("siblings", False))
+        return {"queued": self.prefetcher.submit(urls)}
+
+    def provisional(self, request: dict) -> Optional[dict]:
+        """
+        the first answer of a progressive parse request, None when the title needs no fetch
+        """
+        if not request.get("progressive") or request.get("method", "parse") != "parse":
+            return None
+        if request.get("offline", self.offline):
+            return None
+        try:
+            markdown_url, final = provisional_title(
+                request["url"], use_cache=self.use_cache, generic=request.get("generic", self.generic)
+            )
+        except Exception:  # pragma: no cover
+            # the full lookup reports the error
+            return None
+        if final:
+            return None
+        return {"id": request.get("id"), "result": markdown_url, "final": False}
+
+    def ping(self, request: dict) -> str:
+        return "pong"
+
+    def stats(self, request: dict) -> dict:
+        result = stats()
+        result["prefetch"] = {"pending": self.prefetcher.pending(), "resolved": self.prefetcher.resolved}
+        return result
+
+    def metrics(self, request: dict) -> str:
+        return tracing.metrics.render()
+
+    def handle(self, request: dict) -> dict:
+        response = {"id": request.get("id")}
+        method = self.methods.get(request.get("method", "parse"))
+        if method is None:
+            response["error"] = f"unknown method {request.get('method')}"
+            return response
+        try:
+            if request.get("trace") and method == self.parse:
+                with tracing.lookup_scope(request["url"]) as trace:
+                    response["result"] = method(request)
+                response["trace"] = trace.to_dict()
+            else:
+                response["result"] = method(request)
+        except Exception as e:  # pragma: no cover
+            response["error"] = f"{e.__class__.__name__}: {e}"
+        if request.get("progressive"):
+            response["final"] = True
+        return response
+
+    def handle_line(self, line: bytes, write) -> Optional[Future]:
+        """
+        decode one request line and write the response by write(dict) once it is done
+        """
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            request = json.loads(line.decode("utf-8"))
+            if not isinstance(request, dict):
+                raise ValueError("request should be a json object")
+        except ValueError as e:
+            write({"id": None, "error": f"invalid request: {e}"})
+            return None
+        future = self.executor.submit(self._respond, request, write)
+        future.add_done_callback(lambda f: write(f.result()))
+        return future
+
+    def _respond(self, request: dict, write) -> dict:
+        # on a worker as well, the cache is read off the reader thread, the provisional
+        # answer is written before the lookup starts
+        provisional = self.provisional(request)
+        if provisional is not None:
+            write(provisional)
+        return self.handle(request)
+
+    def shutdown(self) -> None:
+        self.prefetcher.close()
+        self.executor.shutdown(wait=True)
+
+
+def _writer(stream):
+    lock = threading.Lock()
+
+    def write(response: dict) -> None:
+        data = (json.dumps(response) + "\n").encode("utf-8")
+        with lock:
+            try:
+                stream.write(data)
+                stream.flush()
+            except (OSError, ValueError):  # pragma: no cover
+                # the client has gone
+                pass
+
+    return write
+
+
+def serve_stdio(server: Server, stdin=None, stdout=None) -> None:
+    """
+    read requests from stdin until EOF, write responses to stdout
+    """
+    stdin = stdin or sys.stdin.buffer
+    write = _writer(stdout or sys.stdout.buffer)
+    for line in stdin:
+        server.handle_line(line, write)
+    server.shutdown()
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1"):
+    """
+    serve tracing.metrics at http://host:port/metrics from a daemon thread, return the http server
+    """
+    import http.server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = tracing.metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    http_server = http.server.ThreadingHTTPServer((host, port), Handler)
+    http_server.daemon_threads = True
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    return http_server
+
+
+def _remove_socket(path: str) -> None:
+    # the socket left by a previous server, never a file given by mistake
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    os.remove(path)
+
+
+def serve_unix(server: Server, path: str) -> None:  # pragma: no cover
+    """
+    listen on a unix domain socket, every connection is a stream of requests
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            write = _writer(self.wfile)
+            futures = [server.handle_line(line, write) for line in self.rfile]
+            # keep the connection open until every response is written
+            wait([future for future in futures if future is not None])
+
+    _remove_socket(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as unix_server:
+        unix_server.daemon_threads = True
+        try:
+            unix_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            _remove_socket(path)
+            server.shutdown()
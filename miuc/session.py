@@ -0,0 +1,67 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: shared http session with per host connection pools
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import threading
+
+# number of hosts whose connection pool is kept
+DEFAULT_POOL_CONNECTIONS = 32
+# number of idle keep-alive connections kept for one host
+DEFAULT_POOL_MAXSIZE = 8
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, max_retries: int = 0
+) -> "requests.Session":
+    """
+    a requests session keeping at most pool_maxsize connections alive for each of pool_connections hosts
+    """
+    # requests is the slowest import of miuc, only load it once a page is fetched
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """
+    the session shared by all the processors of this process
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def set_session(session: "requests.Session") -> None:
+    """
+    replace the shared session, the previous one is closed
+    """
+    global _session
+    with _session_lock:
+        if _session is not None and _session is not session:
+            _session.close()
+        _session = session
+
+
+def configure_session(**kwargs) -> "requests.Session":
+    """
+    rebuild the shared session, see create_session for the arguments
+    """
+    session = create_session(**kwargs)
+    set_session(session)
+    return session
@@ -0,0 +1,83 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: coalesce the concurrent lookups of the same url
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    run one call of each key at a time, the callers of a key already in flight wait for its result
+
+    nothing is remembered once the call returns, the title cache is there for that
+    """
+
+    def __init__(self) -> None:
+        self._calls = {}
+        self._lock = threading.Lock()
+        # calls answered by another caller's result
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable, *args, timeout: float = None) -> Tuple[Any, bool]:
+        """
+        return (result of func(*args), whether it was shared with a call in flight)
+
+        a caller waiting for a call in flight gives up after timeout seconds with TimeoutError
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+            if shared:
+                self.shared += 1
+            else:
+                future = self._calls[key] = Future()
+        if shared:
+            return future.result(timeout), True
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+
+class AsyncSingleFlight:
+    """
+    the asyncio counterpart of SingleFlight, calls are coalesced on each event loop
+    """
+
+    def __init__(self) -> None:
+        self._calls = weakref.WeakKeyDictionary()
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable, *args, timeout: float = None) -> Tuple[Any, bool]:
+        """
+        return (result of await func(*args), whether it was shared with a call in flight)
+
+        a caller which is cancelled or gives up after timeout seconds does not cancel the call the
+        others wait for
+        """
+        import asyncio
+
+        calls = self._calls.setdefault(asyncio.get_event_loop(), {})
+        task = calls.get(key)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+        else:
+            task = calls[key] = asyncio.ensure_future(func(*args))
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        return await asyncio.wait_for(asyncio.shield(task), timeout), shared
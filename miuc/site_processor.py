@@ -1,21 +1,33 @@
 """
 *Copyright (c) 2023 All rights reserved
-*@description: page processors for specific sites
+*@description: the base of the page processors, the processor of each site is in miuc.sites
 *@author: Zhixing Lu
 *@date: 2023-06-20
 *@email: luzhixing12345@163.com
 *@Github: luzhixing12345
 """
 
+from __future__ import annotations
+
 import re
-import requests
-import urllib
-import json
+import time
+import threading
+import contextvars
+from typing import TYPE_CHECKING
 from .utils import guess_name_by_url
+from .session import get_session
+from .stream import iter_response, read_text, DEFAULT_MAX_BYTES, DEFAULT_CHUNK_SIZE
+from .ratelimit import host_limits, AcquireTimeout
+from . import deadline, tracing
+from .breaker import host_breakers, is_host_failure
+from .scanner import Target, Targets
 from re import Match
 from urllib.parse import unquote
 import html
 
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
 DEBUG = False
 # DEBUG = True
 
@@ -28,11 +40,129 @@ class Error(Exception):
         self.message = message
 
 
+class OfflineError(Error):
+    """
+    raised by fetch in offline mode, the title needs a page
+    """
+
+
+class StatusError(Error):
+    """
+    the page was answered with another status than 200
+    """
+
+    def __init__(self, url: str, class_name: str, status_code: int) -> None:
+        super().__init__(url, class_name, f"connect {url} failed: status code [{status_code}]")
+        self.status_code = status_code
+
+
+class NotModified(Error):
+    """
+    the page answered 304 to the validators of its cached title
+    """
+
+
+class DeadlineExceeded(Error):
+    """
+    raised by fetch when the deadline of the lookup is over, see miuc.deadline
+    """
+
+
+class CircuitOpenError(Error):
+    """
+    raised by fetch while the host keeps failing, the title is guessed without waiting for it
+    """
+
+
+def is_url_failure(error: Exception) -> bool:
+    """
+    whether a failed lookup is the url's fault, a host skipped by its breaker, rate limited past
+    the deadline or a lookup out of time is not
+    """
+    return not isinstance(error, (CircuitOpenError, DeadlineExceeded))
+
+
+class UrlPattern(str):
+    """
+    an entry of urls_re which declares whether the page is fetched for the urls it matches
+
+    network is False when the title comes from the url alone, True when parse always fetches
+    and None when it depends on the url. a plain str entry is taken as None
+    """
+
+    def __new__(cls, pattern: str, network: bool = None):
+        self = super().__new__(cls, pattern)
+        self.network = network
+        return self
+
+
+def url_only(pattern: str) -> UrlPattern:
+    return UrlPattern(pattern, network=False)
+
+
+def needs_page(pattern: str) -> UrlPattern:
+    return UrlPattern(pattern, network=True)
+
+
+def may_need_page(pattern: str) -> UrlPattern:
+    return UrlPattern(pattern, network=None)
+
+
+# the lookup each thread or asyncio task is running, see Processor.__call__
+_lookup = contextvars.ContextVar("miuc_processor_lookup", default=None)
+_shared_lock = threading.Lock()
+
+
+class Context:
+    """
+    the state of one lookup of a processor
+
+    one processor of each site serves every lookup, parse and format keep what they find about
+    the url here and read it back as attributes of the processor. a processor declares its own
+    fields in the __slots__ of its Context
+    """
+
+    # max_time_limit, _session and offline default to the ones the processor was built with.
+    # with offline the title is resolved from the url only, fetch raises OfflineError instead
+    # of opening a socket. validators, {page url: cache.Validators}, makes the fetch of these
+    # pages conditional, fetch raises NotModified when one answers 304
+    __slots__ = ("processor", "_url", "max_time_limit", "_session", "offline", "validators", "article_name")
+    # the slots of the class and of its bases
+    fields = __slots__
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.__base__.fields + tuple(cls.__dict__.get("__slots__", ()))
+
+    def __init__(self, processor: "Processor", url: str) -> None:
+        for name in self.fields:
+            setattr(self, name, None)
+        self.processor = processor
+        self._url = url
+
+
 class Processor:
-    def __init__(self, max_time_limit: int = 5) -> None:
+    Context = Context
+    # the names which are read from and written to the Context of the lookup
+    _fields = frozenset(Context.fields)
+    # seconds a resolved title of this site stays in the title cache
+    cache_ttl = 7 * 24 * 3600
+    # stop downloading a page after max_bytes, the title is always near the top
+    max_bytes = DEFAULT_MAX_BYTES
+    chunk_size = DEFAULT_CHUNK_SIZE
+    # requests per second and burst to the host of this site, None for no limit
+    rate_limit = 8
+    rate_burst = 8
+    # requests to the host of this site in flight at the same time
+    max_in_flight = 8
+    # failures in a row before the host is skipped, and seconds it is skipped for
+    failure_threshold = 5
+    cool_down = 30
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
         self.class_name = self.__class__.__name__
-        self._url = None
-        self.max_time_limit = max_time_limit
+        # the fields of the Context outside a lookup, and the defaults of every lookup
+        self._defaults = {"max_time_limit": max_time_limit, "_session": session, "offline": False}
         self.urls_re = [
             # ...
         ]
@@ -49,15 +179,72 @@ class Processor:
             "Accept": "*/*"
         }
 
-        self.article_name = None
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.Context.fields)
+
+    @classmethod
+    def shared(cls) -> "Processor":
+        """
+        the processor of the class which serves every lookup, built on first use
+        """
+        processor = cls.__dict__.get("_shared")
+        if processor is None:
+            with _shared_lock:
+                processor = cls.__dict__.get("_shared")
+                if processor is None:
+                    processor = cls._shared = cls()
+        return processor
+
+    def __getattr__(self, name: str):
+        # only called for the names which are not attributes of the processor
+        if name in type(self)._fields:
+            context = _lookup.get()
+            if context is not None and context.processor is self:
+                return getattr(context, name)
+            return self.__dict__["_defaults"].get(name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __setattr__(self, name: str, value) -> None:
+        if name in type(self)._fields:
+            context = _lookup.get()
+            if context is not None and context.processor is self:
+                setattr(context, name, value)
+            else:
+                self._defaults[name] = value
+            return
+        object.__setattr__(self, name, value)
+
+    def __call__(self, url: str, max_time_limit: float = None, session=None, offline: bool = None, **fields) -> str:
+        """
+        return the markdown url of url
 
-    def __call__(self, url: str):
-        self._url: str = url
-        self.headers['Referer'] = self._url
+        the lookup keeps its state in a new Context, so one processor can run lookups from
+        several threads or asyncio tasks at the same time. the arguments override the defaults
+        of the processor for this lookup
+        """
+        context = self.Context(self, url)
+        for name, value in self._defaults.items():
+            setattr(context, name, value)
+        if max_time_limit is not None:
+            context.max_time_limit = max_time_limit
+        if session is not None:
+            context._session = session
+        if offline is not None:
+            context.offline = offline
+        for name, value in fields.items():
+            setattr(context, name, value)
+        token = _lookup.set(context)
+        try:
+            return self._markdown_url()
+        finally:
+            _lookup.reset(token)
+
+    def _markdown_url(self) -> str:
         if len(self.urls_re) == 0:  # pragma: no cover
             self.error("finish urls_re in your processor class")
-        for url_re in self.urls_re:
-            res = re.compile(url_re).match(self._url)
+        for url_re in self.compiled_urls_re():
+            res = url_re.match(self._url)
             if res:
                 self.parse(res)
                 break
@@ -68,6 +255,38 @@ class Processor:
         title = html.unescape(title)
         return f"[{title}]({self._url})"
 
+    @property
+    def session(self) -> requests.Session:
+        """
+        connections are pooled per host in the session shared by all the processors
+
+        it is only created on the first fetch, a title parsed from the url never loads requests
+        """
+        if self._session is None:
+            self._session = get_session()
+        return self._session
+
+    def compiled_urls_re(self) -> list:
+        """
+        urls_re compiled once for each processor class
+        """
+        cls = self.__class__
+        compiled = cls.__dict__.get("_compiled_urls_re")
+        if compiled is None:
+            compiled = [re.compile(url_re) for url_re in self.urls_re]
+            cls._compiled_urls_re = compiled
+        return compiled
+
+    def url_network(self, url: str):
+        """
+        what the pattern matching the url declares: False if the title comes from the url alone,
+        True if the page is always fetched and None if it depends on the url
+        """
+        for url_re, compiled in zip(self.urls_re, self.compiled_urls_re()):
+            if compiled.match(url):
+                return getattr(url_re, "network", None)
+        return None
+
     def parse(self, res: Match) -> str:  # pragma: no cover
         """
         override this function for a specific site processor
@@ -91,1049 +310,169 @@ class Processor:
         # print(self.url)
         raise Error(self._url, self.class_name, message=msg)
 
-    def get_html(self):
+    def fetch(self, url: str, headers: dict = None, pattern: re.Pattern = None) -> str:
         """
-        call this function if could not parse only by url
-        """
-        response = requests.get(self._url, headers=self.headers, timeout=self.max_time_limit, allow_redirects=True)
-        if response.status_code != 200:
-            self.error(f"connect {self._url} failed: status code [{response.status_code}]")  # pragma: no cover
-        
-        return response.text
-
-    def get_element_match(self, pattern: re.Pattern, flags=0) -> str:
-        html = self.get_html()
-        self._debug(html)
-        return re.compile(pattern, flags).search(html).group(1).strip()
+        the only place a processor touches the network, return the text of the page
 
-    def _debug(self, html):  # pragma: no cover
-        """
-        only work for me to debug
+        the page is streamed, with a pattern the connection is closed as soon as it matches.
+        under a deadline_scope the timeouts are cut to the time left
         """
-        if DEBUG:
-            with open("a.html", "w", encoding="utf-8") as f:
-                f.write(html)
-
-
-class Github(Processor):
-    # https://github.com/microsoft/vscode
-
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-
-        self.site = "Github"
-        self.user_name = None
-        self.repo_name = None
-        self.repo_function = None  # issues | pull | actions
-        self.repo_function_name = None  # issue name
-        self.branch_name = None
-        self.file_name = None
-        self.tab_name = None
-        self.routine = None
-        self.search_name = None
-
-        self.urls_re = [
-            r"^https://github\.com/?$",
-            r"^https://github\.com/(?P<user>[^/]*?)\?tab=(?P<tab>.*?)/?$",
-            r"^https://github\.com/(?P<user>[^/\?]*?)$/?",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/?$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/blob/(?P<branch>[^/]*?)/?(?P<file>.*?)?/?$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/files/(?P<branch>[^/]*?)/?(?P<file>.*?)?/?$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/tree/(?P<branch>[^/]*?)/?(?P<file>.*?)?/?$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/commits?/(?P<commit>.*)$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/(?P<function>[^/\?]*?)/?$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/(?P<function>[^/]*?)\?.*$",
-            r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/(?P<function>[^/]*?)/(?P<routine>.*?)(?:#.*)?$",
-            r"^https://github\.com/search\?q=(?P<search>.*?)((&.*)|(:.*))?/?$",
-        ]
-
-        # "https://github.com/{user}"
-        # "https://github.com/{user}/{repo}"
-        # "https://github.com/{user}/{repo}/blob/{branch}/({folder_name}/)?{file_name}"
-        # "https://github.com/{user}/{repo}/tree/{branch}"
-        # "https://github.com/{user}/{repo}/tree/{branch}/({folder_name}/)?{file_name}"
-        # https://github.com/fadedzipper/zCore-Tutorial/blob/dev/docs/book.toml
-
-    def parse(self, res: re.Match) -> str:
-        if "user" in res.groupdict():
-            self.user_name = res.group("user")
-        if "repo" in res.groupdict():
-            self.repo_name = res.group("repo")
-            if "commit" in res.groupdict("commit"):
-                self.repo_name += " commit"
-        if "function" in res.groupdict():
-            self.repo_function = res.group("function")
-            if "routine" in res.groupdict():
-                self.routine = res.group("routine")
-                has_id = self.routine.split("/")[0].isdigit()
-                if has_id:
-                    # for issue and pull
-                    pattern = r'<bdi class="js-issue-title markdown-title">(.*?)</bdi>'
-                    self.repo_function_name = self.get_element_match(pattern)
-                else:
-                    self.repo_function_name = self.routine.split("/")[-1]
-        if "branch" in res.groupdict():
-            self.branch_name = res.group("branch")
-        if "file" in res.groupdict():
-            self.file_name = res.group("file").split("/")[-1]
-            # remove README.md -> README
-            ignore_file_exts = [".md", ".txt"]
-            for ext in ignore_file_exts:
-                if self.file_name.endswith(ext):
-                    self.file_name = self.file_name[: -len(ext)]
-                    break
-        if "tab" in res.groupdict():
-            self.tab_name = res.group("tab")
-        if "search" in res.groupdict():
-            self.search_name = res.group("search")
-
-    def format(self):
-        if self.repo_name is None and self.user_name is None:
-            title = self.site
-        title = ""
-        if self.repo_name:
-            title = self.repo_name
-            if self.repo_function:
-                title += f" {self.repo_function}"
-                if self.repo_function_name:
-                    title = self.repo_function_name
-            elif self.file_name:
-                title += f" {self.file_name}"
-        else:
-            title = self.user_name
-            if self.tab_name:
-                title += f" {self.tab_name}"
-        if self.search_name:
-            title = f"{self.site} search {self.search_name}"
-
-        return title
-
-
-class Githubio(Processor):
-    """
-    most likely one's blog or github page document site
-    """
-
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.user_name = None
-        self.repo_name = None
-        self.routine = None
-
-        self.urls_re = [
-            r"^https://(?P<user>.*?)\.github\.io/?$",  # blog / resume
-            r"^https://(?P<user>.*?)\.github\.io/(?P<repo>.*?)/(?P<routine>.+?)/?$",
-            r"^https://(?P<user>.*?)\.github\.io/(?P<repo>.*?)/?$",  # github repo
-        ]
-
-    def parse(self, res: Match) -> str:
-
-        if "user" in res.groupdict():
-            self.user_name = res.group("user")
-        if "repo" in res.groupdict():
-            self.repo_name = res.group("repo")
-        if "routine" in res.groupdict():
-            origin_routines = res.group("routine").split("/")
-            ignore_rountines = ["index.html", "index.htm", "#"]
-            article_name = origin_routines[-1]
-            if article_name in ignore_rountines:
-                article_name = origin_routines[-2]
-            self.routine = article_name
-
-    def format(self):
-        if self.repo_name is None:
-            title = f"{self.user_name}'s blog"
-        else:
-            if self.routine is None:
-                title = f"{self.repo_name} document"
+        if self.offline:
+            raise OfflineError(self._url, self.class_name, f"{url} needs the network")
+        if deadline.expired():
+            raise DeadlineExceeded(self._url, self.class_name, f"no time left to fetch {url}")
+        breaker = host_breakers.get(url, self)
+        if not breaker.allow():
+            message = f"{url} skipped, its host keeps failing, retry in {breaker.retry_in():.0f}s"
+            raise CircuitOpenError(self._url, self.class_name, message)
+        budget = deadline.remaining()
+        record = tracing.start_fetch(url)
+        status = None
+        # whether the breaker learnt something about the host from this fetch
+        recorded = False
+        start = time.perf_counter()
+        try:
+            with host_limits.get(url, self).acquire(budget):
+                record.add("wait", time.perf_counter() - start)
+                text = self._fetch(url, headers, pattern, record)
+            status = 200
+        except NotModified:
+            status = 304
+            breaker.record_success()
+            recorded = True
+            raise
+        except AcquireTimeout as e:
+            record.add("wait", time.perf_counter() - start)
+            status = DeadlineExceeded.__name__
+            raise DeadlineExceeded(self._url, self.class_name, f"{url} waits for its host: {e}") from None
+        except StatusError as e:
+            status = e.status_code
+            if is_host_failure(e.status_code):
+                breaker.record_failure()
             else:
-                title: str = self.routine
-                if title.endswith(".html"): # pragma: no cover
-                    title = title[:-5]
-        return title
-
-
-class Stackoverflow(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "stackoverflow"
-
-        self.type_name = None
-        self.id = None
-        self.tag_name = None
-        self.user_name = None
-
-        self.question_name = None
-        self.is_answer = False
-
-        self.urls_re = [
-            r"^https://stackoverflow\.com/?$",
-            r"^https://stackoverflow\.com/(?P<type>[^/]*?)/tagged/(?P<tag>.*?)/?$",
-            r"^https://stackoverflow\.com/(?P<type>[^/]*?)/(?P<id>[^/]*?)/(?P<question>.*?)/?$",
-        ]
-
-        # https://stackoverflow.com/questions/tagged/python
-        # https://stackoverflow.com/users/5740428/jan-schultke
-
-    def parse(self, res: Match) -> str:
-        if "type" not in res.groupdict():
-            # pure https://stackoverflow.com/
-            return
-        self.type_name = res.group("type")
-        if self.type_name == "q" or self.type_name == "questions":
-            if "tag" in res.groupdict():
-                self.tag_name = res.group("tag")
-                return
-
-            if "id" in res.groupdict():
-                self.id = res.group("id")
-            if "question" in res.groupdict():
-                # stackoverflow question name use `-` to replace ' '
-                self.question_name = res.group("question").replace("-", " ")
-
-            if self.question_name is None or self.question_name.isdigit():
-                # could not get question name from url
-                pattern = r'<a .*class="question-hyperlink">(.*?)</a>'
-                self.question_name = self.get_element_match(pattern)
-        elif self.type_name == "a":
-            # answer
-            # https://stackoverflow.com/a/601989/17869889
-
-            pattern = r'<a .*class="question-hyperlink">(.*?)</a>'
-            self.question_name = self.get_element_match(pattern)
-            self.is_answer = True
-        elif self.type_name == "users":
-            # https://stackoverflow.com/users/5740428/jan-schultke
-            self.user_name = res.group("question")
+                breaker.record_success()
+            recorded = True
+            raise
+        except Exception as e:
+            status = e.__class__.__name__
+            # timeouts and refused connections. a fetch started with little time left is cut by
+            # the deadline, that is not the host's fault
+            if not deadline.late_start(budget, self.max_time_limit):
+                breaker.record_failure()
+                recorded = True
+            raise
         else:
-            self.error("unknown type")  # pragma: no cover
-        return
-
-    def format(self):
-        title = ""
-        if self.question_name:
-            title = self.question_name
-            if self.is_answer:
-                title += " [answer]"
-        elif self.tag_name:
-            title = f"{self.tag_name} tag"
-        elif self.user_name:
-            title = f"{self.user_name}"
-        else:
-            # pure https://stackoverflow.com/
-            title = self.site
-
-        return title
-
-
-class Youtube(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "youtube"
-        self.user_name = None
-        self.video_name = None
-        self.urls_re = [
-            r"^https://www\.youtube\.com/?$",
-            r"^https://www\.youtube\.com/\@(?P<user>.*?)/?$",
-            r"^https://www\.youtube\.com/\@(?P<user>.*?)/.*$",
-            r"^https://www\.youtube\.com/watch\?v=(?P<id>.*?)/?$",
-            r"^https://youtu\.be/(?P<id>.*?)/?",
-            r"^https://www\.youtube\.com/playlist\?list=(?P<list>.*?)",
-        ]
-
-        # https://www.youtube.com/watch?v=ErV-2tlf9Ls
-
-    def _get_youtube_title(self):
-        # could not directly get youtube video title, instead use the following method
-        # https://stackoverflow.com/a/52664178/17869889
-
-        params = {"format": "json", "url": self._url}
-        url = f"https://www.youtube.com/oembed?{urllib.parse.urlencode(params)}"
-        response = requests.get(url, timeout=self.max_time_limit)
-        data = json.loads(response.text)
-        return data["title"]
-
-    def parse(self, res: Match) -> str:
-        if "user" in res.groupdict():
-            self.user_name = res.group("user")
-        if "id" in res.groupdict():
-            self.video_name = self._get_youtube_title()
-        if "list" in res.groupdict():
-            self.video_name = self._get_youtube_title()
-
-    def format(self):
-        if self.user_name is None and self.video_name is None:
-            # pure youtube
-            title = self.site
-        else:
-            if self.video_name is not None:
-                title = self.video_name
-            if self.user_name is not None:
-                title = self.user_name
-
-        return title
-
-
-class Zhihu(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "知乎"
-        self.type_name = None
-        self.title = None
-
-        self.urls_re = [
-            r"(?P<site>^https://www\.zhihu\.com)/?$",
-            r"^https://www\.zhihu\.com/question/\d+/(?P<type>.*?)/(?P<id>.*?)/?$",
-            r"^https://www\.zhihu\.com/(?P<type>.*?)/(?P<id>.*?)/(?P<sub_type>.*?)/?$",
-            r"^https://www\.zhihu\.com/(?P<type>.*?)/(?P<id>.*?)/?$",
-            r"^https://zhuanlan\.zhihu\.com/(?P<type>.*?)/(?P<id>.*?)/?$",
-        ]
-
-        self.sub_types = {
-            "answers": "回答",
-            "zvideos": "视频",
-            "asks": "提问",
-            "posts": "文章",
-            "columns": "专栏",
-            "pins": "想法",
-            "collections": "收藏",
-            "following": "关注",
-        }
-
-        # https://zhuanlan.zhihu.com/p/347552573
-        # https://www.zhihu.com/question/21099081/answer/18830200
-        # Y不动点组合子用在哪里? - RednaxelaFX的回答 - 知乎
-        #
-
-        # https://www.zhihu.com/collection/86788003
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            self.title = self.site
-            return
-        self.type_name = res.group("type")
-
-        # following parse need page html elements
-
-        if self.type_name == "question":
-            # https://www.zhihu.com/question/446988424
-            pattern = r'<h1 class="QuestionHeader-title">(.*?)</h1>'
-            self.title = self.get_element_match(pattern)
-        elif self.type_name == "p":
-            # https://zhuanlan.zhihu.com/p/347552573
-            pattern = r'<h1 class="Post-Title">(.*?)</h1>'
-            self.title = self.get_element_match(pattern)
-        elif self.type_name == "answer":
-            # https://www.zhihu.com/question/21099081/answer/119347251
-            # https://www.zhihu.com/question/367357782/answer/3066947505 Anonymous user
-            pattern = r'<h1 class="QuestionHeader-title">(.*?)</h1>'
-            self.title = self.get_element_match(pattern) + "的回答"
-        elif self.type_name == "people": # pragma: no cover
-            # https://www.zhihu.com/people/hinus
-
-            pattern = r'<span class="ProfileHeader-name">(.*?)</span'
-            # sometimes there will be <style ...> inside, remove it
-            user_name = re.sub(r"<style.*>", "", self.get_element_match(pattern))
-            self.title = user_name + "的主页"
-            if "sub_type" in res.groupdict():
-                # https://www.zhihu.com/people/hinus/collections
-                self.title = f'{user_name}的{self.sub_types[res.group("sub_type")]}'
-        elif self.type_name == "collection":
-            # https://www.zhihu.com/collection/86788003
-            pattern = r'<div class="CollectionDetailPageHeader-title">(.*?)</div>'
-            self.title = self.get_element_match(pattern) + " 收藏夹"
-        elif self.type_name == "column":
-            # https://www.zhihu.com/column/hinus
-            pattern = r'<div class="css-zyehvu">(.*?)</div>'
-            self.title = self.get_element_match(pattern) + " 专栏"
-
-    def format(self):
-        return self.title
-
-
-class Bilibili(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "bilibli"
-        self.type_name = None
-        self.id = None
-        self.name = None
-
-        self.urls_re = [
-            r"(?P<site>^https://www\.bilibili\.com)/?$",
-            r"^https://www\.bilibili\.com/(?P<type>.*?)/(?P<id>.*?)\?.*$",
-            r"^https://www\.bilibili\.com/(?P<type>.*?)/(?P<id>.*)$",
-            r"^https://(?P<type>space)\.bilibili\.com/(?P<id>.*?)(\?.*)?/?$",
-        ]
-
-        # https://www.bilibili.com/video/BV1ah4y1X73M
-        # https://www.bilibili.com/opus/806593844580712449?spm_id_from=333.999.0.0
-        # https://www.bilibili.com/read/cv23285665?spm_id_from=333.999.0.0
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-        self.type_name = res.group("type")
-        self.id = res.group("id")
-        # bilibili url often following with "spm_id_from=333.999.0.0 ..."
-        # clean the url
-        if self.type_name != "space":
-            self._url = f"https://www.bilibili.com/{self.type_name}/{self.id}"
-        else:
-            self._url = f"https://space.bilibili.com/{self.id}"
-
-        if self.type_name == "video":
-            pattern = r"<h1 .*>(.*?)</h1>"
-            self._url = f"https://www.bilibili.com/video/{self.id}"
-            self.name = self.get_element_match(pattern)
-        elif self.type_name == "opus":
-            pass
-        elif self.type_name == "read":
-            pattern = r'<title data-vue-meta="true">(.*?)</title>'
-            self.name = self.get_element_match(pattern).replace(" - 哔哩哔哩", "")
-        elif self.type_name == "space":
-            pattern = r"<title>(.*?)的个人空间.*</title>"
-            self.name = self.get_element_match(pattern)
-
-    def format(self):
-        if self.type_name is None:
-            # pure bilibili
-            title = self.site
-        else:
-            if self.type_name == "video" or self.type_name == "space":
-                title = self.name
-            elif self.type_name == "opus":
-                title = f"B站动态"
-            elif self.type_name == "read":
-                title = f"{self.name} 专栏"
-            else:
-                self.error("unknown type")  # pragma: no cover
-
-        return title
-
-
-class CSDN(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "csdn"
-        self.user_id = None
-        self.user_name = None
-        self.article_id = None
-        self.article_name = None
-
-        self.urls_re = [
-            r"(?P<site>^https://blog\.csdn\.net)/?$",
-            r"^https://blog\.csdn\.net/(?P<user_id>.*?)/(?P<category>.*?)\.html$",
-            r"^https://blog\.csdn\.net/(?P<user_id>.*?)\?type=.*$",
-            r"^https://blog\.csdn\.net/(?P<user_id>.*?)/article/details/(?P<article_id>.*?)\?.*$",
-            r"^https://blog\.csdn\.net/(?P<user_id>.*?)/article/details/(?P<article_id>.*?)$",
-            r"^http://t\.csdn\.cn/(?P<short_id>.*?)$",
-        ]
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-
-        # self._debug(html)
-
-        if "article_id" in res.groupdict():
-            self.user_id = res.group("user_id")
-            self.article_id = res.group("article_id")
-            # clean the url
-            self._url = f"https://blog.csdn.net/{self.user_id}/article/details/{self.article_id}"
-            pattern = r'<h1 class="title-article" id="articleContentId">(.*?)</h1>'
-            self.article_name = self.get_element_match(pattern)
-        elif "category" in res.groupdict():
-            pattern = r'<h3 class="column_title oneline" title=.*>(.*?)</h3>'
-            self.article_name = self.get_element_match(pattern)
-        elif "short_id" in res.groupdict():
-            # for short url
-
-            pattern = r'<meta name="keywords" content="(.*?)">'
-            self.article_name = self.get_element_match(pattern)
-        else:
-            # for user home page
-            pattern = r'data-nickname="(.*?)"'
-            self.user_name = self.get_element_match(pattern)
-
-    def format(self) -> str:
-        if self.user_name is None and self.article_name is None:
-            title = self.site
-        else:
-            if self.article_name:
-                title = self.article_name
-            else:
-                title = self.user_name
-        return title
-
-
-class Githubusercontent(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-
-        self.urls_re = [r"^https://raw\.githubusercontent\.com.*$"]
-
-    def parse(self, res: Match) -> str:
-        return
-
-    def format(self):
-        return "image"
-
-
-class CNblog(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "博客园"
-        self.author_name = None
-        self.article_name = None
-
-        self.urls_re = [
-            r"(?P<site>^https://www\.cnblogs\.com)/?$",
-            r"^https://www\.cnblogs\.com/(?P<author>.*?)/p/(?P<article>.*?)/?$",
-            r"^https://www\.cnblogs\.com/(?P<archive>.*?)/archive/.*$",
-            r"^https://www\.cnblogs\.com/(?P<author>.*?)/?$",
-        ]
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-
-        if "article" in res.groupdict():
-            pattern = r'<span role="heading" aria-level="2">(.*?)</span>'
-            self.article_name = self.get_element_match(pattern)
-        elif "archive" in res.groupdict():
-            pattern = r'<span role="heading" aria-level="2">(.*?)</span>'
-            self.article_name = self.get_element_match(pattern)
-        elif "author" in res.groupdict():
-            # only author
-            pattern = re.compile(
-                r'<a id="Header1_HeaderTitle" class="headermaintitle HeaderMainTitle" href="https://www.cnblogs.com/.*">(.*?)</a>'
+            breaker.record_success()
+            recorded = True
+        finally:
+            record.finish(status)
+            if not recorded:
+                # a probe which tells nothing gives its turn back
+                breaker.release()
+        return text
+
+    def _fetch(self, url: str, headers: dict = None, pattern: re.Pattern = None, record: tracing.Fetch = None) -> str:
+        record = record or tracing.Fetch(url)
+        validators = (self.validators or {}).get(url)
+        if validators is not None:
+            headers = dict(headers or {})
+            if validators.etag:
+                headers["If-None-Match"] = validators.etag
+            if validators.last_modified:
+                headers["If-Modified-Since"] = validators.last_modified
+        with record.span("request"):
+            response = self._get(url, headers)
+        with response:
+            if response.status_code == 304 and validators is not None:
+                raise NotModified(url, self.class_name, f"{url} has not changed")
+            if response.status_code != 200:
+                raise StatusError(url, self.class_name, response.status_code)  # pragma: no cover
+            record.etag = response.headers.get("ETag")
+            record.last_modified = response.headers.get("Last-Modified")
+            # a page still coming in at the deadline is searched as far as it got
+            chunks = deadline.until_expired(iter_response(response, self.chunk_size))
+            start = time.perf_counter()
+            download = record.phases.get("download", 0.0)
+            text = read_text(record.timed(chunks), pattern, encoding=response.encoding, max_bytes=self.max_bytes)
+            # what read_text did not spend waiting for the chunks went into decoding and searching
+            record.add("parse", time.perf_counter() - start - (record.phases.get("download", 0.0) - download))
+            return text
+
+    def _get(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        send the request and follow its redirects, each hop gets the time left of the deadline
+        rather than a fresh timeout
+        """
+        session = self.session
+        response = session.get(
+            url, headers=headers, timeout=deadline.timeout(self.max_time_limit), allow_redirects=False, stream=True
+        )
+        for _ in range(session.max_redirects):
+            if not response.is_redirect:
+                return response
+            response.close()
+            if deadline.expired():
+                raise DeadlineExceeded(self._url, self.class_name, f"no time left to follow the redirects of {url}")
+            response = session.send(
+                response.next, timeout=deadline.timeout(self.max_time_limit), allow_redirects=False, stream=True
             )
-            self.author_name = self.get_element_match(pattern)
+        if response.is_redirect:
+            import requests
 
-    def format(self):
-        if self.author_name is None and self.article_name is None:
-            title = self.site
-        else:
-            if self.article_name:
-                title = self.article_name
-            else:
-                title = self.author_name
-
-        return title
+            response.close()
+            raise requests.TooManyRedirects(f"exceeded {session.max_redirects} redirects", response=response)
+        return response
 
+    def page_headers(self) -> dict:
+        """
+        the headers of a page of the site, the url being parsed is the referer
+        """
+        return dict(self.headers, Referer=self._url)
 
-class Jianshu(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "简书"
-        self.article_name = None
-        self.user_name = None
-
-        self.urls_re = [
-            r"(?P<site>^https://www\.jianshu\.com)/?$",
-            r"^https://www\.jianshu\.com/p/(?P<article>.*?)/?$",
-            r"^https://www\.jianshu\.com/u/(?P<user>.*?)/?$",
-        ]
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-
-        if "article" in res.groupdict():
-            pattern = r'<h1 class="_1RuRku">(.*?)</h1>'
-            self.article_name = self.get_element_match(pattern)
-        if "user" in res.groupdict():
-            pattern = r'<a class="name" href=.*?>(.*?)</a>'
-            self.user_name = self.get_element_match(pattern)
-
-    def format(self):
-        title = self.site
-        if self.article_name:  # pragma: no cover
-            title = self.article_name
-        elif self.user_name:  # pragma: no cover
-            title = self.user_name
-        return title
-
-
-class TecentCloud(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "tencent cloud"
-        self.article_name = None
-        self.user_name = None
-
-        self.urls_re = [
-            r"(?P<site>^https://cloud.tencent.com)/?$",
-            r"^https://cloud.tencent.com/developer/article/(?P<article>.*?)/?$",
-            r"^https://cloud.tencent.com/developer/user/(?P<user>.*?)/?$",
-        ]
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-
-        if "article" in res.groupdict():
-            pattern = r'<h2 class="title-text">(.*?)</h2>'
-            self.article_name = self.get_element_match(pattern, flags=re.S)
-        elif "user" in res.groupdict():
-            pattern = r'<h3 class="uc-hero-name">(.*?)</h3>'
-            self.user_name = self.get_element_match(pattern)
-
-    def format(self):
-        title = self.site
-
-        if self.article_name:
-            title = self.article_name
-        elif self.user_name:
-            title = self.user_name
-
-        return title
-
-
-class Douban(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "豆瓣"
-        self.book_name = None
-
-        self.urls_re = [
-            r"(?P<site>https://book\.douban\.com)/?$",
-            r"^https://book\.douban\.com/subject/(?P<id>.*?)(\?.*)?/?$",
-        ]
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-
-        pattern = r'<span property="v:itemreviewed">(.*?)</span>'
-        self.book_name = self.get_element_match(pattern)
-
-    def format(self):
-        title = self.site
-        if self.book_name:
-            title = self.book_name
-
-        return title
-
-
-class Juejin(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "掘金"
-        self.article_name = None
-
-        self.urls_re = [
-            r"(?P<site>^https://juejin\.cn/?)$",
-            r"^https://juejin\.cn/post/(?P<post_id>.*)/?$",
-        ]
-
-    def parse(self, res: Match) -> str:
-        if "site" in res.groupdict():
-            return
-        if "post_id" in res.groupdict():
-            pattern = re.compile(r"<title>(.*?) - 掘金</title>")
-            self.article_name = self.get_element_match(pattern)
-
-    def format(self):
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class Wiki(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "wikipedia"
-        self.article_name = None
-
-        self.urls_re = [r"^https://en\.wikipedia\.org/wiki/(?P<name>.*)/?$"]
-
-    def parse(self, res: Match) -> str:
-        self.article_name = res.group("name").replace("_", " ")
-
-    def format(self):
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class Weixin(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "微信公众号"
-        self.article_name = None
-        self.urls_re = [r"^https://mp\.weixin\.qq\.com/s/?(.*?)/?$"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r'<h1 class="rich_media_title " id="activity-name">(.*?)</h1>'
-        self.article_name = self.get_element_match(pattern, re.S).strip()
-
-    def format(self):
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-        return title
-
-
-class Geeksforgeeks(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.article_name = None
-        self.site = "geeksforgeeks"
-
-        self.urls_re = [r"https://www\.geeksforgeeks\.org/(?P<article>.*?)/?$"]
-
-    def parse(self, res: Match) -> str:
-        self.article_name = res.group("article").replace("-", " ")
-
-    def format(self) -> str:
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class SourceForge(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "sourceforge"
-        self.title = None
-        self.is_download = False
-
-        self.urls_re = [r"^https://sourceforge\.net/projects/(?P<id>.*?)(/download)?/?$"]
-
-    def parse(self, res: Match) -> str:
-        download_exts = [
-            ".zip",
-            ".rar",
-            ".7z",
-            ".tar",
-            ".gz",
-            ".tgz",
-            ".bz2",
-            ".xz",
-            ".exe",
-            ".dmg",
-            ".iso",
-            ".apk",
-            ".deb",
-            ".rpm",
-            ".jar",
-            ".tar.gz",
-            ".tar.bz2",
-            ".tar.xz",
-            ".tar.Z",
-            ".sit",
-            ".sitx",
-            ".z",
-            ".gz",
-            ".bz2",
-            ".xz",
-            ".sig",
-            ".asc",
-        ]
-        file_path: str = res.group("id")
-
-        for ext in download_exts:
-            if file_path.endswith(ext):
-                self.is_download = True
-                break
-        if self.is_download:
-            self.title = file_path.split("/")[-1]
-        else:
-            pattern = r"<h1 .*?>(.*?)\n</h1>"
-            self.title = self.get_element_match(pattern)
-
-    def format(self) -> str:
-        title = self.site
-        if self.title:
-            title = self.title
-        return title
-
-
-class VscodeExtension(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "vscode extension"
-        self.author_name = None
-        self.extension_name = None
-
-        self.urls_re = [
-            r"^https://marketplace\.visualstudio\.com/items\?itemName=(?P<author>.*?)\.(?P<extension_name>.*?)/?$"
-        ]
-
-    def parse(self, res: Match) -> str:
-        self.author_name = res.group("author")
-        self.extension_name = res.group("extension_name")
-
-    def format(self) -> str:
-        title = self.site
-        if self.extension_name:
-            title = "vscode " + self.extension_name
-        return title
-
-
-class InfoQ(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "InfoQ"
-        self.article_name = None
-
-        self.urls_re = [r"^https://xie\.infoq\.cn/article/(?P<id>.*?)/?$"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<title>(.*?)_.*?</title>"
-        self.article_name = self.get_element_match(pattern)
-
-    def format(self) -> str:
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class CTO51(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-
-        self.site = "51CTO"
-        self.article_name = None
-
-        self.urls_re = [r"^https://www\.51cto\.com/article/(?P<id>.*?)/?$"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<h1>(.*?)</h1>"
-        self.article_name = self.get_element_match(pattern)
-
-    def format(self) -> str:
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class Souhu(Processor):
-
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "souhu"
-
-        self.urls_re = [r"^https://www\.sohu\.com/a/(?P<id>.*?)/?$"]
-
-    def parse(self, res: Match) -> str:
-
-        pattern = r"<title>(.*?)_.*?</title>"
-        self.article_name = self.get_element_match(pattern).strip()
-
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class Acm(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "acm"
-
-        self.urls_re = [r"^https://dl\.acm\.org/doi/.*"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<h1.*>(.*?)</h1.*>"
-        self.article_name = self.get_element_match(pattern).strip()
-
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class Arxiv(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "arxiv paper"
-
-        self.urls_re = [r"^https://arxiv\.org/abs/*?"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<h1 class=\"title mathjax\"><span class=\"descriptor\">Title:</span>(.*?)</h1>"
-        self.article_name = self.get_element_match(pattern).strip()
-
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class IEEE(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "IEEE paper"
-
-        self.urls_re = [r"^https://ieeexplore\.ieee\.org/document/.*"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<title>(.*) \| .* \| IEEE Xplore</title>"
-        self.article_name = self.get_element_match(pattern).strip()
-
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-
-class USENIX(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "usenix paper"
-
-        self.urls_re = [r"^https://www\.usenix\.org/conference/.*"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<h1 id=\"page-title\">(.*?)</h1>"
-        self.article_name = self.get_element_match(pattern).strip()
-
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-
-class LWN(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "lwn.net"
-
-        self.urls_re = [r"^https://lwn\.net/.*"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<h1>(.*?)</h1>"
-        self.article_name = self.get_element_match(pattern).strip()
-
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title
-    
-# class BaiduZhidao(Processor):
-#     # 加密的
-#     def __init__(self, max_time_limit: int = 5) -> None:
-#         super().__init__(max_time_limit)
-#         self.site = "baidu zhidao"
-
-#         self.urls_re = [r"^https://zhidao\.baidu\.com/.*"]
-#         self.headers['Referer'] = self._url
-
-#     def parse(self, res: Match) -> str:
-#         pattern = r"<h1 class=\"question-title\">(.*?)</h1>"
-#         self.article_name = self.get_element_match(pattern).strip()
-
-#     def format(self) -> str:
-
-#         title = self.site
-#         if self.article_name:
-#             title = self.article_name
-
-#         return title
-
-class Lkml(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "lklm.org"
-
-        self.urls_re = [r"^https://lkml\.org/.*"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<title>(.*?)</title>"
-        self.article_name = self.get_element_match(pattern).strip()
-        
-    def format(self) -> str:
+    def get_html(self, pattern: re.Pattern = None):
+        """
+        call this function if could not parse only by url
+        """
+        return self.fetch(self._url, self.page_headers(), pattern)
 
-        title = self.site
-        if self.article_name:
-            title = self.article_name
+    def get_elements(self, *targets: Target, url: str = None) -> dict:
+        """
+        scan the page once for the targets, return the value found of each
 
-        return title
-    
-class LoreKernelOrg(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "lore.kernel.org"
+        the page is the one of the url being parsed unless url is given. the values of <title>
+        and og:title are in the result as well when the page has them
+        """
+        return self.fetch(url or self._url, self.page_headers(), Targets(*targets))
 
-        self.urls_re = [r"^https://lore\.kernel\.org/.*"]
+    def get_element(self, target: Target, url: str = None) -> str:
+        value = self.get_elements(target, url=url).get(target)
+        if value is None:
+            self.error(f"{target} not found")  # pragma: no cover
+        return value
 
-    def parse(self, res: Match) -> str:
-        pattern = r"<title>(.*?)</title>"
-        self.article_name = self.get_element_match(pattern).strip()
-        
-    def format(self) -> str:
+    def get_element_match(self, pattern: re.Pattern, flags=0) -> str:
+        """
+        search a regex over the page, get_element is preferred as it never backtracks
+        """
+        pattern = re.compile(pattern, flags)
+        html = self.get_html(pattern)
+        self._debug(html)
+        return pattern.search(html).group(1).strip()
 
-        title = self.site
-        if self.article_name:
-            title = self.article_name
+    def _debug(self, html):  # pragma: no cover
+        """
+        only work for me to debug
+        """
+        if DEBUG:
+            with open("a.html", "w", encoding="utf-8") as f:
+                f.write(html)
 
-        return title
-    
 
-class UnixStackExchange(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        
-        self.site = "unix.stackexchange.com"
-        self.urls_re = [r"^https://unix\.stackexchange\.com/.*"]
-        
-    def parse(self, res: Match) -> str:
-        pattern = r"<meta name=\"twitter:title\" property=\"og:title\" itemprop=\"name\" content=\"(.*)\" />"
-        self.article_name = self.get_element_match(pattern).strip()
-        
-    def format(self) -> str:
-
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-
-        return title    
-    
-class KernelOrg(Processor):
-    def __init__(self, max_time_limit: int = 5) -> None:
-        super().__init__(max_time_limit)
-        self.site = "kernel.org"
-        self.urls_re = [r"^https://docs\.kernel\.org/.*"]
-
-    def parse(self, res: Match) -> str:
-        pattern = r"<title>(.*?)</title>"
-        self.article_name = self.get_element_match(pattern).strip()
-        
-    def format(self) -> str:
-        
-        title = self.site
-        if self.article_name:
-            title = self.article_name
-            title = title.replace("  ", " ")
+def __getattr__(name: str):
+    # the processors used to be defined here, each one is now imported from its module of
+    # miuc.sites on first use
+    from .sites import PROCESSORS, load
 
-        return title
\ No newline at end of file
+    if name not in PROCESSORS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return load(PROCESSORS[name])
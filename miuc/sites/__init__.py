@@ -0,0 +1,126 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: the manifest of the sites miuc knows, and the plugins adding more
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import sys
+import importlib
+import threading
+from typing import Dict
+
+# each site is a module of this package, named in the manifest by "module:Class". dispatch
+# only reads the manifest, the module of a processor is imported the first time an url of
+# its host is dispatched to it, so a lookup loads one processor whatever the number of sites
+#
+# another package adds sites without patching miuc with an entry point of the "miuc.sites"
+# group naming a manifest of the same form, which is only loaded once an url matches none
+# of the sites of miuc:
+#
+#   [project.entry-points."miuc.sites"]
+#   mysite = "mysite.miuc:SITES"
+#
+#   # mysite/miuc.py, keep it light, the processors are imported on use as well
+#   SITES = {r"^https://example\.com/.*": "mysite.processor:Example"}
+
+SITES = {
+    # url: processor
+    r"^https://github\.com.*": "miuc.sites.github:Github",
+    r"^https://.*?\.github\.io.*": "miuc.sites.githubio:Githubio",
+    r"^https://stackoverflow\.com.*": "miuc.sites.stackoverflow:Stackoverflow",
+    r"^https://www\.youtube\.com.*$": "miuc.sites.youtube:Youtube",
+    r"^https://youtu\.be/.*": "miuc.sites.youtube:Youtube",
+    r"^https://zhuanlan\.zhihu\.com.*": "miuc.sites.zhihu:Zhihu",
+    r"^https://www\.zhihu\.com.*": "miuc.sites.zhihu:Zhihu",
+    r"^https://www\.bilibili\.com.*": "miuc.sites.bilibili:Bilibili",
+    r"^https://space\.bilibili\.com/.*": "miuc.sites.bilibili:Bilibili",
+    r"^https://blog\.csdn\.net.*": "miuc.sites.csdn:CSDN",
+    r"^http://t\.csdn\.cn/.*": "miuc.sites.csdn:CSDN",
+    r"^https://raw\.githubusercontent\.com.*": "miuc.sites.githubusercontent:Githubusercontent",
+    r"^https://www\.cnblogs\.com.*": "miuc.sites.cnblog:CNblog",
+    r"^https://www\.jianshu\.com.*": "miuc.sites.jianshu:Jianshu",
+    r"^https://cloud\.tencent\.com.*": "miuc.sites.tecent_cloud:TecentCloud",
+    r"^https://book\.douban\.com.*": "miuc.sites.douban:Douban",
+    r"^https://juejin\.cn.*": "miuc.sites.juejin:Juejin",
+    r"^https://en\.wikipedia\.org/wiki/.*": "miuc.sites.wiki:Wiki",
+    r"^https://mp.weixin\.qq\.com/s/?.*": "miuc.sites.weixin:Weixin",
+    r"^https://www\.geeksforgeeks\.org/.*": "miuc.sites.geeksforgeeks:Geeksforgeeks",
+    r"^https://sourceforge\.net/projects/.*": "miuc.sites.source_forge:SourceForge",
+    r"^https://marketplace\.visualstudio\.com/items\?itemName=.*": "miuc.sites.vscode_extension:VscodeExtension",
+    r"^https://xie\.infoq\.cn/.*": "miuc.sites.infoq:InfoQ",
+    r"^https://www\.51cto\.com/.*": "miuc.sites.cto51:CTO51",
+    r"^https://www\.sohu\.com/.*": "miuc.sites.souhu:Souhu",
+    r"^https://dl\.acm\.org/doi/.*": "miuc.sites.acm:Acm",
+    r"^https://arxiv\.org/abs/*?": "miuc.sites.arxiv:Arxiv",
+    r"^https://arxiv\.org/pdf/.*": "miuc.sites.arxiv:Arxiv",
+    r"^https://ieeexplore\.ieee\.org/document/.*": "miuc.sites.ieee:IEEE",
+    r"^https://www\.usenix\.org/conference/.*": "miuc.sites.usenix:USENIX",
+    r"^https://lwn\.net/.*": "miuc.sites.lwn:LWN",
+    # r"^https://zhidao\.baidu\.com/.*": "miuc.sites.baidu_zhidao:BaiduZhidao",
+    r"^https://lkml\.org/lkml/*": "miuc.sites.lkml:Lkml",
+    r"^https://lore\.kernel\.org/*": "miuc.sites.lore_kernel_org:LoreKernelOrg",
+    r"^https://unix\.stackexchange\.com/questions/*": "miuc.sites.unix_stack_exchange:UnixStackExchange",
+    r"^https://docs\.kernel\.org/.*": "miuc.sites.kernel_org:KernelOrg",
+}
+
+# any other site with parse_url(url, generic=True)
+GENERIC = "miuc.sites.generic:Generic"
+
+# {class name: reference} of the processors of miuc
+PROCESSORS = {reference.rsplit(":", 1)[1]: reference for reference in list(SITES.values()) + [GENERIC]}
+
+ENTRY_POINT_GROUP = "miuc.sites"
+
+_loaded = {}
+_plugins = None
+_plugins_lock = threading.Lock()
+
+
+def load(reference: str):
+    """
+    the processor class of a "module:Class" reference, a bare name is one of the processors of miuc
+    """
+    processor = _loaded.get(reference)
+    if processor is None:
+        module, _, name = PROCESSORS.get(reference, reference).partition(":")
+        if not name:
+            raise ValueError(f"{reference!r} is neither a processor of miuc nor a module:Class reference")
+        processor = _loaded[reference] = getattr(importlib.import_module(module), name)
+    return processor
+
+
+def _entry_points() -> list:
+    try:
+        from importlib import metadata
+    except ImportError:  # pragma: no cover
+        # python 3.7
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            return []
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=ENTRY_POINT_GROUP))
+    return list(entry_points.get(ENTRY_POINT_GROUP, []))  # pragma: no cover
+
+
+def plugin_sites() -> Dict[str, object]:
+    """
+    the sites of the installed plugins, {url pattern: processor class or reference}
+
+    the entry points are read once, a plugin which fails to load is left out with a warning
+    """
+    global _plugins
+    with _plugins_lock:
+        if _plugins is None:
+            sites = {}
+            for entry_point in _entry_points():
+                try:
+                    sites.update(entry_point.load())
+                except Exception as e:
+                    print(f"miuc: skip the sites of plugin {entry_point.name}: {e!r}", file=sys.stderr)
+            _plugins = sites
+        return _plugins
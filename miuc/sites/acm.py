@@ -0,0 +1,41 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of the acm digital library
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, needs_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Acm(Processor):
+    # paper titles never change
+    cache_ttl = 180 * 24 * 3600
+    article_title = Element("h1")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "acm"
+
+        self.urls_re = [needs_page(r"^https://dl\.acm\.org/doi/.*")]
+
+    def parse(self, res: Match) -> str:
+        self.article_name = self.get_element(self.article_title)
+
+    def format(self) -> str:
+
+        title = self.site
+        if self.article_name:
+            title = self.article_name
+
+        return title
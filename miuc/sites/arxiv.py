@@ -0,0 +1,58 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of arxiv.org
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, needs_page
+from ..scanner import Element
+from .. import arxiv
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Arxiv(Processor):
+    # paper titles never change
+    cache_ttl = 180 * 24 * 3600
+    # <h1 class="title mathjax"><span class="descriptor">Title:</span>...</h1>
+    article_title = Element("h1", cls="title")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "arxiv paper"
+
+        self.urls_re = [needs_page(r"^https://arxiv\.org/abs/*?"), needs_page(r"^https://arxiv\.org/pdf/.*")]
+
+    def parse(self, res: Match) -> str:
+        paper_id = arxiv.arxiv_id(self._url)
+        if paper_id is not None:
+            # the batch apis fetch many titles at once from the export api
+            title = arxiv.store.get(paper_id)
+            if title is not None:
+                self.article_name = title
+                return
+        url = self._url
+        if "/pdf/" in url:
+            if paper_id is None:
+                self.error("unknown arxiv id")  # pragma: no cover
+            url = f"https://arxiv.org/abs/{paper_id}"
+        title = self.get_element(self.article_title, url)
+        if title.startswith("Title:"):
+            title = title[len("Title:") :].strip()
+        self.article_name = title
+
+    def format(self) -> str:
+
+        title = self.site
+        if self.article_name:
+            title = self.article_name
+
+        return title
@@ -0,0 +1,29 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of zhidao.baidu.com, off as its pages are encrypted
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+# class BaiduZhidao(Processor):
+#     # 加密的
+#     def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+#         super().__init__(max_time_limit, session)
+#         self.site = "baidu zhidao"
+
+#         self.urls_re = [r"^https://zhidao\.baidu\.com/.*"]
+#         self.headers['Referer'] = self._url
+
+#     def parse(self, res: Match) -> str:
+#         pattern = r"<h1 class=\"question-title\">(.*?)</h1>"
+#         self.article_name = self.get_element_match(pattern).strip()
+
+#     def format(self) -> str:
+
+#         title = self.site
+#         if self.article_name:
+#             title = self.article_name
+
+#         return title
@@ -0,0 +1,83 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of bilibili.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page, may_need_page
+from ..scanner import Element, TITLE
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Bilibili(Processor):
+    cache_ttl = 24 * 3600
+    rate_limit = 2
+    rate_burst = 2
+    max_in_flight = 2
+    video_title = Element("h1")
+    read_title = Element("title", attrs={"data-vue-meta": "true"})
+
+    class Context(Processor.Context):
+        __slots__ = ("type_name", "id", "name")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "bilibli"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://www\.bilibili\.com)/?$"),
+            may_need_page(r"^https://www\.bilibili\.com/(?P<type>.*?)/(?P<id>.*?)\?.*$"),
+            may_need_page(r"^https://www\.bilibili\.com/(?P<type>.*?)/(?P<id>.*)$"),
+            needs_page(r"^https://(?P<type>space)\.bilibili\.com/(?P<id>.*?)(\?.*)?/?$"),
+        ]
+
+        # https://www.bilibili.com/video/BV1ah4y1X73M
+        # https://www.bilibili.com/opus/806593844580712449?spm_id_from=333.999.0.0
+        # https://www.bilibili.com/read/cv23285665?spm_id_from=333.999.0.0
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+        self.type_name = res.group("type")
+        self.id = res.group("id")
+        # bilibili url often following with "spm_id_from=333.999.0.0 ..."
+        # clean the url
+        if self.type_name != "space":
+            self._url = f"https://www.bilibili.com/{self.type_name}/{self.id}"
+        else:
+            self._url = f"https://space.bilibili.com/{self.id}"
+
+        if self.type_name == "video":
+            self._url = f"https://www.bilibili.com/video/{self.id}"
+            self.name = self.get_element(self.video_title)
+        elif self.type_name == "opus":
+            pass
+        elif self.type_name == "read":
+            self.name = self.get_element(self.read_title).replace(" - 哔哩哔哩", "")
+        elif self.type_name == "space":
+            self.name = self.get_element(TITLE).split("的个人空间")[0]
+
+    def format(self):
+        if self.type_name is None:
+            # pure bilibili
+            title = self.site
+        else:
+            if self.type_name == "video" or self.type_name == "space":
+                title = self.name
+            elif self.type_name == "opus":
+                title = f"B站动态"
+            elif self.type_name == "read":
+                title = f"{self.name} 专栏"
+            else:
+                self.error("unknown type")  # pragma: no cover
+
+        return title
@@ -0,0 +1,60 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of cnblogs.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class CNblog(Processor):
+    article_title = Element("span", attrs={"role": "heading", "aria-level": "2"})
+    author_title = Element("a", id="Header1_HeaderTitle")
+
+    class Context(Processor.Context):
+        __slots__ = ("author_name",)
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "博客园"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://www\.cnblogs\.com)/?$"),
+            needs_page(r"^https://www\.cnblogs\.com/(?P<author>.*?)/p/(?P<article>.*?)/?$"),
+            needs_page(r"^https://www\.cnblogs\.com/(?P<archive>.*?)/archive/.*$"),
+            needs_page(r"^https://www\.cnblogs\.com/(?P<author>.*?)/?$"),
+        ]
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+
+        if "article" in res.groupdict():
+            self.article_name = self.get_element(self.article_title)
+        elif "archive" in res.groupdict():
+            self.article_name = self.get_element(self.article_title)
+        elif "author" in res.groupdict():
+            # only author
+            self.author_name = self.get_element(self.author_title)
+
+    def format(self):
+        if self.author_name is None and self.article_name is None:
+            title = self.site
+        else:
+            if self.article_name:
+                title = self.article_name
+            else:
+                title = self.author_name
+
+        return title
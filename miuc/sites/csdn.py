@@ -0,0 +1,75 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of blog.csdn.net
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import Element, Attribute, Meta
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class CSDN(Processor):
+    rate_limit = 2
+    rate_burst = 2
+    max_in_flight = 2
+    article_title = Element("h1", id="articleContentId")
+    column_title = Element("h3", cls="column_title")
+    keywords = Meta("keywords")
+    nickname = Attribute("data-nickname")
+
+    class Context(Processor.Context):
+        __slots__ = ("user_id", "user_name", "article_id")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "csdn"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://blog\.csdn\.net)/?$"),
+            needs_page(r"^https://blog\.csdn\.net/(?P<user_id>.*?)/(?P<category>.*?)\.html$"),
+            needs_page(r"^https://blog\.csdn\.net/(?P<user_id>.*?)\?type=.*$"),
+            needs_page(r"^https://blog\.csdn\.net/(?P<user_id>.*?)/article/details/(?P<article_id>.*?)\?.*$"),
+            needs_page(r"^https://blog\.csdn\.net/(?P<user_id>.*?)/article/details/(?P<article_id>.*?)$"),
+            needs_page(r"^http://t\.csdn\.cn/(?P<short_id>.*?)$"),
+        ]
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+
+        # self._debug(html)
+
+        if "article_id" in res.groupdict():
+            self.user_id = res.group("user_id")
+            self.article_id = res.group("article_id")
+            # clean the url
+            self._url = f"https://blog.csdn.net/{self.user_id}/article/details/{self.article_id}"
+            self.article_name = self.get_element(self.article_title)
+        elif "category" in res.groupdict():
+            self.article_name = self.get_element(self.column_title)
+        elif "short_id" in res.groupdict():
+            # for short url
+            self.article_name = self.get_element(self.keywords)
+        else:
+            # for user home page
+            self.user_name = self.get_element(self.nickname)
+
+    def format(self) -> str:
+        if self.user_name is None and self.article_name is None:
+            title = self.site
+        else:
+            if self.article_name:
+                title = self.article_name
+            else:
+                title = self.user_name
+        return title
@@ -0,0 +1,47 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of book.douban.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Douban(Processor):
+    book_title = Element("span", attrs={"property": "v:itemreviewed"})
+
+    class Context(Processor.Context):
+        __slots__ = ("book_name",)
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "豆瓣"
+
+        self.urls_re = [
+            url_only(r"(?P<site>https://book\.douban\.com)/?$"),
+            needs_page(r"^https://book\.douban\.com/subject/(?P<id>.*?)(\?.*)?/?$"),
+        ]
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+
+        self.book_name = self.get_element(self.book_title)
+
+    def format(self):
+        title = self.site
+        if self.book_name:
+            title = self.book_name
+
+        return title
@@ -0,0 +1,54 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of the sites without a processor of their own
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, needs_page
+from ..scanner import Targets, Meta, TITLE, OG_TITLE
+from ..stream import DEFAULT_HEAD_BYTES
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Generic(Processor):
+    """
+    any site without a processor, the title is read from the <head> of the page
+
+    only used with parse_url(url, generic=True), the download stops at </head> and never
+    goes past max_bytes
+    """
+
+    # the head of most pages fits in a few small chunks
+    max_bytes = DEFAULT_HEAD_BYTES
+    chunk_size = 4 * 1024
+    twitter_title = Meta("twitter:title")
+
+    class Context(Processor.Context):
+        __slots__ = ("title",)
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+
+        self.urls_re = [needs_page(r"^https?://.*")]
+
+    def parse(self, res: Match) -> str:
+        # og:title and twitter:title are usually cleaner than <title>, which often carries the site name
+        targets = Targets(OG_TITLE, self.twitter_title, TITLE, head_only=True)
+        results = self.fetch(self._url, self.page_headers(), targets)
+        for target in targets:
+            if results.get(target):
+                self.title = results[target]
+                return
+        self.error("no title in the head")  # pragma: no cover
+
+    def format(self) -> str:
+        return self.title
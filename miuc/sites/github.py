@@ -0,0 +1,153 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of github.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, Error, NotModified, StatusError, url_only, may_need_page
+from ..scanner import Element, TITLE
+from .. import github
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Github(Processor):
+    # issue and pull request titles are edited from time to time
+    cache_ttl = 24 * 3600
+    issue_title = Element("bdi", cls="js-issue-title")
+
+    # https://github.com/microsoft/vscode
+
+    class Context(Processor.Context):
+        __slots__ = (
+            "user_name",
+            "repo_name",
+            # issues | pull | actions
+            "repo_function",
+            # issue name
+            "repo_function_name",
+            "branch_name",
+            "file_name",
+            "tab_name",
+            "routine",
+            "search_name",
+            "commit_title",
+        )
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+
+        self.site = "Github"
+
+        self.urls_re = [
+            url_only(r"^https://github\.com/?$"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)\?tab=(?P<tab>.*?)/?$"),
+            url_only(r"^https://github\.com/(?P<user>[^/\?]*?)$/?"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/?$"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/blob/(?P<branch>[^/]*?)/?(?P<file>.*?)?/?$"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/files/(?P<branch>[^/]*?)/?(?P<file>.*?)?/?$"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/tree/(?P<branch>[^/]*?)/?(?P<file>.*?)?/?$"),
+            may_need_page(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/commits?/(?P<commit>.*)$"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/(?P<function>[^/\?]*?)/?$"),
+            url_only(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/(?P<function>[^/]*?)\?.*$"),
+            may_need_page(r"^https://github\.com/(?P<user>[^/]*?)/(?P<repo>[^/]*?)/(?P<function>[^/]*?)/(?P<routine>.*?)(?:#.*)?$"),
+            url_only(r"^https://github\.com/search\?q=(?P<search>.*?)((&.*)|(:.*))?/?$"),
+        ]
+
+        # "https://github.com/{user}"
+        # "https://github.com/{user}/{repo}"
+        # "https://github.com/{user}/{repo}/blob/{branch}/({folder_name}/)?{file_name}"
+        # "https://github.com/{user}/{repo}/tree/{branch}"
+        # "https://github.com/{user}/{repo}/tree/{branch}/({folder_name}/)?{file_name}"
+        # https://github.com/fadedzipper/zCore-Tutorial/blob/dev/docs/book.toml
+
+    def parse(self, res: re.Match) -> str:
+        if "user" in res.groupdict():
+            self.user_name = res.group("user")
+        if "repo" in res.groupdict():
+            self.repo_name = res.group("repo")
+            if "commit" in res.groupdict("commit"):
+                self.repo_name += " commit"
+                ref = github.github_ref(self._url)
+                if ref is not None:
+                    try:
+                        self.commit_title = self.api_title(ref) or self.get_element(TITLE).split(" · ")[0]
+                    except StatusError as e:
+                        # the commit is not there, the url still names the repo. any other failure
+                        # leaves the title unknown, it is guessed and asked again next time
+                        if e.status_code != 404:
+                            raise
+        if "function" in res.groupdict():
+            self.repo_function = res.group("function")
+            if "routine" in res.groupdict():
+                self.routine = res.group("routine")
+                has_id = self.routine.split("/")[0].isdigit()
+                if has_id:
+                    # for issue and pull
+                    ref = github.github_ref(self._url)
+                    title = self.api_title(ref) if ref is not None else None
+                    self.repo_function_name = title or self.get_element(self.issue_title)
+                else:
+                    self.repo_function_name = self.routine.split("/")[-1]
+        if "branch" in res.groupdict():
+            self.branch_name = res.group("branch")
+        if "file" in res.groupdict():
+            self.file_name = res.group("file").split("/")[-1]
+            # remove README.md -> README
+            ignore_file_exts = [".md", ".txt"]
+            for ext in ignore_file_exts:
+                if self.file_name.endswith(ext):
+                    self.file_name = self.file_name[: -len(ext)]
+                    break
+        if "tab" in res.groupdict():
+            self.tab_name = res.group("tab")
+        if "search" in res.groupdict():
+            self.search_name = res.group("search")
+
+    def api_title(self, ref: github.Ref) -> str:
+        """
+        the title prefetched with graphql, or read from the small rest json, None if neither has it
+        """
+        title = github.store.get(ref)
+        if title is not None:
+            return title
+        import json
+
+        try:
+            return github.rest_title(ref, json.loads(self.fetch(github.rest_url(ref), github.api_headers())))
+        except NotModified:
+            raise
+        except (Error, ValueError, KeyError):
+            # rate limited without a token, or a private repository
+            return None
+
+    def format(self):
+        if self.repo_name is None and self.user_name is None:
+            title = self.site
+        title = ""
+        if self.commit_title:
+            return self.commit_title
+        if self.repo_name:
+            title = self.repo_name
+            if self.repo_function:
+                title += f" {self.repo_function}"
+                if self.repo_function_name:
+                    title = self.repo_function_name
+            elif self.file_name:
+                title += f" {self.file_name}"
+        else:
+            title = self.user_name
+            if self.tab_name:
+                title += f" {self.tab_name}"
+        if self.search_name:
+            title = f"{self.site} search {self.search_name}"
+
+        return title
@@ -0,0 +1,61 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of github pages, *.github.io
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Githubio(Processor):
+    """
+    most likely one's blog or github page document site
+    """
+
+    class Context(Processor.Context):
+        __slots__ = ("user_name", "repo_name", "routine")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+
+        self.urls_re = [
+            url_only(r"^https://(?P<user>.*?)\.github\.io/?$"),  # blog / resume
+            url_only(r"^https://(?P<user>.*?)\.github\.io/(?P<repo>.*?)/(?P<routine>.+?)/?$"),
+            url_only(r"^https://(?P<user>.*?)\.github\.io/(?P<repo>.*?)/?$"),  # github repo
+        ]
+
+    def parse(self, res: Match) -> str:
+
+        if "user" in res.groupdict():
+            self.user_name = res.group("user")
+        if "repo" in res.groupdict():
+            self.repo_name = res.group("repo")
+        if "routine" in res.groupdict():
+            origin_routines = res.group("routine").split("/")
+            ignore_rountines = ["index.html", "index.htm", "#"]
+            article_name = origin_routines[-1]
+            if article_name in ignore_rountines:
+                article_name = origin_routines[-2]
+            self.routine = article_name
+
+    def format(self):
+        if self.repo_name is None:
+            title = f"{self.user_name}'s blog"
+        else:
+            if self.routine is None:
+                title = f"{self.repo_name} document"
+            else:
+                title: str = self.routine
+                if title.endswith(".html"): # pragma: no cover
+                    title = title[:-5]
+        return title
@@ -0,0 +1,36 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of xie.infoq.cn
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, needs_page
+from ..scanner import TITLE
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class InfoQ(Processor):
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "InfoQ"
+
+        self.urls_re = [needs_page(r"^https://xie\.infoq\.cn/article/(?P<id>.*?)/?$")]
+
+    def parse(self, res: Match) -> str:
+        self.article_name = self.get_element(TITLE).split("_")[0]
+
+    def format(self) -> str:
+        title = self.site
+        if self.article_name:
+            title = self.article_name
+
+        return title
@@ -0,0 +1,53 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of jianshu.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Jianshu(Processor):
+    article_title = Element("h1", cls="_1RuRku")
+    user_title = Element("a", cls="name")
+
+    class Context(Processor.Context):
+        __slots__ = ("user_name",)
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "简书"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://www\.jianshu\.com)/?$"),
+            needs_page(r"^https://www\.jianshu\.com/p/(?P<article>.*?)/?$"),
+            needs_page(r"^https://www\.jianshu\.com/u/(?P<user>.*?)/?$"),
+        ]
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+
+        if "article" in res.groupdict():
+            self.article_name = self.get_element(self.article_title)
+        if "user" in res.groupdict():
+            self.user_name = self.get_element(self.user_title)
+
+    def format(self):
+        title = self.site
+        if self.article_name:  # pragma: no cover
+            title = self.article_name
+        elif self.user_name:  # pragma: no cover
+            title = self.user_name
+        return title
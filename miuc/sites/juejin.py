@@ -0,0 +1,42 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of juejin.cn
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import TITLE
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Juejin(Processor):
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "掘金"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://juejin\.cn/?)$"),
+            needs_page(r"^https://juejin\.cn/post/(?P<post_id>.*)/?$"),
+        ]
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+        if "post_id" in res.groupdict():
+            self.article_name = self.get_element(TITLE).split(" - 掘金")[0]
+
+    def format(self):
+        title = self.site
+        if self.article_name:
+            title = self.article_name
+
+        return title
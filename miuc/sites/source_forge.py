@@ -0,0 +1,78 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of sourceforge.net
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, may_need_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class SourceForge(Processor):
+    project_title = Element("h1")
+
+    class Context(Processor.Context):
+        __slots__ = ("title", "is_download")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "sourceforge"
+
+        self.urls_re = [may_need_page(r"^https://sourceforge\.net/projects/(?P<id>.*?)(/download)?/?$")]
+
+    def parse(self, res: Match) -> str:
+        download_exts = [
+            ".zip",
+            ".rar",
+            ".7z",
+            ".tar",
+            ".gz",
+            ".tgz",
+            ".bz2",
+            ".xz",
+            ".exe",
+            ".dmg",
+            ".iso",
+            ".apk",
+            ".deb",
+            ".rpm",
+            ".jar",
+            ".tar.gz",
+            ".tar.bz2",
+            ".tar.xz",
+            ".tar.Z",
+            ".sit",
+            ".sitx",
+            ".z",
+            ".gz",
+            ".bz2",
+            ".xz",
+            ".sig",
+            ".asc",
+        ]
+        file_path: str = res.group("id")
+
+        for ext in download_exts:
+            if file_path.endswith(ext):
+                self.is_download = True
+                break
+        if self.is_download:
+            self.title = file_path.split("/")[-1]
+        else:
+            self.title = self.get_element(self.project_title)
+
+    def format(self) -> str:
+        title = self.site
+        if self.title:
+            title = self.title
+        return title
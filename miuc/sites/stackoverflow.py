@@ -0,0 +1,86 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of stackoverflow.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, may_need_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Stackoverflow(Processor):
+    question_title = Element("a", cls="question-hyperlink")
+
+    class Context(Processor.Context):
+        __slots__ = ("type_name", "id", "tag_name", "user_name", "question_name", "is_answer")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "stackoverflow"
+
+        self.urls_re = [
+            url_only(r"^https://stackoverflow\.com/?$"),
+            url_only(r"^https://stackoverflow\.com/(?P<type>[^/]*?)/tagged/(?P<tag>.*?)/?$"),
+            may_need_page(r"^https://stackoverflow\.com/(?P<type>[^/]*?)/(?P<id>[^/]*?)/(?P<question>.*?)/?$"),
+        ]
+
+        # https://stackoverflow.com/questions/tagged/python
+        # https://stackoverflow.com/users/5740428/jan-schultke
+
+    def parse(self, res: Match) -> str:
+        if "type" not in res.groupdict():
+            # pure https://stackoverflow.com/
+            return
+        self.type_name = res.group("type")
+        if self.type_name == "q" or self.type_name == "questions":
+            if "tag" in res.groupdict():
+                self.tag_name = res.group("tag")
+                return
+
+            if "id" in res.groupdict():
+                self.id = res.group("id")
+            if "question" in res.groupdict():
+                # stackoverflow question name use `-` to replace ' '
+                self.question_name = res.group("question").replace("-", " ")
+
+            if self.question_name is None or self.question_name.isdigit():
+                # could not get question name from url
+                self.question_name = self.get_element(self.question_title)
+        elif self.type_name == "a":
+            # answer
+            # https://stackoverflow.com/a/601989/17869889
+
+            self.question_name = self.get_element(self.question_title)
+            self.is_answer = True
+        elif self.type_name == "users":
+            # https://stackoverflow.com/users/5740428/jan-schultke
+            self.user_name = res.group("question")
+        else:
+            self.error("unknown type")  # pragma: no cover
+        return
+
+    def format(self):
+        title = ""
+        if self.question_name:
+            title = self.question_name
+            if self.is_answer:
+                title += " [answer]"
+        elif self.tag_name:
+            title = f"{self.tag_name} tag"
+        elif self.user_name:
+            title = f"{self.user_name}"
+        else:
+            # pure https://stackoverflow.com/
+            title = self.site
+
+        return title
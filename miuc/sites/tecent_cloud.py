@@ -0,0 +1,55 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of cloud.tencent.com
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class TecentCloud(Processor):
+    article_title = Element("h2", cls="title-text")
+    user_title = Element("h3", cls="uc-hero-name")
+
+    class Context(Processor.Context):
+        __slots__ = ("user_name",)
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "tencent cloud"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://cloud.tencent.com)/?$"),
+            needs_page(r"^https://cloud.tencent.com/developer/article/(?P<article>.*?)/?$"),
+            needs_page(r"^https://cloud.tencent.com/developer/user/(?P<user>.*?)/?$"),
+        ]
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            return
+
+        if "article" in res.groupdict():
+            self.article_name = self.get_element(self.article_title)
+        elif "user" in res.groupdict():
+            self.user_name = self.get_element(self.user_title)
+
+    def format(self):
+        title = self.site
+
+        if self.article_name:
+            title = self.article_name
+        elif self.user_name:
+            title = self.user_name
+
+        return title
@@ -0,0 +1,40 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of the vscode extension marketplace
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class VscodeExtension(Processor):
+    class Context(Processor.Context):
+        __slots__ = ("author_name", "extension_name")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "vscode extension"
+
+        self.urls_re = [
+            url_only(r"^https://marketplace\.visualstudio\.com/items\?itemName=(?P<author>.*?)\.(?P<extension_name>.*?)/?$")
+        ]
+
+    def parse(self, res: Match) -> str:
+        self.author_name = res.group("author")
+        self.extension_name = res.group("extension_name")
+
+    def format(self) -> str:
+        title = self.site
+        if self.extension_name:
+            title = "vscode " + self.extension_name
+        return title
@@ -0,0 +1,35 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of en.wikipedia.org
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Wiki(Processor):
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "wikipedia"
+
+        self.urls_re = [url_only(r"^https://en\.wikipedia\.org/wiki/(?P<name>.*)/?$")]
+
+    def parse(self, res: Match) -> str:
+        self.article_name = res.group("name").replace("_", " ")
+
+    def format(self):
+        title = self.site
+        if self.article_name:
+            title = self.article_name
+
+        return title
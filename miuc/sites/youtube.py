@@ -0,0 +1,68 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of youtube.com and youtu.be
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+import urllib.parse
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Youtube(Processor):
+    class Context(Processor.Context):
+        __slots__ = ("user_name", "video_name")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "youtube"
+        self.urls_re = [
+            url_only(r"^https://www\.youtube\.com/?$"),
+            url_only(r"^https://www\.youtube\.com/\@(?P<user>.*?)/?$"),
+            url_only(r"^https://www\.youtube\.com/\@(?P<user>.*?)/.*$"),
+            needs_page(r"^https://www\.youtube\.com/watch\?v=(?P<id>.*?)/?$"),
+            needs_page(r"^https://youtu\.be/(?P<id>.*?)/?"),
+            needs_page(r"^https://www\.youtube\.com/playlist\?list=(?P<list>.*?)"),
+        ]
+
+        # https://www.youtube.com/watch?v=ErV-2tlf9Ls
+
+    def _get_youtube_title(self):
+        # could not directly get youtube video title, instead use the following method
+        # https://stackoverflow.com/a/52664178/17869889
+
+        import json
+
+        params = {"format": "json", "url": self._url}
+        url = f"https://www.youtube.com/oembed?{urllib.parse.urlencode(params)}"
+        data = json.loads(self.fetch(url))
+        return data["title"]
+
+    def parse(self, res: Match) -> str:
+        if "user" in res.groupdict():
+            self.user_name = res.group("user")
+        if "id" in res.groupdict():
+            self.video_name = self._get_youtube_title()
+        if "list" in res.groupdict():
+            self.video_name = self._get_youtube_title()
+
+    def format(self):
+        if self.user_name is None and self.video_name is None:
+            # pure youtube
+            title = self.site
+        else:
+            if self.video_name is not None:
+                title = self.video_name
+            if self.user_name is not None:
+                title = self.user_name
+
+        return title
@@ -0,0 +1,100 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: page processor of zhihu.com and its zhuanlan
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+from __future__ import annotations
+
+from re import Match
+from typing import TYPE_CHECKING
+from ..site_processor import Processor, url_only, needs_page
+from ..scanner import Element
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
+
+
+class Zhihu(Processor):
+    cache_ttl = 24 * 3600
+    # zhihu answers a burst of requests with a captcha page
+    rate_limit = 1
+    rate_burst = 2
+    max_in_flight = 2
+    question_title = Element("h1", cls="QuestionHeader-title")
+    post_title = Element("h1", cls="Post-Title")
+    people_name = Element("span", cls="ProfileHeader-name")
+    collection_title = Element("div", cls="CollectionDetailPageHeader-title")
+    column_title = Element("div", cls="css-zyehvu")
+
+    class Context(Processor.Context):
+        __slots__ = ("type_name", "title")
+
+    def __init__(self, max_time_limit: int = 5, session: requests.Session = None) -> None:
+        super().__init__(max_time_limit, session)
+        self.site = "知乎"
+
+        self.urls_re = [
+            url_only(r"(?P<site>^https://www\.zhihu\.com)/?$"),
+            needs_page(r"^https://www\.zhihu\.com/question/\d+/(?P<type>.*?)/(?P<id>.*?)/?$"),
+            needs_page(r"^https://www\.zhihu\.com/(?P<type>.*?)/(?P<id>.*?)/(?P<sub_type>.*?)/?$"),
+            needs_page(r"^https://www\.zhihu\.com/(?P<type>.*?)/(?P<id>.*?)/?$"),
+            needs_page(r"^https://zhuanlan\.zhihu\.com/(?P<type>.*?)/(?P<id>.*?)/?$"),
+        ]
+
+        self.sub_types = {
+            "answers": "回答",
+            "zvideos": "视频",
+            "asks": "提问",
+            "posts": "文章",
+            "columns": "专栏",
+            "pins": "想法",
+            "collections": "收藏",
+            "following": "关注",
+        }
+
+        # https://zhuanlan.zhihu.com/p/347552573
+        # https://www.zhihu.com/question/21099081/answer/18830200
+        # Y不动点组合子用在哪里? - RednaxelaFX的回答 - 知乎
+        #
+
+        # https://www.zhihu.com/collection/86788003
+
+    def parse(self, res: Match) -> str:
+        if "site" in res.groupdict():
+            self.title = self.site
+            return
+        self.type_name = res.group("type")
+
+        # following parse need page html elements
+
+        if self.type_name == "question":
+            # https://www.zhihu.com/question/446988424
+            self.title = self.get_element(self.question_title)
+        elif self.type_name == "p":
+            # https://zhuanlan.zhihu.com/p/347552573
+            self.title = self.get_element(self.post_title)
+        elif self.type_name == "answer":
+            # https://www.zhihu.com/question/21099081/answer/119347251
+            # https://www.zhihu.com/question/367357782/answer/3066947505 Anonymous user
+            self.title = self.get_element(self.question_title) + "的回答"
+        elif self.type_name == "people": # pragma: no cover
+            # https://www.zhihu.com/people/hinus
+            # sometimes there will be <style ...> inside, the scanner skips it
+            user_name = self.get_element(self.people_name)
+            self.title = user_name + "的主页"
+            if "sub_type" in res.groupdict():
+                # https://www.zhihu.com/people/hinus/collections
+                self.title = f'{user_name}的{self.sub_types[res.group("sub_type")]}'
+        elif self.type_name == "collection":
+            # https://www.zhihu.com/collection/86788003
+            self.title = self.get_element(self.collection_title) + " 收藏夹"
+        elif self.type_name == "column":
+            # https://www.zhihu.com/column/hinus
+            self.title = self.get_element(self.column_title) + " 专栏"
+
+    def format(self):
+        return self.title
@@ -0,0 +1,136 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: search a pattern over a page while it is downloading
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import re
+import codecs
+from typing import Iterable, Iterator, Optional
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 16 * 1024
+# budget of a page read for its <head> only
+DEFAULT_HEAD_BYTES = 64 * 1024
+
+
+# what lets a pattern without re.S match across a newline
+_MULTILINE_RE = re.compile(r"\\[nsWD]|\[\^|\n")
+
+
+def spans_lines(pattern: re.Pattern) -> bool:
+    """
+    whether a match of the pattern may cross a newline
+    """
+    return bool(pattern.flags & re.S) or _MULTILINE_RE.search(pattern.pattern) is not None
+
+
+class IncrementalSearch:
+    """
+    decode the chunks of a page and search the pattern over the text received so far
+
+    only complete lines are searched, so a pattern like `<h1 .*>(.*?)</h1>` does not match
+    a line which is cut in the middle and gives the same result as searching the whole page.
+    each line is searched once, only a pattern which may match across lines is searched from
+    the start of the page again whenever new lines come in
+    """
+
+    def __init__(self, pattern: Optional[re.Pattern], encoding: str = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.pattern = pattern
+        self.max_bytes = max_bytes
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")
+        self.decoder = decoder(errors="replace")
+        self.text = None
+        self.size = 0
+        self.match = None
+        self._parts = []
+        # the decoded text after the last newline
+        self._line = []
+        self._spans_lines = pattern is not None and spans_lines(pattern)
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        return True once the pattern matches or max_bytes is reached, no more chunks are needed then
+        """
+        self.size += len(chunk)
+        text = self.decoder.decode(chunk)
+        self._parts.append(text)
+        if self.pattern is not None:
+            end = text.rfind("\n") + 1
+            if end:
+                if self._spans_lines:
+                    page = "".join(self._parts)
+                    self.match = self.pattern.search(page, 0, len(page) - len(text) + end)
+                else:
+                    self._line.append(text[:end])
+                    self.match = self.pattern.search("".join(self._line))
+                self._line = [text[end:]]
+                if self.match:
+                    return True
+            else:
+                self._line.append(text)
+        return self.size >= self.max_bytes
+
+    def close(self) -> str:
+        """
+        flush the decoder and return the text
+        """
+        self._parts.append(self.decoder.decode(b"", final=True))
+        self.text = "".join(self._parts)
+        if self.pattern is not None and self.match is None:
+            if self._spans_lines:
+                self.match = self.pattern.search(self.text)
+            else:
+                self.match = self.pattern.search("".join(self._line) + self._parts[-1])
+        return self.text
+
+
+def open_search(pattern, encoding: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+    """
+    the incremental search of a regex, or of an object with its own open_search like scanner.Targets
+    """
+    if hasattr(pattern, "open_search"):
+        return pattern.open_search(encoding, max_bytes)
+    return IncrementalSearch(pattern, encoding, max_bytes)
+
+
+def iter_response(response, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    the chunks of a streamed requests response as they come in
+
+    iter_content waits for chunk_size bytes, a page sent a few bytes at a time would only be
+    searched at the end. with urllib3 2 each chunk is what one read of the socket gave
+    """
+    read1 = getattr(response.raw, "read1", None)
+    if read1 is None:
+        yield from response.iter_content(chunk_size=chunk_size)
+        return
+    while True:
+        chunk = read1(chunk_size, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_text(
+    chunks: Iterable[bytes],
+    pattern: re.Pattern = None,
+    encoding: str = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> str:
+    """
+    read the chunks until the pattern matches or max_bytes is reached
+
+    return the text, or the values found when pattern is a scanner.Targets
+    """
+    search = open_search(pattern, encoding, max_bytes)
+    for chunk in chunks:
+        if search.feed(chunk):
+            break
+    return search.close()
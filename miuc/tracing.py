@@ -0,0 +1,305 @@
+"""
+*Copyright (c) 2023 All rights reserved
+*@description: where the time of each lookup goes, and the metrics of the lookups so far
+*@author: Zhixing Lu
+*@date: 2023-06-20
+*@email: luzhixing12345@163.com
+*@Github: luzhixing12345
+"""
+
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+# parse_url opens a lookup_scope, the phases of the lookup add their time to its Trace:
+#   dispatch  match the url to a processor
+#   cache     title cache and failed urls
+#   shared    wait for the same lookup in flight in another thread
+#   wait      wait for the rate limit and the requests in flight of the host
+#   request   send the request until the headers are in: dns, connect, tls and time to first
+#             byte, a keep-alive connection skips the first three
+#   download  read the body
+#   parse     decode the body and search the title in it
+#   process   the processor code outside its fetches
+#   store     save the title in the cache
+# each fetch keeps its own phases too. once the lookup is over the trace goes to metrics and
+# to the subscribers, `miuc --trace` prints them
+
+PHASES = ["dispatch", "cache", "shared", "wait", "request", "download", "parse", "process", "store"]
+# upper bounds in seconds of the latency histograms
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_current = contextvars.ContextVar("miuc_trace", default=None)
+_subscribers: List[Callable[["Trace"], None]] = []
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+class Fetch:
+    """
+    one page fetched by a processor, its phases are added to the trace of the lookup as well
+    """
+
+    def __init__(self, url: str, trace: "Trace" = None) -> None:
+        self.url = url
+        self.host = urlsplit(url).netloc
+        self.trace = trace
+        # the http status, or the name of the exception which ended the fetch
+        self.status = None
+        self.bytes = 0
+        # the validators the page answered with, kept with the title to revalidate it later
+        self.etag = None
+        self.last_modified = None
+        self.phases = {}
+        self.start = time.perf_counter()
+        self.duration = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        if self.trace is not None:
+            self.trace.add(phase, seconds)
+
+    @contextmanager
+    def span(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def timed(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        the chunks, the time spent waiting for them is download
+        """
+        chunks = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            self.add("download", time.perf_counter() - start)
+            if chunk is None:
+                return
+            self.bytes += len(chunk)
+            yield chunk
+
+    def finish(self, status) -> None:
+        self.status = status
+        self.duration = time.perf_counter() - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "host": self.host,
+            "status": self.status,
+            "bytes": self.bytes,
+            "ms": _ms(self.duration or 0.0),
+            "phases": {phase: _ms(seconds) for phase, seconds in self.phases.items()},
+        }
+
+
+class Trace:
+    """
+    the phases of one lookup
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.processor = None
+        # cache, shared, resolved, failed, negative, unsupported or provisional
+        self.outcome = None
+        self.phases = {}
+        self.fetches: List[Fetch] = []
+        self.start = time.perf_counter()
+        self.duration = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def fetch_seconds(self) -> float:
+        return sum(fetch.duration or 0.0 for fetch in self.fetches)
+
+    def to_dict(self) -> dict:
+        phases = sorted(self.phases.items(), key=lambda item: PHASES.index(item[0]) if item[0] in PHASES else 99)
+        return {
+            "url": self.url,
+            "processor": self.processor,
+            "outcome": self.outcome,
+            "ms": _ms(self.duration or 0.0),
+            "phases": {phase: _ms(seconds) for phase, seconds in phases},
+            "fetches": [fetch.to_dict() for fetch in self.fetches],
+        }
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def lookup_scope(url: str):
+    """
+    trace the lookup of url, a lookup nested in another one is part of the outer trace
+    """
+    trace = _current.get()
+    if trace is not None:
+        yield trace
+        return
+    trace = Trace(url)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        trace.duration = time.perf_counter() - trace.start
+        metrics.observe(trace)
+        for callback in list(_subscribers):
+            callback(trace)
+
+
+@contextmanager
+def span(phase: str):
+    """
+    add the time of the code under it to the phase of the current lookup
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(phase, time.perf_counter() - start)
+
+
+def start_fetch(url: str) -> Fetch:
+    """
+    a Fetch of url, part of the current lookup if there is one
+    """
+    trace = _current.get()
+    fetch = Fetch(url, trace)
+    if trace is not None:
+        trace.fetches.append(fetch)
+    return fetch
+
+
+def subscribe(callback: Callable[[Trace], None]) -> None:
+    """
+    call callback(trace) at the end of every lookup
+    """
+    _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[Trace], None]) -> None:
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+class Histogram:
+    def __init__(self) -> None:
+        # the last count is over the largest bucket
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    cumulative counters and latency histograms of the lookups, per processor, and of the
+    fetches, per host
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # {(processor, outcome): count}
+            self.lookups = {}
+            # {processor: Histogram}
+            self.lookup_seconds = {}
+            # {(processor, phase): seconds}
+            self.phase_seconds = {}
+            # {(host, status): count}
+            self.fetches = {}
+            # {host: Histogram}
+            self.fetch_seconds = {}
+            self.fetch_bytes = {}
+
+    def observe(self, trace: Trace) -> None:
+        processor = trace.processor or "none"
+        with self._lock:
+            key = (processor, trace.outcome or "unknown")
+            self.lookups[key] = self.lookups.get(key, 0) + 1
+            if trace.outcome == "provisional":
+                # answered without the network ahead of the lookup, its time is not the one of a lookup
+                return
+            self.lookup_seconds.setdefault(processor, Histogram()).observe(trace.duration or 0.0)
+            for phase, seconds in trace.phases.items():
+                self.phase_seconds[(processor, phase)] = self.phase_seconds.get((processor, phase), 0.0) + seconds
+            for fetch in trace.fetches:
+                key = (fetch.host, str(fetch.status))
+                self.fetches[key] = self.fetches.get(key, 0) + 1
+                self.fetch_seconds.setdefault(fetch.host, Histogram()).observe(fetch.duration or 0.0)
+                self.fetch_bytes[fetch.host] = self.fetch_bytes.get(fetch.host, 0) + fetch.bytes
+
+    def render(self) -> str:
+        """
+        the metrics in the prometheus text format
+        """
+        lines = []
+
+        def histogram(name: str, label: str, histograms: dict) -> None:
+            for value, hist in sorted(histograms.items()):
+                total = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), hist.counts):
+                    total += count
+                    lines.append(f"{name}_bucket{_labels(**{label: value, 'le': bound})} {total}")
+                lines.append(f"{name}_sum{_labels(**{label: value})} {hist.sum:.6f}")
+                lines.append(f"{name}_count{_labels(**{label: value})} {hist.count}")
+
+        with self._lock:
+            lines.append("# HELP miuc_lookups_total lookups by processor and outcome")
+            lines.append("# TYPE miuc_lookups_total counter")
+            for (processor, outcome), count in sorted(self.lookups.items()):
+                lines.append(f"miuc_lookups_total{_labels(processor=processor, outcome=outcome)} {count}")
+            lines.append("# HELP miuc_lookup_seconds wall clock time of the lookups by processor")
+            lines.append("# TYPE miuc_lookup_seconds histogram")
+            histogram("miuc_lookup_seconds", "processor", self.lookup_seconds)
+            lines.append("# HELP miuc_phase_seconds_total time spent in each phase of the lookups by processor")
+            lines.append("# TYPE miuc_phase_seconds_total counter")
+            for (processor, phase), seconds in sorted(self.phase_seconds.items()):
+                lines.append(f"miuc_phase_seconds_total{_labels(processor=processor, phase=phase)} {seconds:.6f}")
+            lines.append("# HELP miuc_fetches_total pages fetched by host and status")
+            lines.append("# TYPE miuc_fetches_total counter")
+            for (host, status), count in sorted(self.fetches.items()):
+                lines.append(f"miuc_fetches_total{_labels(host=host, status=status)} {count}")
+            lines.append("# HELP miuc_fetch_seconds time of the fetches by host")
+            lines.append("# TYPE miuc_fetch_seconds histogram")
+            histogram("miuc_fetch_seconds", "host", self.fetch_seconds)
+            lines.append("# HELP miuc_fetch_bytes_total bytes read by host")
+            lines.append("# TYPE miuc_fetch_bytes_total counter")
+            for host, size in sorted(self.fetch_bytes.items()):
+                lines.append(f"miuc_fetch_bytes_total{_labels(host=host)} {size}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
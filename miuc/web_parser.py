@@ -8,64 +8,391 @@
 """
 
 import re
-from .site_processor import *
-from .utils import guess_name_by_url
+import time
+from .utils import guess_name_by_url, is_ip_address
+from .cache import Validators, get_cache, normalize_url, split_markdown_url
+from .singleflight import SingleFlight
+from . import deadline, tracing
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from .breaker import host_breakers, negative_cache
+from .sites import GENERIC, SITES
 from urllib.parse import unquote
+from typing import Callable, Optional, Tuple
 
-# some frequently pages
-
-SPECIFIC_SITES = {
-    # url: page_processor
-    r"^https://github\.com.*": Github,
-    r"^https://.*?\.github\.io.*": Githubio,
-    r"^https://stackoverflow\.com.*": Stackoverflow,
-    r"^https://www\.youtube\.com.*$": Youtube,
-    r"^https://youtu\.be/.*": Youtube,
-    r"^https://zhuanlan\.zhihu\.com.*": Zhihu,
-    r"^https://www\.zhihu\.com.*": Zhihu,
-    r"^https://www\.bilibili\.com.*": Bilibili,
-    r"^https://space\.bilibili\.com/.*": Bilibili,
-    r"^https://blog\.csdn\.net.*": CSDN,
-    r"^http://t\.csdn\.cn/.*": CSDN,
-    r"^https://raw\.githubusercontent\.com.*": Githubusercontent,
-    r"^https://www\.cnblogs\.com.*": CNblog,
-    r"^https://www\.jianshu\.com.*": Jianshu,
-    r"^https://cloud\.tencent\.com.*": TecentCloud,
-    r"^https://book\.douban\.com.*": Douban,
-    r"^https://juejin\.cn.*": Juejin,
-    r"^https://en\.wikipedia\.org/wiki/.*": Wiki,
-    r"^https://mp.weixin\.qq\.com/s/?.*": Weixin,
-    r"^https://www\.geeksforgeeks\.org/.*": Geeksforgeeks,
-    r"^https://sourceforge\.net/projects/.*": SourceForge,
-    r"^https://marketplace\.visualstudio\.com/items\?itemName=.*": VscodeExtension,
-    r"^https://xie\.infoq\.cn/.*": InfoQ,
-    r"^https://www\.51cto\.com/.*": CTO51,
-    r"^https://www\.sohu\.com/.*": Souhu,
-    r"^https://dl\.acm\.org/doi/.*": Acm,
-    r"^https://arxiv\.org/abs/*?": Arxiv,
-    r"^https://ieeexplore\.ieee\.org/document/.*": IEEE,
-    r"^https://www\.usenix\.org/conference/.*": USENIX,
-    r"^https://lwn\.net/.*": LWN,
-    # r"^https://zhidao\.baidu\.com/.*": BaiduZhidao,
-    r"^https://lkml\.org/lkml/*": Lkml,
-    r"^https://lore\.kernel\.org/*": LoreKernelOrg,
-    r"^https://unix\.stackexchange\.com/questions/*": UnixStackExchange,
-    r"^https://docs\.kernel\.org/.*": KernelOrg,
-}
-
-
-def parse_url(url: str, max_time_limit: int = 5) -> str:
+# the sites are named instead of imported, see miuc.sites. the module of a processor, and
+# requests, are only loaded once a url matches it
+SPECIFIC_SITES = dict(SITES)
+
+
+class DispatchIndex:
+    """
+    find the processor of an url without trying every pattern of SPECIFIC_SITES
+
+    the host of each pattern is taken from its prefix, the github pattern is indexed
+    under github.com and the github pages pattern under any subdomain of github.io.
+    a lookup only tries the few patterns of the url host, in SPECIFIC_SITES order, so the
+    cost does not grow with the number of sites. a pattern is compiled the first time it is tried
+    """
+
+    HOST_RE = re.compile(r"^\^https?://(?P<wildcard>\.\*\?\\\.)?(?P<host>(?:\\\.|[\w-]|\.(?![*?]))+)")
+    URL_HOST_RE = re.compile(r"^[a-zA-Z][\w+.-]*://(?:[^@/?#]*@)?(?P<host>[^:/?#]*)")
+
+    def __init__(self, sites: dict) -> None:
+        self.hosts = {}
+        self.wildcards = {}
+        # patterns whose host is not a plain domain, always tried
+        self.others = []
+        self.compiled = {}
+        for order, (pattern, processor) in enumerate(sites.items()):
+            self.add(order, pattern, processor)
+
+    def add(self, order: int, pattern: str, processor) -> None:
+        entry = (order, pattern, processor)
+        res = self.HOST_RE.match(pattern)
+        if res is None:
+            self.others.append(entry)
+            return
+        host = res.group("host").replace("\\.", ".")
+        table = self.wildcards if res.group("wildcard") else self.hosts
+        table.setdefault(host, []).append(entry)
+
+    def candidates(self, host: str) -> list:
+        candidates = self.hosts.get(host, []) + self.others
+        # sub.github.io -> github.io -> io
+        index = host.find(".")
+        while index != -1:
+            candidates += self.wildcards.get(host[index + 1 :], [])
+            index = host.find(".", index + 1)
+        candidates.sort(key=lambda entry: entry[0])
+        return candidates
+
+    def match(self, url: str):
+        """
+        return the processor class of the url, None if it is not a specific site
+        """
+        res = self.URL_HOST_RE.match(url)
+        host = res.group("host") if res else ""
+        for _, pattern, processor in self.candidates(host):
+            url_re = self.compiled.get(pattern)
+            if url_re is None:
+                url_re = self.compiled[pattern] = re.compile(pattern)
+            if url_re.match(url):
+                return load_processor(processor)
+        return None
+
+
+def load_processor(processor):
+    """
+    the class of a processor of SPECIFIC_SITES, a "module:Class" reference or the name of a
+    processor of miuc is imported on first use and a class is returned as it is
+    """
+    if isinstance(processor, str):
+        from .sites import load
+
+        processor = load(processor)
+    return processor
+
+
+def __getattr__(name: str):
+    # the processors used to be star imported from site_processor
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import site_processor
+
+    try:
+        return getattr(site_processor, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+_dispatch_index = DispatchIndex(SPECIFIC_SITES)
+_plugins_loaded = False
+
+# concurrent lookups of the same url, from the batch workers or the clients of miuc serve,
+# share one fetch
+_flights = SingleFlight()
+
+_ZHIHU_LINK_RE = re.compile(r"^https://link\.zhihu\.com/\?target=(?P<url>.*?)/?$")
+_GENERIC_URL_RE = re.compile(r"^https?://[^/?#\s]+")
+
+
+def register_site(pattern: str, processor) -> None:
+    """
+    add a site to SPECIFIC_SITES, patterns registered later have lower priority
+
+    processor is a Processor subclass, a "module:Class" reference or the name of a processor of miuc
+    """
+    global _dispatch_index
+    SPECIFIC_SITES[pattern] = processor
+    _dispatch_index = DispatchIndex(SPECIFIC_SITES)
+
+
+def load_plugins() -> None:
+    """
+    register the sites of the installed plugins, after the ones of miuc and only once
+    """
+    global _dispatch_index, _plugins_loaded
+    if _plugins_loaded:
+        return
+    from .sites import plugin_sites
+
+    for pattern, processor in plugin_sites().items():
+        SPECIFIC_SITES.setdefault(pattern, processor)
+    _dispatch_index = DispatchIndex(SPECIFIC_SITES)
+    _plugins_loaded = True
+
+
+def match_processor(url: str, generic: bool = False):
+    """
+    the processor class of the url in SPECIFIC_SITES, None if there is none
+
+    with generic=True the other http(s) urls get the Generic processor, local addresses excepted
+    """
+    processor_class = _dispatch_index.match(url)
+    if processor_class is None and not _plugins_loaded:
+        # the entry points are only read for an url none of the sites of miuc matches
+        load_plugins()
+        processor_class = _dispatch_index.match(url)
+    if processor_class is None and generic and _GENERIC_URL_RE.match(url) and not is_ip_address(url):
+        processor_class = load_processor(GENERIC)
+    return processor_class
+
+
+def parse_url(
+    url: str,
+    max_time_limit: float = 5,
+    use_cache: bool = True,
+    session=None,
+    generic: bool = False,
+    offline: bool = False,
+) -> str:
     """
     parse url and return the tite for the page
+
+    titles resolved by a site processor are kept in the title cache and failed urls are guessed
+    for a while without asking again, set use_cache=False to bypass both
+    the processors fetch pages with session, the shared session of miuc.session by default
+    with generic=True the title of a site without a processor is read from the head of the page
+    instead of guessed by the url
+    with offline=True no socket is opened, a title which needs the page is taken from the cache
+    or guessed by the url
+    a lookup of an url already in flight waits for that one instead of fetching the page again
+    the whole lookup takes at most max_time_limit seconds, the title is guessed by the url when
+    the page is not there by then
     """
-    res = re.match(r"^https://link\.zhihu\.com/\?target=(?P<url>.*?)/?$", url)
+    with deadline.deadline_scope(max_time_limit), tracing.lookup_scope(url):
+        return _parse_url(url, max_time_limit, use_cache, session, generic, offline)
+
+
+def _parse_url(url: str, max_time_limit: float, use_cache: bool, session, generic: bool, offline: bool) -> str:
+    trace = tracing.current()
+    res = _ZHIHU_LINK_RE.match(url)
     if res:
-        return parse_url(unquote(res.group("url")), max_time_limit)
+        return _parse_url(unquote(res.group("url")), max_time_limit, use_cache, session, generic, offline)
     # first check the url whether in specific sites
+    with tracing.span("dispatch"):
+        processor_class = match_processor(url, generic)
+    if processor_class is None:
+        trace.outcome = "unsupported"
+        return guess_name_by_url(url)
+    trace.processor = processor_class.__name__
+
+    if use_cache:
+        with tracing.span("cache"):
+            markdown_url = get_cache().get(url)
+            failed = markdown_url is None and url in negative_cache
+        if markdown_url is not None:
+            trace.outcome = "cache"
+            return markdown_url
+        if failed:
+            trace.outcome = "negative"
+            return guess_name_by_url(url)
+    key = (normalize_url(url), generic, offline)
+    start = time.perf_counter()
     try:
-        for specific_page_url in SPECIFIC_SITES:
-            if re.match(specific_page_url, url):
-                return SPECIFIC_SITES[specific_page_url](max_time_limit)(url)
+        (leader_url, markdown_url), shared = _flights.do(
+            key,
+            _lookup,
+            processor_class,
+            url,
+            max_time_limit,
+            use_cache,
+            session,
+            offline,
+            timeout=deadline.remaining(),
+        )
+    except FutureTimeoutError:
+        # the lookup in flight was started with a later deadline
+        trace.add("shared", time.perf_counter() - start)
+        trace.outcome = "failed"
         return guess_name_by_url(url)
+    if shared:
+        trace.add("shared", time.perf_counter() - start)
+        trace.outcome = "shared"
+        markdown_url = rebase_markdown_url(markdown_url, leader_url, url)
+    return markdown_url
+
+
+def _lookup(processor_class, url: str, max_time_limit: float, use_cache: bool, session, offline: bool):
+    trace = tracing.current()
+    processor = processor_class.shared()
+    start = time.perf_counter()
+    fetched = trace.fetch_seconds()
+    first_fetch = len(trace.fetches)
+    try:
+        markdown_url = processor(url, max_time_limit, session, offline)
     except Exception as e:  # pragma: no cover
-        return guess_name_by_url(url)
+        from .site_processor import is_url_failure
+
+        trace.outcome = "failed"
+        # running out of time or a failing host is not the url's fault
+        if use_cache and not offline and not deadline.expired() and is_url_failure(e):
+            negative_cache.add(url)
+        return url, guess_name_by_url(url)
+    finally:
+        trace.add("process", time.perf_counter() - start - (trace.fetch_seconds() - fetched))
+    trace.outcome = "resolved"
+    if use_cache:
+        with tracing.span("store"):
+            validators = page_validators(trace.fetches[first_fetch:])
+            get_cache().set(
+                url, markdown_url, ttl=processor_class.cache_ttl, site=processor_class.__name__, validators=validators
+            )
+    return url, markdown_url
+
+
+def page_validators(fetches: list) -> Optional[Validators]:
+    """
+    the validators of the page a title was read from, None unless a single page was fetched
+    """
+    pages = [fetch for fetch in fetches if fetch.status == 200]
+    if len(pages) != 1 or not (pages[0].etag or pages[0].last_modified):
+        return None
+    return Validators(pages[0].url, pages[0].etag, pages[0].last_modified)
+
+
+def revalidate(url: str, max_time_limit: float = 5, session=None) -> str:
+    """
+    refresh the cached title of url, return "not modified", "updated" or "failed"
+
+    the page is asked with the ETag and Last-Modified it answered last time, a page which has
+    not changed answers 304 without a body and the title is kept for another cache_ttl. a title
+    without validators is looked up again
+    """
+    from .site_processor import NotModified
+
+    processor_class = match_processor(url, generic=True)
+    if processor_class is None:
+        return "failed"
+    cache = get_cache()
+    validators = cache.get_validators(url)
+    fields = {} if validators is None else {"validators": {validators.page: validators}}
+    with deadline.deadline_scope(max_time_limit), tracing.lookup_scope(url) as trace:
+        trace.processor = processor_class.__name__
+        first_fetch = len(trace.fetches)
+        try:
+            markdown_url = processor_class.shared()(url, max_time_limit, session, **fields)
+        except NotModified:
+            trace.outcome = "not modified"
+            cache.renew(url, ttl=processor_class.cache_ttl)
+            return "not modified"
+        except Exception:  # pragma: no cover
+            # the title cached is kept
+            trace.outcome = "failed"
+            return "failed"
+        trace.outcome = "updated"
+        validators = page_validators(trace.fetches[first_fetch:])
+        cache.set(
+            url, markdown_url, ttl=processor_class.cache_ttl, site=processor_class.__name__, validators=validators
+        )
+    return "updated"
+
+
+def rebase_markdown_url(markdown_url: str, leader_url: str, url: str) -> str:
+    """
+    the markdown url of a lookup shared with leader_url, linked to the url asked for unless
+    the processor rewrote the link
+    """
+    if leader_url == url:
+        return markdown_url
+    title, target = split_markdown_url(markdown_url)
+    return f"[{title}]({url if target == leader_url else target})"
+
+
+def requires_network(url: str, use_cache: bool = True, generic: bool = False) -> bool:
+    """
+    whether parse_url has to fetch a page for the url, cached titles need no fetch
+
+    the answer is what the matching pattern of urls_re declares, a pattern which fetches for
+    some urls only is tried offline to see if its processor asks for a page
+    """
+    res = _ZHIHU_LINK_RE.match(url)
+    if res:
+        return requires_network(unquote(res.group("url")), use_cache, generic)
+    processor_class = match_processor(url, generic)
+    if processor_class is None:
+        return False
+    if use_cache and get_cache().get(url) is not None:
+        return False
+    processor = processor_class.shared()
+    network = processor.url_network(url)
+    if network is not None:
+        return network
+    from .site_processor import OfflineError
+
+    try:
+        processor(url, offline=True)
+    except OfflineError:
+        return True
+    except Exception:  # pragma: no cover
+        pass
+    return False
+
+
+def provisional_title(url: str, use_cache: bool = True, generic: bool = False) -> Tuple[str, bool]:
+    """
+    (markdown url, whether it is final) of the url without touching the network
+
+    the markdown url is the cached title, the one the url alone gives or the guessed one. it is
+    final unless parse_url would fetch a page for the url
+    """
+    with tracing.lookup_scope(url) as trace:
+        markdown_url = parse_url(url, use_cache=use_cache, generic=generic, offline=True)
+        # the first answer of a progressive lookup, the lookup itself is counted once it is done
+        trace.outcome = "provisional"
+    return markdown_url, not requires_network(url, use_cache, generic)
+
+
+def parse_url_progressive(
+    url: str,
+    callback: Callable[[str, bool], None],
+    max_time_limit: float = 5,
+    use_cache: bool = True,
+    session=None,
+    generic: bool = False,
+) -> str:
+    """
+    call callback(markdown_url, final) with the provisional title right away, then with the
+    fetched one once the page is there, return the final markdown url
+
+    callback is called once when the title needs no network
+    """
+    markdown_url, final = provisional_title(url, use_cache, generic)
+    callback(markdown_url, final)
+    if final:
+        return markdown_url
+    markdown_url = parse_url(url, max_time_limit, use_cache, session, generic)
+    callback(markdown_url, True)
+    return markdown_url
+
+
+def stats() -> dict:
+    """
+    the state of the lookups of this process: the hosts which are failing, the failed urls
+    remembered and the lookups answered by another one in flight
+    """
+    return {
+        "hosts": host_breakers.stats(),
+        "failed_urls": len(negative_cache),
+        "shared_lookups": _flights.shared,
+    }
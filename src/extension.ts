@@ -109,21 +109,12 @@ function getUrlTitle() {
 
     clipboardTextPromise.then(text => {
         if (isWebUrl(text)) {
-            // call miuc
-            const command = `miuc "${text}"`;
-            // const command = `miuc ${text}`;
-            child_process.exec(command, (error, stdout) => {
-                if (error) {
-                    // console.error(`miuc error:${error.message}`);
-                    insertText(`[unknown](${text})`, true);
-                    return;
-                }
-
-                // get result [title](url) from miuc, use utf8 format
-                const result = stdout.trim();
-                // insert
+            // ask the resident miuc process, fall back to a one-shot miuc
+            queryMiucServer(text).then(result => {
                 originUrl = text;
                 insertText(result, true);
+            }, () => {
+                execMiuc(text);
             });
         } else {
             originUrl = "";
@@ -132,6 +123,109 @@ function getUrlTitle() {
     });
 }
 
+function execMiuc(text: string) {
+    // call miuc
+    const command = `miuc "${text}"`;
+    // const command = `miuc ${text}`;
+    child_process.exec(command, (error, stdout) => {
+        if (error) {
+            // console.error(`miuc error:${error.message}`);
+            insertText(`[unknown](${text})`, true);
+            return;
+        }
+
+        // get result [title](url) from miuc, use utf8 format
+        const result = stdout.trim();
+        // insert
+        originUrl = text;
+        insertText(result, true);
+    });
+}
+
+// `miuc serve` stays resident, so a paste only pays for the network lookup
+// requests and responses are newline delimited json matched by id
+let miucServer: child_process.ChildProcessWithoutNullStreams | undefined;
+let miucRequestId = 0;
+const pendingRequests = new Map<number, { resolve: (result: string) => void, reject: (error: Error) => void }>();
+
+function getMiucServer(): child_process.ChildProcessWithoutNullStreams {
+    if (miucServer === undefined) {
+        const server = spawn('miuc', ['serve']);
+        let buffer = "";
+        server.stdout.setEncoding('utf8');
+        server.stdout.on('data', (data: string) => {
+            buffer += data;
+            let index = buffer.indexOf("\n");
+            while (index !== -1) {
+                handleServerResponse(buffer.substring(0, index));
+                buffer = buffer.substring(index + 1);
+                index = buffer.indexOf("\n");
+            }
+        });
+        const stopServer = () => {
+            if (miucServer === server) {
+                miucServer = undefined;
+            }
+            // old miuc without `miuc serve`, or the process died
+            pendingRequests.forEach(request => request.reject(new Error("miuc server exited")));
+            pendingRequests.clear();
+        };
+        server.on('error', stopServer);
+        server.on('exit', stopServer);
+        server.stdin.on('error', stopServer);
+        miucServer = server;
+    }
+    return miucServer;
+}
+
+function handleServerResponse(line: string) {
+    let response: { id: number, result?: string, error?: string };
+    try {
+        response = JSON.parse(line);
+    } catch (e) {
+        return;
+    }
+    const request = pendingRequests.get(response.id);
+    if (request === undefined) {
+        return;
+    }
+    pendingRequests.delete(response.id);
+    if (response.result !== undefined) {
+        request.resolve(response.result);
+    } else {
+        request.reject(new Error(response.error));
+    }
+}
+
+// seconds a lookup of the server may take, and how long to wait past it before giving up
+// on a server which hangs without exiting, the paste then falls back to execMiuc
+const MIUC_MAX_TIME_LIMIT = 5;
+const MIUC_SERVER_TIMEOUT_MARGIN = 2;
+
+function queryMiucServer(url: string): Promise<string> {
+    return new Promise<string>((resolve, reject) => {
+        const server = getMiucServer();
+        const id = ++miucRequestId;
+        const timer = setTimeout(() => {
+            if (pendingRequests.delete(id)) {
+                reject(new Error("miuc server timed out"));
+            }
+        }, (MIUC_MAX_TIME_LIMIT + MIUC_SERVER_TIMEOUT_MARGIN) * 1000);
+        pendingRequests.set(id, {
+            resolve: (result: string) => {
+                clearTimeout(timer);
+                resolve(result);
+            },
+            reject: (error: Error) => {
+                clearTimeout(timer);
+                reject(error);
+            },
+        });
+        const request = { id: id, method: "parse", url: url, max_time_limit: MIUC_MAX_TIME_LIMIT };
+        server.stdin.write(JSON.stringify(request) + "\n");
+    });
+}
+
 function insertText(text: string, isSelected: boolean) {
     const editor = vscode.window.activeTextEditor;
     if (editor) {
@@ -172,4 +266,9 @@ async function installPackage(packageName: string): Promise<void> {
 
 
 // This method is called when your extension is deactivated
-export function deactivate() { }
+export function deactivate() {
+    if (miucServer !== undefined) {
+        miucServer.kill();
+        miucServer = undefined;
+    }
+}
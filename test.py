@@ -1,5 +1,49 @@
-import miuc
+import io
+import argparse
+import asyncio
+import os
+import re
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+import subprocess
 import unittest
+import unittest.mock
+
+# keep the title cache of the tests away from the user cache dir
+os.environ.setdefault("MIUC_CACHE_DIR", tempfile.mkdtemp(prefix="miuc-test-"))
+
+import miuc
+from miuc import arxiv, github, tracing
+from miuc.cache import TitleCache, Validators, get_cache, split_markdown_url
+from miuc.singleflight import SingleFlight
+from miuc.breaker import CircuitBreaker, host_breakers, negative_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from miuc.scanner import Attribute, Element, Meta, Targets, OG_TITLE, TITLE, scan
+from miuc.ratelimit import AcquireTimeout, HostLimiter, HostLimits, TokenBucket, host_limits
+from miuc.deadline import deadline_scope
+from miuc.site_processor import UrlPattern, Zhihu
+from miuc.rewrite import LineRewriter, rewrite
+from miuc.aio import parse_url_async, parse_urls_async
+from miuc.web_parser import (
+    DispatchIndex,
+    SPECIFIC_SITES,
+    load_processor,
+    match_processor,
+    rebase_markdown_url,
+    requires_network,
+)
+from miuc.site_processor import Github, Githubio, Processor, Wiki, Youtube
+from miuc.stream import IncrementalSearch, read_text
+from benchmarks.fixture_server import DRIP_DELAY, FixtureServer, fixture_pages, load_fixtures
+from miuc.batch import parse_urls, read_urls, refresh_cache
+from miuc.prefetch import BackgroundPrefetcher, document_urls
+from miuc.sites import load as load_site
+from miuc.main import parse_age
+from miuc.server import Server, _remove_socket, serve_stdio
 
 
 class MiucUnitTest(unittest.TestCase):
@@ -346,5 +390,1271 @@ class MiucUnitTest(unittest.TestCase):
         for url in urls:
             print(miuc.parse_url(url))
 
+class TitleCacheUnitTest(unittest.TestCase):
+    def test_normalized_key(self):
+        cache = TitleCache(":memory:")
+        cache.set("https://GitHub.com/luzhixing12345/miuc", "[miuc](https://GitHub.com/luzhixing12345/miuc)")
+        self.assertEqual(
+            cache.get("https://github.com:443/luzhixing12345/miuc"),
+            "[miuc](https://github.com:443/luzhixing12345/miuc)",
+        )
+        self.assertIsNone(cache.get("https://github.com/luzhixing12345"))
+
+    def test_rewritten_url(self):
+        cache = TitleCache(":memory:")
+        url = "https://www.bilibili.com/video/BV1ah4y1X73M?spm_id_from=333.999.0.0"
+        cache.set(url, "[video](https://www.bilibili.com/video/BV1ah4y1X73M)")
+        self.assertEqual(cache.get(url), "[video](https://www.bilibili.com/video/BV1ah4y1X73M)")
+
+    def test_expire_and_evict(self):
+        cache = TitleCache(":memory:", max_entries=2)
+        cache.set("https://a.com/", "[a](https://a.com/)", ttl=-1)
+        self.assertIsNone(cache.get("https://a.com/"))
+        for name in "bcd":
+            cache.set(f"https://{name}.com/", f"[{name}](https://{name}.com/)")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("https://d.com/"), "[d](https://d.com/)")
+        cache.purge()
+        self.assertEqual(len(cache), 0)
+
+    def test_memory_hit_evicts_last(self):
+        cache = TitleCache(":memory:", max_entries=2)
+        cache.set("https://a.com/", "[a](https://a.com/)")
+        time.sleep(0.01)
+        cache.set("https://b.com/", "[b](https://b.com/)")
+        time.sleep(0.01)
+        # answered by the memory layer, the database must still learn a was used last
+        self.assertEqual(cache.get("https://a.com/"), "[a](https://a.com/)")
+        cache.set("https://c.com/", "[c](https://c.com/)")
+        cache._memory.clear()
+        self.assertEqual(cache.get("https://a.com/"), "[a](https://a.com/)")
+        self.assertIsNone(cache.get("https://b.com/"))
+
+    def test_broken_database(self):
+        cache = TitleCache(os.path.join(tempfile.mkdtemp(), "titles.sqlite3"))
+        cache.set("https://a.com/", "[a](https://a.com/)")
+        cache._connect().execute("DROP TABLE titles")
+        self.assertIsNone(cache.get_validators("https://a.com/"))
+        self.assertFalse(cache.renew("https://a.com/"))
+        self.assertEqual(cache.stale(0), [])
+        self.assertEqual(len(cache), 0)
+        cache.purge()
+
+
+class ServerUnitTest(unittest.TestCase):
+    def test_stdio(self):
+        stdin = io.BytesIO(
+            b'{"id": 1, "method": "ping"}\n'
+            b"not json\n"
+            b'{"id": 2, "url": "https://en.wikipedia.org/wiki/GCC"}\n'
+            b'{"id": 3, "method": "unknown"}\n'
+        )
+        stdout = io.BytesIO()
+        serve_stdio(Server(), stdin, stdout)
+        responses = {}
+        for line in stdout.getvalue().splitlines():
+            response = json.loads(line)
+            responses[response["id"]] = response
+        self.assertEqual(responses[1]["result"], "pong")
+        self.assertEqual(responses[2]["result"], "[GCC](https://en.wikipedia.org/wiki/GCC)")
+        self.assertIn("error", responses[3])
+        self.assertIn("error", responses[None])
+
+
+class BatchUnitTest(unittest.TestCase):
+    def test_input_order(self):
+        urls = [
+            "https://en.wikipedia.org/wiki/GCC",
+            "https://www.geeksforgeeks.org/cache-coherence-protocols-in-multiprocessor-system/",
+            "http://localhost:2017/",
+            "https://en.wikipedia.org/wiki/Roman_numerals",
+        ]
+        stream = io.StringIO("\n".join(urls) + "\n\n")
+        results = list(parse_urls(read_urls(stream), jobs=2))
+        self.assertEqual([url for url, _ in results], urls)
+        self.assertEqual(results[2][1], "[http://localhost:2017/](http://localhost:2017/)")
+        self.assertEqual(results[3][1], "[Roman numerals](https://en.wikipedia.org/wiki/Roman_numerals)")
+
+    def test_slow_producer(self):
+        more = threading.Event()
+
+        def urls():
+            yield "https://en.wikipedia.org/wiki/GCC"
+            # the next url comes once the first result is out
+            more.wait(5)
+            yield "https://en.wikipedia.org/wiki/Roman_numerals"
+
+        results = parse_urls(urls(), use_cache=False)
+        start = time.monotonic()
+        self.assertEqual(next(results)[1], "[GCC](https://en.wikipedia.org/wiki/GCC)")
+        self.assertLess(time.monotonic() - start, 2)
+        more.set()
+        self.assertEqual([url for url, _ in results], ["https://en.wikipedia.org/wiki/Roman_numerals"])
+
+    def test_stats_single_url(self):
+        command = [sys.executable, "-m", "miuc.main", "--offline", "--stats", "https://en.wikipedia.org/wiki/GCC"]
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        process = subprocess.run(command, cwd=cwd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(process.stdout.decode().strip(), "[GCC](https://en.wikipedia.org/wiki/GCC)")
+        self.assertIn("failed_urls", json.loads(process.stderr))
+
+
+ARXIV_PAGE = b'<h1 class="title mathjax"><span class="descriptor">Title:</span>Fixture Paper</h1>'
+
+
+class SessionUnitTest(unittest.TestCase):
+    def test_injected_session(self):
+        pages = {"/arxiv.org/abs/2308.10714": ARXIV_PAGE, "/arxiv.org/abs/2308.10715": ARXIV_PAGE}
+        with FixtureServer(pages) as server:
+            session = server.session(pool_maxsize=1)
+            for url in ["https://arxiv.org/abs/2308.10714", "https://arxiv.org/abs/2308.10715"]:
+                self.assertEqual(miuc.parse_url(url, use_cache=False, session=session), f"[Fixture Paper]({url})")
+        # the second lookup reuses the keep-alive connection
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(server.requests[0][1], server.requests[1][1])
+
+
+class FixturesUnitTest(unittest.TestCase):
+    def test_recorded_titles(self):
+        # the pages of the benchmarks, each with the title its processor is expected to find
+        fixtures = load_fixtures()["fixtures"]
+        with FixtureServer(fixture_pages(fixtures)) as server:
+            session = server.session()
+            for fixture in fixtures:
+                with self.subTest(url=fixture["url"]):
+                    markdown_url = miuc.parse_url(fixture["url"], use_cache=False, session=session)
+                    self.assertEqual(split_markdown_url(markdown_url)[0], fixture["title"])
+
+
+class StreamUnitTest(unittest.TestCase):
+    def test_stop_after_match(self):
+        consumed = []
+
+        def chunks():
+            page = "<html>\n<h1 class=\"x\">标题</h1>\n" + "<p>filler</p>\n" * 10000
+            data = page.encode("utf-8")
+            for i in range(0, len(data), 7):
+                consumed.append(i)
+                yield data[i : i + 7]
+
+        pattern = re.compile(r"<h1 .*>(.*?)</h1>")
+        text = read_text(chunks(), pattern, encoding="utf-8")
+        self.assertEqual(pattern.search(text).group(1), "标题")
+        self.assertLess(len(consumed), 10)
+
+    def test_complete_lines_only(self):
+        search = IncrementalSearch(re.compile(r"<h1 .*>(.*?)</h1>"))
+        self.assertFalse(search.feed(b'<h1 class="a">title</h1><span>'))
+        self.assertTrue(search.feed(b"</span>\n"))
+        self.assertEqual(search.match.group(1), "title")
+
+    def test_lines_searched_once(self):
+        class CountingPattern:
+            def __init__(self, pattern):
+                self.compiled = re.compile(pattern)
+                self.pattern = self.compiled.pattern
+                self.flags = self.compiled.flags
+                self.searched = 0
+
+            def search(self, text, pos=0, endpos=None):
+                endpos = len(text) if endpos is None else endpos
+                self.searched += endpos - pos
+                return self.compiled.search(text, pos, endpos)
+
+        page = ("<p>filler</p>\n" * 20000).encode("utf-8")
+        pattern = CountingPattern(r"<h1 .*>(.*?)</h1>")
+        read_text((page[i : i + 1000] for i in range(0, len(page), 1000)), pattern)
+        self.assertLessEqual(pattern.searched, len(page))
+
+    def test_pattern_across_lines(self):
+        pattern = re.compile(r"<title>\s*(.*?)\s*</title>")
+        chunks = [b"<html><title>\n", b"  A Title\n", b"</title>\n"]
+        self.assertEqual(pattern.search(read_text(iter(chunks), pattern)).group(1), "A Title")
+        search = IncrementalSearch(pattern)
+        self.assertFalse(search.feed(chunks[0]))
+        self.assertFalse(search.feed(chunks[1]))
+        self.assertTrue(search.feed(chunks[2]))
+        self.assertEqual(search.match.group(1), "A Title")
+
+    def test_max_bytes(self):
+        text = read_text(iter([b"a" * 10] * 100), re.compile("(b)"), max_bytes=25)
+        self.assertEqual(len(text), 30)
+
+
+class DispatchUnitTest(unittest.TestCase):
+    def test_match_processor(self):
+        self.assertIs(match_processor("https://github.com/luzhixing12345/miuc"), Github)
+        self.assertIs(match_processor("https://github.com:443/luzhixing12345/miuc"), Github)
+        self.assertIs(match_processor("https://a.b.github.io/zood/"), Githubio)
+        self.assertIs(match_processor("https://youtu.be/iTZ1-85I77c"), Youtube)
+        self.assertIsNone(match_processor("https://docs.python.org/3/library/re.html"))
+        self.assertIsNone(match_processor("not an url"))
+
+    def test_pattern_order(self):
+        sites = {r"^https://a\.com/x.*": Wiki, r"^https://a\.com/.*": Github, r"^https://.*?\.a\.com/.*": Githubio}
+        index = DispatchIndex(sites)
+        self.assertIs(index.match("https://a.com/xyz"), Wiki)
+        self.assertIs(index.match("https://a.com/yz"), Github)
+        self.assertIs(index.match("https://b.a.com/yz"), Githubio)
+
+
+class FakeBackend:
+    def __init__(self, pages: dict, delay: float = 0) -> None:
+        self.pages = pages
+        self.delay = delay
+        self.fetched = []
+        host_breakers.reset()
+
+    async def fetch(self, url, headers, pattern, max_bytes, timeout):
+        self.fetched.append(url)
+        await asyncio.sleep(self.delay)
+        return read_text([self.pages[url].encode("utf-8")], pattern, "utf-8", max_bytes)
+
+
+class AsyncUnitTest(unittest.TestCase):
+    def test_parse_url_async(self):
+        backend = FakeBackend(
+            {
+                "https://arxiv.org/abs/2308.10714": ARXIV_PAGE.decode(),
+                "https://www.youtube.com/oembed?format=json&url=https%3A%2F%2Fyoutu.be%2FiTZ1-85I77c": '{"title": "video"}',
+            }
+        )
+        urls = ["https://arxiv.org/abs/2308.10714", "https://youtu.be/iTZ1-85I77c", "https://en.wikipedia.org/wiki/GCC"]
+        results = asyncio.run(parse_urls_async(urls, use_cache=False, backend=backend))
+        self.assertEqual(
+            results,
+            [
+                "[Fixture Paper](https://arxiv.org/abs/2308.10714)",
+                "[video](https://youtu.be/iTZ1-85I77c)",
+                "[GCC](https://en.wikipedia.org/wiki/GCC)",
+            ],
+        )
+        # the export api is asked first, the fake backend has no feed so the abstract page is read
+        self.assertEqual(len(backend.fetched), 3)
+        self.assertTrue(backend.fetched[0].startswith(arxiv.EXPORT_URL))
+
+    def test_max_time_limit(self):
+        backend = FakeBackend({"https://arxiv.org/abs/2308.10714": ARXIV_PAGE.decode()}, delay=10)
+        url = "https://arxiv.org/abs/2308.10714"
+        result = asyncio.run(parse_url_async(url, max_time_limit=0.05, use_cache=False, backend=backend))
+        self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+
+
+class RewriteUnitTest(unittest.TestCase):
+    def test_line_rewriter(self):
+        rewrite_line = LineRewriter(lambda url: f"[title]({url})")
+        lines = [
+            "see https://a.com/x, [https://a.com/y](https://a.com/y) and [a](https://a.com/z)\n",
+            "`https://a.com/code` ![https://a.com/i.png](https://a.com/i.png) <https://a.com/auto>\n",
+            "[ref]: https://a.com/ref\n",
+            "```\n",
+            "https://a.com/fenced\n",
+            "```\n",
+        ]
+        self.assertEqual(
+            [rewrite_line(line) for line in lines],
+            ["see [title](https://a.com/x), [title](https://a.com/y) and [a](https://a.com/z)\n"] + lines[1:],
+        )
+
+    def test_rewrite_tree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "docs"))
+            file = os.path.join(directory, "docs", "gcc.md")
+            with open(file, "w", encoding="utf-8") as f:
+                f.write("# gcc\n\nhttps://en.wikipedia.org/wiki/GCC\n")
+            output = io.StringIO()
+            self.assertEqual(rewrite([directory], diff=True, output=output), 1)
+            self.assertIn("+[GCC](https://en.wikipedia.org/wiki/GCC)\n", output.getvalue())
+            self.assertEqual(rewrite([directory]), 1)
+            with open(file, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "# gcc\n\n[GCC](https://en.wikipedia.org/wiki/GCC)\n")
+            self.assertEqual(os.listdir(os.path.dirname(file)), ["gcc.md"])
+
+
+class RateLimitUnitTest(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.01)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, delta=0.01)
+
+    def test_timeout_keeps_tokens(self):
+        limiter = HostLimiter(rate=10, burst=1)
+        with limiter.acquire(0):
+            pass
+        # the rejected requests do not borrow from the future
+        for _ in range(20):
+            with self.assertRaises(AcquireTimeout):
+                with limiter.acquire(0.01):
+                    pass
+        self.assertGreater(limiter.bucket.tokens, -1)
+        time.sleep(0.11)
+        with limiter.acquire(0):
+            pass
+
+    def test_max_in_flight(self):
+        limiter = HostLimiter(rate=None, max_in_flight=2)
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def request():
+            with limiter.acquire():
+                with lock:
+                    in_flight[0] += 1
+                    in_flight[1] = max(in_flight)
+                time.sleep(0.01)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(in_flight[1], 2)
+
+    def test_processor_limits(self):
+        limits = HostLimits()
+        limiter = limits.get("https://www.zhihu.com/question/1", Zhihu())
+        self.assertIs(limits.get("https://www.zhihu.com/people/hinus"), limiter)
+        self.assertEqual(limiter.max_in_flight, Zhihu.max_in_flight)
+
+
+SCANNER_PAGE = """<!DOCTYPE html>
+<html><head><title>Page &amp; Title</title>
+<meta property="og:title" content="Open Graph Title">
+<!-- <h1 class="headline">commented</h1> -->
+<script>document.write('<h1 class="headline">script</h1>')</script>
+</head><body data-nickname="someone">
+<H1 class='headline big' id=main>
+  Real <span>Headline</span> <style>.x { color: red }</style>Text
+</H1>
+<h1 class="headline">second</h1>
+</body></html>
+"""
+
+
+class ScannerUnitTest(unittest.TestCase):
+    headline = Element("h1", cls="headline")
+    nickname = Attribute("data-nickname", tag="body")
+
+    def test_targets(self):
+        results = scan(SCANNER_PAGE, self.headline, self.nickname)
+        self.assertEqual(results[self.headline], "Real Headline Text")
+        self.assertEqual(results[self.nickname], "someone")
+        self.assertEqual(results[TITLE], "Page &amp; Title")
+        self.assertEqual(results[OG_TITLE], "Open Graph Title")
+        self.assertEqual(scan(SCANNER_PAGE, Element("h1", id="main"))[Element("h1", id="main")], "Real Headline Text")
+        self.assertNotIn(Element("h2"), scan(SCANNER_PAGE, Element("h2")))
+
+    def test_chunk_boundaries(self):
+        # the page cut at every position gives the same result as the whole page
+        targets = Targets(self.headline, self.nickname, Meta("og:title"))
+        expected = scan(SCANNER_PAGE, *targets)
+        for size in [1, 2, 3, 7, 64]:
+            search = targets.open_search("utf-8")
+            data = SCANNER_PAGE.encode("utf-8")
+            for i in range(0, len(data), size):
+                search.feed(data[i : i + size])
+            self.assertEqual(search.close(), expected)
+
+    def test_stop_after_found(self):
+        consumed = []
+
+        def chunks():
+            page = "<html>\n<h1 class=\"x\">标题</h1>\n" + "<p>filler</p>\n" * 10000
+            data = page.encode("utf-8")
+            for i in range(0, len(data), 7):
+                consumed.append(i)
+                yield data[i : i + 7]
+
+        results = read_text(chunks(), Targets(Element("h1")), encoding="utf-8")
+        self.assertEqual(results[Element("h1")], "标题")
+        self.assertLess(len(consumed), 10)
+
+    def test_minified_page(self):
+        # a greedy regex like <h1 .*>(.*?)</h1> backtracks quadratically over this line
+        page = '<h1 class="t">title</h1>' + '<div class="a"><a href="/b">c</a></div>' * 20000 + '<a href="/broken'
+        start = time.perf_counter()
+        self.assertEqual(scan(page, Element("h1"))[Element("h1")], "title")
+        self.assertEqual(scan(page, Element("h2")).get(Element("h2")), None)
+        self.assertLess(time.perf_counter() - start, 5)
+
+
+class GenericUnitTest(unittest.TestCase):
+    def test_title_from_head(self):
+        head = b"<html><head><title>Blog | Example</title><meta property='og:title' content='A Post'></head>"
+        pages = {
+            "/blog.example.com/post": head + b"<body>" + b"<p>body</p>\n" * 1000 + b"</body></html>",
+            "/blog.example.com/plain": b"<html><head><title> Plain  Title </title></head><body></body></html>",
+            "/blog.example.com/none": b"<html><head></head><body><title>not in head</title></body></html>",
+        }
+        with FixtureServer(pages) as server:
+            session = server.session()
+            url = "https://blog.example.com/post"
+            self.assertEqual(miuc.parse_url(url, use_cache=False, session=session, generic=True), f"[A Post]({url})")
+            url = "https://blog.example.com/plain"
+            self.assertEqual(miuc.parse_url(url, use_cache=False, session=session, generic=True), f"[Plain Title]({url})")
+            url = "https://blog.example.com/none"
+            result = miuc.parse_url(url, use_cache=False, session=session, generic=True)
+            self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+            # without generic the url is guessed and nothing is fetched
+            requests = len(server.requests)
+            url = "https://blog.example.com/post"
+            result = miuc.parse_url(url, use_cache=False, session=session)
+            self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+            self.assertEqual(len(server.requests), requests)
+        self.assertIsNone(match_processor("http://localhost:8080/", generic=True))
+
+    def test_stop_at_head(self):
+        consumed = []
+
+        def chunks():
+            page = b"<html><head><title>t</title></head><body>" + b"<p>filler</p>\n" * 10000
+            for i in range(0, len(page), 16):
+                consumed.append(i)
+                yield page[i : i + 16]
+
+        targets = Targets(OG_TITLE, TITLE, head_only=True)
+        results = read_text(chunks(), targets, encoding="utf-8")
+        self.assertEqual(results, {TITLE: "t"})
+        self.assertLess(len(consumed), 5)
+        # the byte budget holds when the head never ends
+        page = b"<html><head>" + b"<link rel='x'>" * 10000 + b"<title>late</title>"
+        results = read_text(iter([page[i : i + 1024] for i in range(0, len(page), 1024)]), targets, max_bytes=4096)
+        self.assertEqual(results, {})
+
+
+class StartupUnitTest(unittest.TestCase):
+    def test_lazy_imports(self):
+        # a url resolved without network must not pay for requests, json or sqlite3
+        code = (
+            "import sys, miuc.main\n"
+            "from miuc import parse_url\n"
+            "parse_url('https://en.wikipedia.org/wiki/GCC', use_cache=False)\n"
+            "parse_url('https://docs.python.org/3/library/re.html')\n"
+            "print(' '.join(m for m in ['requests', 'json', 'sqlite3', 'asyncio'] if m in sys.modules))\n"
+        )
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        output = subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True, stdout=subprocess.PIPE).stdout
+        self.assertEqual(output.decode().strip(), "")
+
+    def test_processor_names(self):
+        from miuc import web_parser
+
+        self.assertIs(web_parser.load_processor("Wiki"), Wiki)
+        self.assertIs(web_parser.Github, Github)
+        self.assertIs(match_processor("https://en.wikipedia.org/wiki/GCC"), Wiki)
+
+
+class OfflineUnitTest(unittest.TestCase):
+    def test_patterns_declared(self):
+        for processor in set(SPECIFIC_SITES.values()):
+            processor_class = load_processor(processor)
+            for url_re in processor_class().urls_re:
+                self.assertIsInstance(url_re, UrlPattern, f"{processor} {url_re}")
+
+    def test_offline(self):
+        pages = {"/www.zhihu.com/question/1": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        with FixtureServer(pages) as server:
+            session = server.session()
+            cases = {
+                "https://github.com/luzhixing12345/miuc": (False, "[miuc](https://github.com/luzhixing12345/miuc)"),
+                "https://github.com/microsoft/vscode/issues/1": (True, None),
+                "https://stackoverflow.com/questions/1/some-question": (False, None),
+                "https://stackoverflow.com/a/601989/17869889": (True, None),
+                "https://en.wikipedia.org/wiki/GCC": (False, "[GCC](https://en.wikipedia.org/wiki/GCC)"),
+                "https://www.bilibili.com/opus/806593844580712449": (False, None),
+                "https://www.zhihu.com/question/1": (True, None),
+                "https://example.com/post": (False, None),
+            }
+            for url, (network, title) in cases.items():
+                self.assertEqual(requires_network(url, use_cache=False), network, url)
+                result = miuc.parse_url(url, use_cache=False, session=session, offline=True)
+                if network:
+                    self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+                elif title is not None:
+                    self.assertEqual(result, title)
+            self.assertEqual(server.requests, [])
+            # a cached title needs no fetch
+            url = "https://www.zhihu.com/question/2"
+            self.assertTrue(requires_network(url))
+            get_cache().set(url, f"[zhihu question]({url})")
+            self.assertFalse(requires_network(url))
+            self.assertEqual(miuc.parse_url(url, offline=True), f"[zhihu question]({url})")
+            self.assertEqual(server.requests, [])
+
+
+ARXIV_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/1706.03762v7</id>
+    <title>Attention Is All
+      You Need</title>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/hep-th/9901001v1</id>
+    <title>An Old Style Paper</title>
+  </entry>
+</feed>
+"""
+
+
+class ArxivUnitTest(unittest.TestCase):
+    def setUp(self):
+        arxiv.store.clear()
+
+    def test_arxiv_id(self):
+        cases = {
+            "https://arxiv.org/abs/1706.03762": "1706.03762",
+            "https://arxiv.org/abs/1706.03762v7": "1706.03762",
+            "https://arxiv.org/pdf/1706.03762.pdf": "1706.03762",
+            "https://arxiv.org/pdf/1706.03762v2": "1706.03762",
+            "https://arxiv.org/abs/hep-th/9901001": "hep-th/9901001",
+            "https://arxiv.org/abs/math.GT/0309136v1": "math.GT/0309136",
+            "https://arxiv.org/list/cs.AI/recent": None,
+        }
+        for url, paper_id in cases.items():
+            self.assertEqual(arxiv.arxiv_id(url), paper_id, url)
+        self.assertEqual(len(arxiv.export_urls([str(i) for i in range(arxiv.BATCH_SIZE + 1)])), 2)
+
+    def test_batch(self):
+        urls = [
+            "https://arxiv.org/abs/1706.03762",
+            "https://arxiv.org/pdf/1706.03762v7.pdf",
+            "https://arxiv.org/abs/hep-th/9901001",
+            "https://arxiv.org/pdf/2308.10714",
+        ]
+        query = "/export.arxiv.org/api/query?id_list=1706.03762,hep-th/9901001,2308.10714&max_results=3"
+        pages = {query: ARXIV_FEED.encode("utf-8"), "/arxiv.org/abs/2308.10714": ARXIV_PAGE}
+        with FixtureServer(pages) as server:
+            session = server.session()
+            results = list(parse_urls(urls, use_cache=False, session=session))
+        self.assertEqual(
+            results,
+            [
+                (urls[0], f"[Attention Is All You Need]({urls[0]})"),
+                (urls[1], f"[Attention Is All You Need]({urls[1]})"),
+                (urls[2], f"[An Old Style Paper]({urls[2]})"),
+                # missing from the feed, the abstract page of the pdf is read
+                (urls[3], f"[Fixture Paper]({urls[3]})"),
+            ],
+        )
+        self.assertEqual([request[0] for request in server.requests], [query, "/arxiv.org/abs/2308.10714"])
+
+    def test_fallback(self):
+        urls = ["https://arxiv.org/abs/2308.10714", "https://arxiv.org/abs/2308.10715"]
+        pages = {"/arxiv.org/abs/2308.10714": ARXIV_PAGE, "/arxiv.org/abs/2308.10715": ARXIV_PAGE}
+        with FixtureServer(pages) as server:
+            session = server.session()
+            results = list(parse_urls(urls, use_cache=False, session=session))
+        # the export api answers 404, every paper takes the per page path
+        self.assertEqual(results, [(url, f"[Fixture Paper]({url})") for url in urls])
+        self.assertEqual(len(server.requests), 3)
+
+
+GITHUB_ISSUE_PAGE = b'<h1><bdi class="js-issue-title markdown-title">Scraped Issue</bdi></h1>'
+
+
+class GithubApiUnitTest(unittest.TestCase):
+    def setUp(self):
+        github.store.clear()
+
+    def test_github_ref(self):
+        cases = {
+            "https://github.com/Microsoft/vscode/issues/1": ("issue", "microsoft", "vscode", "1"),
+            "https://github.com/microsoft/vscode/pull/2#issuecomment-3": ("issue", "microsoft", "vscode", "2"),
+            "https://github.com/a/b/commit/0123ABCdef": ("commit", "a", "b", "0123abcdef"),
+            "https://github.com/a/b/commits/master": None,
+            "https://github.com/a/b/discussions/4": None,
+        }
+        for url, ref in cases.items():
+            self.assertEqual(github.github_ref(url), ref, url)
+
+    def test_graphql_batch(self):
+        urls = [
+            "https://github.com/a/b/issues/1",
+            "https://github.com/a/b/pull/2",
+            "https://github.com/a/c/commit/abcdef1",
+            "https://github.com/a/b/issues/3",
+        ]
+        data = {
+            "data": {
+                "r0": {"i0": {"title": "First issue"}, "i1": {"title": "A pull request"}, "i2": None},
+                "r1": {"c0": {"messageHeadline": "Fix the build"}},
+            }
+        }
+        pages = {
+            "/api.github.com/graphql": json.dumps(data).encode(),
+            "/api.github.com/repos/a/b/issues/3": b'{"title": "Third issue"}',
+        }
+        with FixtureServer(pages) as server, unittest.mock.patch.dict(os.environ, {"MIUC_GITHUB_TOKEN": "secret"}):
+            results = list(parse_urls(urls, use_cache=False, session=server.session()))
+        self.assertEqual(
+            [markdown_url for _, markdown_url in results],
+            [
+                f"[First issue]({urls[0]})",
+                f"[A pull request]({urls[1]})",
+                f"[Fix the build]({urls[2]})",
+                # left out of the graphql answer, read from the rest api
+                f"[Third issue]({urls[3]})",
+            ],
+        )
+        paths = [request[0] for request in server.requests]
+        self.assertEqual(paths, ["/api.github.com/graphql", "/api.github.com/repos/a/b/issues/3"])
+        self.assertEqual(server.requests[0][2]["Authorization"], "bearer secret")
+        self.assertIn('issueOrPullRequest(number: 2)', json.loads(server.posted[0])["query"])
+
+    def test_rest_then_html(self):
+        urls = ["https://github.com/a/b/issues/1", "https://github.com/a/b/issues/2"]
+        pages = {
+            "/api.github.com/repos/a/b/issues/1": b'{"title": "Rest issue"}',
+            "/github.com/a/b/issues/2": GITHUB_ISSUE_PAGE,
+        }
+        with FixtureServer(pages) as server, unittest.mock.patch.dict(os.environ, {}, clear=True):
+            results = list(parse_urls(urls, use_cache=False, session=server.session()))
+        # no token, no graphql request, the second issue is not in the rest api and is scraped
+        self.assertEqual(results, [(urls[0], f"[Rest issue]({urls[0]})"), (urls[1], f"[Scraped Issue]({urls[1]})")])
+        self.assertEqual(server.posted, [])
+        # a commit needs the network, offline its title is guessed and not cached
+        url = "https://github.com/a/b/commit/abcdef1"
+        self.assertTrue(requires_network(url, use_cache=False))
+        self.assertEqual(miuc.parse_url(url, use_cache=False, offline=True), miuc.utils.guess_name_by_url(url))
+
+    def test_commit_fallback(self):
+        # neither the rest api nor the page answer, the url still names the repo
+        url = "https://github.com/a/b/commit/abcdef1"
+        with FixtureServer({}) as server, unittest.mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(miuc.parse_url(url, use_cache=False, session=server.session()), f"[b commit]({url})")
+        self.assertEqual(len(server.requests), 2)
+
+    def test_commit_failure_not_cached(self):
+        # a failing host says nothing of the commit, the degraded title must not be kept for a day
+        url = "https://github.com/a/b/commit/abcdef2"
+        pages = {"/api.github.com/repos/a/b/commits/abcdef2": 503, "/github.com/a/b/commit/abcdef2": 503}
+        cache = TitleCache(":memory:")
+        with FixtureServer(pages) as server, unittest.mock.patch.dict(os.environ, {}, clear=True):
+            with unittest.mock.patch("miuc.cache._cache", cache):
+                result = miuc.parse_url(url, session=server.session())
+                self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+                self.assertIsNone(cache.get(url))
+                # asked again once the host is back
+                negative_cache.clear()
+                host_breakers.reset()
+                pages["/github.com/a/b/commit/abcdef2"] = b"<title>fix the parser \xc2\xb7 a/b@abcdef2</title>"
+                self.assertEqual(miuc.parse_url(url, session=server.session()), f"[fix the parser]({url})")
+        negative_cache.clear()
+
+
+class SingleFlightUnitTest(unittest.TestCase):
+    def test_threads(self):
+        calls = []
+        flight = SingleFlight()
+
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.2)
+            return value * 2
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: flight.do("key", slow, 21), range(4)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [(42, False), (42, True), (42, True), (42, True)])
+        # nothing is kept once the call returns
+        self.assertEqual(flight.do("key", slow, 1), (2, False))
+
+    def test_parse_url(self):
+        fetched = []
+
+        def fetch(self, url, headers=None, pattern=None):
+            fetched.append(url)
+            time.sleep(0.2)
+            return {Zhihu.question_title: "shared question"}
+
+        urls = ["https://www.zhihu.com/question/5"] * 4
+        with unittest.mock.patch.object(Zhihu, "fetch", fetch):
+            results = list(parse_urls(urls, use_cache=False, jobs=4))
+        self.assertEqual(fetched, urls[:1])
+        self.assertEqual(results, [(url, f"[shared question]({url})") for url in urls])
+
+    def test_async(self):
+        url = "https://www.zhihu.com/question/6"
+        backend = FakeBackend({url: "<h1 class='QuestionHeader-title'>async question</h1>"}, delay=0.1)
+        results = asyncio.run(parse_urls_async([url] * 3, use_cache=False, backend=backend))
+        self.assertEqual(results, [f"[async question]({url})"] * 3)
+        self.assertEqual(backend.fetched, [url])
+        rebased = rebase_markdown_url("[t](https://a.com/x)", "https://a.com/x", "https://A.com/x")
+        self.assertEqual(rebased, "[t](https://A.com/x)")
+
+
+class BreakerUnitTest(unittest.TestCase):
+    def setUp(self):
+        host_breakers.reset()
+        negative_cache.clear()
+
+    tearDown = setUp
+
+    def test_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, cool_down=0.1)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+        time.sleep(0.15)
+        # a single probe once the cool down is over
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        time.sleep(0.15)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.rejected, 2)
+
+    def test_dead_host(self):
+        urls = [f"https://www.zhihu.com/question/{i}" for i in range(10, 15)]
+        pages = {f"/www.zhihu.com/question/{i}": 503 for i in range(10, 15)}
+        pages["/www.zhihu.com/question/20"] = 404
+        with FixtureServer(pages) as server:
+            host_breakers.configure("www.zhihu.com", failure_threshold=2, cool_down=60)
+            results = list(parse_urls(urls, use_cache=False, jobs=1, session=server.session()))
+            self.assertEqual(results, [(url, miuc.utils.guess_name_by_url(url)) for url in urls])
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(miuc.web_parser.stats()["hosts"]["www.zhihu.com"]["state"], "open")
+        # a missing page is not the host's fault
+        with FixtureServer(pages) as server:
+            for _ in range(3):
+                miuc.parse_url("https://www.zhihu.com/question/20", use_cache=False, session=server.session())
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(miuc.web_parser.stats()["hosts"], {})
+
+    def test_negative_cache(self):
+        url = "https://www.zhihu.com/question/30"
+        with FixtureServer({"/www.zhihu.com/question/30": 404}) as server:
+            for _ in range(3):
+                self.assertEqual(miuc.parse_url(url, session=server.session()), miuc.utils.guess_name_by_url(url))
+        self.assertEqual(len(server.requests), 1)
+        self.assertIn(url, negative_cache)
+        self.assertEqual(miuc.web_parser.stats()["failed_urls"], 1)
+
+    def test_probe_cut_by_deadline(self):
+        url = "https://www.zhihu.com/question/32"
+        pages = {"/www.zhihu.com/question/32": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        with FixtureServer(pages) as server:
+            host_breakers.configure("www.zhihu.com", failure_threshold=1, cool_down=0.1)
+            breaker = host_breakers.get(url)
+            breaker.record_failure()
+            host_limits.configure("www.zhihu.com", rate=0.01)
+            self.addCleanup(host_limits.limiters.pop, "www.zhihu.com", None)
+            with host_limits.get(url).acquire():
+                pass
+            time.sleep(0.15)
+            # the probe waits for a token past its deadline, that tells nothing about the host
+            result = miuc.parse_url(url, max_time_limit=0.5, use_cache=False, session=server.session())
+            self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+            self.assertEqual(breaker.state, "open")
+            self.assertGreater(breaker.retry_in(), 0)
+            host_limits.limiters.pop("www.zhihu.com")
+            time.sleep(0.15)
+            result = miuc.parse_url(url, max_time_limit=0.5, use_cache=False, session=server.session())
+            self.assertEqual(result, f"[zhihu question]({url})")
+            self.assertEqual(breaker.state, "closed")
+
+    def test_async_late_timeout(self):
+        url = "https://www.zhihu.com/question/33"
+
+        class TimeoutBackend:
+            async def fetch(self, url, headers, pattern, max_bytes, timeout):
+                raise TimeoutError(f"{url} timed out")
+
+        host_breakers.configure("www.zhihu.com", failure_threshold=1, cool_down=60)
+        # the fetch starts with a tenth of its usual time left, the timeout is not the host's fault
+        with deadline_scope(0.5):
+            result = asyncio.run(parse_url_async(url, use_cache=False, backend=TimeoutBackend()))
+        self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+        self.assertEqual(host_breakers.get(url).state, "closed")
+        asyncio.run(parse_url_async(url, use_cache=False, backend=TimeoutBackend()))
+        self.assertEqual(host_breakers.get(url).state, "open")
+
+    def test_open_circuit_not_cached(self):
+        url = "https://www.zhihu.com/question/31"
+        pages = {"/www.zhihu.com/question/31": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        with FixtureServer(pages) as server:
+            host_breakers.configure("www.zhihu.com", failure_threshold=1, cool_down=60)
+            host_breakers.get(url).record_failure()
+            self.assertEqual(miuc.parse_url(url, session=server.session()), miuc.utils.guess_name_by_url(url))
+            # the url is not to blame, it is asked again once the host is back
+            self.assertNotIn(url, negative_cache)
+            host_breakers.reset()
+            self.assertEqual(miuc.parse_url(url, session=server.session()), f"[zhihu question]({url})")
+
+
+class DeadlineUnitTest(unittest.TestCase):
+    def setUp(self):
+        host_breakers.reset()
+        negative_cache.clear()
+
+    tearDown = setUp
+
+    def test_scope(self):
+        self.assertIsNone(miuc.deadline.remaining())
+        with deadline_scope(1):
+            with deadline_scope(10):
+                # a nested scope never extends the outer one
+                self.assertLessEqual(miuc.deadline.remaining(), 1)
+                self.assertAlmostEqual(miuc.deadline.timeout(5), miuc.deadline.remaining(), places=2)
+            with deadline_scope(0):
+                self.assertTrue(miuc.deadline.expired())
+                self.assertEqual(list(miuc.deadline.until_expired([b"a", b"b"])), [b"a"])
+        self.assertIsNone(miuc.deadline.remaining())
+        self.assertEqual(miuc.deadline.timeout(5), 5)
+
+    def test_dripping_page(self):
+        # each chunk comes well within the socket timeout, the page as a whole does not
+        url = "https://blog.example.com/slow"
+        body = [b"<html><head>"] + [b"<!-- -->"] * 20 + [b"<title>Slow</title></head></html>"]
+        with FixtureServer({"/blog.example.com/slow": body}) as server:
+            start = time.monotonic()
+            result = miuc.parse_url(url, max_time_limit=1, use_cache=False, session=server.session(), generic=True)
+            self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+        # the deadline cut the page, the host is not blamed
+        self.assertEqual(miuc.web_parser.stats()["hosts"], {})
+        self.assertNotIn(url, negative_cache)
+
+    def test_redirect_chain(self):
+        pages = {f"/www.zhihu.com/question/{i}": f"https://www.zhihu.com/question/{i + 1}" for i in range(40, 45)}
+        pages["/www.zhihu.com/question/45"] = b"<h1 class='QuestionHeader-title'>zhihu question</h1>"
+        url = "https://www.zhihu.com/question/44"
+        with FixtureServer(pages) as server:
+            result = miuc.parse_url(url, use_cache=False, session=server.session())
+            self.assertEqual(result, f"[zhihu question]({url})")
+            # each hop gets the time left, not a fresh timeout
+            server.delays.update((path, 0.4) for path in pages)
+            url = "https://www.zhihu.com/question/40"
+            start = time.monotonic()
+            result = miuc.parse_url(url, max_time_limit=1, use_cache=False, session=server.session())
+            self.assertEqual(result, miuc.utils.guess_name_by_url(url))
+            self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_zhihu_link_shares_the_deadline(self):
+        url = "https://link.zhihu.com/?target=https%3A//blog.example.com/slow"
+        body = [b"<html><head>"] + [b"<!-- -->"] * 20 + [b"<title>Slow</title></head></html>"]
+        with FixtureServer({"/blog.example.com/slow": body}) as server:
+            start = time.monotonic()
+            with deadline_scope(0.5):
+                miuc.parse_url(url, max_time_limit=5, use_cache=False, session=server.session(), generic=True)
+            self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_host_limit_wait(self):
+        limiter = HostLimiter(None, max_in_flight=1)
+        with limiter.acquire():
+            with self.assertRaises(AcquireTimeout):
+                with limiter.acquire(timeout=0.1):
+                    pass
+
+    def test_follower_gives_up(self):
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.5)
+            return "done"
+
+        with ThreadPoolExecutor(1) as executor:
+            leader = executor.submit(flights.do, "key", slow)
+            started.wait()
+            with self.assertRaises(FutureTimeoutError):
+                flights.do("key", slow, timeout=0.1)
+            self.assertEqual(leader.result(), ("done", False))
+
+
+class ProgressiveUnitTest(unittest.TestCase):
+    def setUp(self):
+        host_breakers.reset()
+        negative_cache.clear()
+
+    tearDown = setUp
+
+    def test_callback(self):
+        url = "https://www.zhihu.com/question/20399991"
+        pages = {"/www.zhihu.com/question/20399991": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        calls = []
+        with FixtureServer(pages) as server:
+            result = miuc.parse_url_progressive(
+                url, lambda *args: calls.append(args), use_cache=False, session=server.session()
+            )
+        self.assertEqual(calls, [(miuc.utils.guess_name_by_url(url), False), (result, True)])
+        self.assertNotEqual(calls[0][0], result)
+        # the title of the url alone is final at once
+        calls = []
+        url = "https://github.com/luzhixing12345/miuc"
+        miuc.parse_url_progressive(url, lambda *args: calls.append(args), use_cache=False)
+        self.assertEqual(calls, [(f"[miuc]({url})", True)])
+
+    def test_server(self):
+        stdin = io.BytesIO(
+            b'{"id": 1, "url": "https://www.zhihu.com/question/20399991", "progressive": true}\n'
+            b'{"id": 2, "url": "https://github.com/luzhixing12345/miuc", "progressive": true}\n'
+        )
+        stdout = io.BytesIO()
+        pages = {"/www.zhihu.com/question/20399991": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        with FixtureServer(pages) as server:
+            with unittest.mock.patch("miuc.session._session", server.session()):
+                serve_stdio(Server(use_cache=False), stdin, stdout)
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        first = [response for response in responses if response["id"] == 1]
+        self.assertEqual([response["final"] for response in first], [False, True])
+        self.assertEqual(first[0]["result"], "[zhihu 20399991](https://www.zhihu.com/question/20399991)")
+        self.assertNotEqual(first[1]["result"], first[0]["result"])
+        second = [response for response in responses if response["id"] == 2]
+        expected = {"id": 2, "result": "[miuc](https://github.com/luzhixing12345/miuc)", "final": True}
+        self.assertEqual(second, [expected])
+
+    def test_provisional_off_reader(self):
+        server = Server(use_cache=False)
+        reader = threading.current_thread()
+        threads = []
+
+        def provisional_title(url, **kwargs):
+            threads.append(threading.current_thread())
+            return f"[guess]({url})", False
+
+        request = b'{"id": 1, "url": "https://www.zhihu.com/question/20399991", "progressive": true}'
+        responses = []
+        with unittest.mock.patch("miuc.server.provisional_title", provisional_title):
+            with unittest.mock.patch.dict(server.methods, parse=lambda request: "[title](url)"):
+                server.handle_line(request, responses.append).result()
+        server.shutdown()
+        self.assertNotIn(reader, threads)
+        self.assertEqual([response["final"] for response in responses], [False, True])
+
+
+class UnixSocketUnitTest(unittest.TestCase):
+    def test_keep_regular_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "miuc.sock")
+        with open(path, "w") as f:
+            f.write("not a socket")
+        with self.assertRaises(FileExistsError):
+            _remove_socket(path)
+        self.assertTrue(os.path.exists(path))
+        # a missing path is fine
+        os.remove(path)
+        _remove_socket(path)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "no unix domain sockets")
+    def test_remove_stale_socket(self):
+        path = os.path.join(tempfile.mkdtemp(), "miuc.sock")
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(path)
+        _remove_socket(path)
+        self.assertFalse(os.path.exists(path))
+
+
+class TracingUnitTest(unittest.TestCase):
+    def setUp(self):
+        host_breakers.reset()
+        negative_cache.clear()
+        tracing.metrics.reset()
+
+    tearDown = setUp
+
+    def test_phases(self):
+        url = "https://www.zhihu.com/question/21"
+        pages = {"/www.zhihu.com/question/21": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        traces = []
+        tracing.subscribe(traces.append)
+        try:
+            with FixtureServer(pages) as server:
+                miuc.parse_url(url, use_cache=False, session=server.session())
+            miuc.parse_url("http://localhost:2017/")
+        finally:
+            tracing.unsubscribe(traces.append)
+        self.assertEqual([trace.outcome for trace in traces], ["resolved", "unsupported"])
+        trace = traces[0].to_dict()
+        self.assertEqual(trace["processor"], "Zhihu")
+        self.assertEqual(list(trace["phases"]), ["dispatch", "wait", "request", "download", "parse", "process"])
+        (fetch,) = trace["fetches"]
+        self.assertEqual((fetch["host"], fetch["status"]), ("www.zhihu.com", 200))
+        self.assertEqual(fetch["bytes"], len(pages["/www.zhihu.com/question/21"]))
+        self.assertLessEqual(sum(trace["phases"].values()), trace["ms"] + 1)
+
+    def test_metrics(self):
+        url = "https://www.zhihu.com/question/22"
+        pages = {"/www.zhihu.com/question/22": 404}
+        with FixtureServer(pages) as server:
+            miuc.parse_url(url, use_cache=False, session=server.session())
+        miuc.parse_url("https://github.com/luzhixing12345/miuc", use_cache=False)
+        text = tracing.metrics.render()
+        self.assertIn('miuc_lookups_total{processor="Zhihu",outcome="failed"} 1', text)
+        self.assertIn('miuc_lookups_total{processor="Github",outcome="resolved"} 1', text)
+        self.assertIn('miuc_fetches_total{host="www.zhihu.com",status="404"} 1', text)
+        self.assertIn('miuc_lookup_seconds_bucket{processor="Github",le="+Inf"} 1', text)
+        self.assertIn('miuc_lookup_seconds_count{processor="Zhihu"} 1', text)
+
+    def test_progressive_counted_once(self):
+        url = "https://www.zhihu.com/question/23"
+        pages = {"/www.zhihu.com/question/23": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        with FixtureServer(pages) as server:
+            miuc.parse_url_progressive(url, lambda *args: None, use_cache=False, session=server.session())
+        text = tracing.metrics.render()
+        self.assertIn('miuc_lookups_total{processor="Zhihu",outcome="resolved"} 1', text)
+        self.assertIn('miuc_lookups_total{processor="Zhihu",outcome="provisional"} 1', text)
+        self.assertIn('miuc_lookup_seconds_count{processor="Zhihu"} 1', text)
+
+    def test_histogram(self):
+        histogram = tracing.Histogram()
+        for seconds in (0.01, 0.05, 0.3, 20):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.counts, [2, 0, 0, 1, 0, 0, 0, 0, 1])
+        self.assertEqual(histogram.count, 4)
+
+    def test_server(self):
+        server = Server(use_cache=False)
+        response = server.handle({"id": 1, "url": "https://github.com/luzhixing12345/miuc", "trace": True})
+        self.assertEqual(response["trace"]["processor"], "Github")
+        self.assertEqual(response["trace"]["outcome"], "resolved")
+        response = server.handle({"id": 2, "method": "metrics"})
+        self.assertIn('miuc_lookups_total{processor="Github",outcome="resolved"} 1', response["result"])
+        server.shutdown()
+
+
+class SharedProcessorUnitTest(unittest.TestCase):
+    def setUp(self):
+        host_breakers.reset()
+
+    def test_threads(self):
+        processor = Github.shared()
+        self.assertIs(Github.shared(), processor)
+        urls = [f"https://github.com/user{i}/repo{i}" for i in range(200)]
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(processor, urls))
+        self.assertEqual(results, [f"[repo{i}]({url})" for i, url in enumerate(urls)])
+        # nothing of the lookups is left on the processor
+        self.assertIsNone(processor.repo_name)
+        self.assertNotIn("repo_name", processor.__dict__)
+
+    def test_interleaved_fetches(self):
+        title = b"<h1 class='QuestionHeader-title'>%s</h1>"
+        pages = {
+            # the first lookup is still reading its page when the second one parses
+            "/www.zhihu.com/question/31": [b"<html>", b"<!-- -->", title % b"slow question"],
+            "/www.zhihu.com/question/32": title % b"fast question",
+        }
+        processor = Zhihu.shared()
+        with FixtureServer(pages) as server:
+            session = server.session()
+            with ThreadPoolExecutor(2) as executor:
+                slow = executor.submit(processor, "https://www.zhihu.com/question/31", session=session)
+                time.sleep(DRIP_DELAY / 2)
+                fast = executor.submit(processor, "https://www.zhihu.com/question/32", session=session)
+                self.assertEqual(fast.result(), "[fast question](https://www.zhihu.com/question/32)")
+                self.assertEqual(slow.result(), "[slow question](https://www.zhihu.com/question/31)")
+
+    def test_context_fields(self):
+        self.assertEqual(set(Github.Context.fields) - set(Processor.Context.fields), set(Github.Context.__slots__))
+        context = Github.Context(Github.shared(), "https://github.com/a/b")
+        with self.assertRaises(AttributeError):
+            context.not_a_field = 1
+
+
+class RevalidateUnitTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = TitleCache(":memory:")
+        patcher = unittest.mock.patch("miuc.cache._cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        negative_cache.clear()
+
+    def test_refresh(self):
+        url = "https://example.com/post"
+        pages = {"/example.com/post": b"<title>First Title</title>"}
+        with FixtureServer(pages) as server:
+            server.etags["/example.com/post"] = '"v1"'
+            session = server.session()
+            self.assertEqual(miuc.parse_url(url, session=session, generic=True), f"[First Title]({url})")
+            self.assertEqual(self.cache.get_validators(url), Validators(url, '"v1"', None))
+            # an unchanged page answers 304, the title is kept
+            self.assertEqual(refresh_cache(0, session=session), {"not modified": 1, "updated": 0, "failed": 0})
+            self.assertEqual(server.requests[-1][2].get("If-None-Match"), '"v1"')
+            server.etags["/example.com/post"] = '"v2"'
+            pages["/example.com/post"] = b"<title>Second Title</title>"
+            self.assertEqual(refresh_cache(0, session=session), {"not modified": 0, "updated": 1, "failed": 0})
+            self.assertEqual(self.cache.get(url), f"[Second Title]({url})")
+            self.assertEqual(self.cache.get_validators(url).etag, '"v2"')
+            # nothing is older than an hour
+            self.assertEqual(refresh_cache(3600, session=session), {"not modified": 0, "updated": 0, "failed": 0})
+
+    def test_migrate(self):
+        import sqlite3
+
+        path = os.path.join(tempfile.mkdtemp(), "titles.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE titles (url TEXT PRIMARY KEY, title TEXT, target TEXT, site TEXT, "
+            "created REAL, expires REAL, accessed REAL)"
+        )
+        conn.commit()
+        conn.close()
+        cache = TitleCache(path)
+        url = "https://example.com/post"
+        cache.set(url, f"[A Post]({url})", validators=Validators(url, None, "Tue, 20 Jun 2023 00:00:00 GMT"))
+        self.assertEqual(cache.get_validators(url).last_modified, "Tue, 20 Jun 2023 00:00:00 GMT")
+        cache.close()
+
+    def test_parse_age(self):
+        self.assertEqual(parse_age("90"), 90)
+        self.assertEqual(parse_age("30m"), 1800)
+        self.assertEqual(parse_age("7d"), 7 * 24 * 3600)
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_age("soon")
+
+
+class DocumentPrefetchUnitTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = TitleCache(":memory:")
+        patcher = unittest.mock.patch("miuc.cache._cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        negative_cache.clear()
+
+    def test_document_urls(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "a.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("https://www.zhihu.com/question/1 and `https://example.com/code`\n")
+        with open(os.path.join(directory, "b.md"), "w", encoding="utf-8") as f:
+            f.write("[https://www.zhihu.com/question/2](https://www.zhihu.com/question/2)\n")
+        with open(os.path.join(directory, "c.txt"), "w", encoding="utf-8") as f:
+            f.write("https://www.zhihu.com/question/3\n")
+        self.assertEqual(document_urls(path), ["https://www.zhihu.com/question/1"])
+        self.assertEqual(
+            document_urls(path, siblings=True), ["https://www.zhihu.com/question/1", "https://www.zhihu.com/question/2"]
+        )
+        text = "see https://en.wikipedia.org/wiki/GCC\n```\nhttps://example.com/fenced\n```\n"
+        self.assertEqual(document_urls(text=text), ["https://en.wikipedia.org/wiki/GCC"])
+
+    def test_background(self):
+        pages = {
+            "/www.zhihu.com/question/1": b"<h1 class='QuestionHeader-title'>first question</h1>",
+            "/www.zhihu.com/question/2": b"<h1 class='QuestionHeader-title'>second question</h1>",
+        }
+        urls = [
+            "https://www.zhihu.com/question/1",
+            "https://en.wikipedia.org/wiki/GCC",
+            "https://www.zhihu.com/question/2",
+        ]
+        with FixtureServer(pages) as server:
+            prefetcher = BackgroundPrefetcher(max_workers=1, session=server.session())
+            self.addCleanup(prefetcher.close)
+            # the wikipedia title is read from the url, only the zhihu pages are fetched
+            with prefetcher.interactive():
+                self.assertEqual(prefetcher.submit(urls + urls), 2)
+                time.sleep(0.3)
+                self.assertEqual(server.requests, [])
+                self.assertEqual(prefetcher.pending(), 2)
+            self.assertTrue(prefetcher.join(5))
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(self.cache.get(urls[0]), f"[first question]({urls[0]})")
+            self.assertEqual(prefetcher.submit(urls), 0)
+            self.assertEqual(miuc.parse_url(urls[2], session=server.session()), f"[second question]({urls[2]})")
+            self.assertEqual(len(server.requests), 2)
+
+    def test_server(self):
+        pages = {"/www.zhihu.com/question/1": b"<h1 class='QuestionHeader-title'>zhihu question</h1>"}
+        with FixtureServer(pages) as server, unittest.mock.patch("miuc.session._session", server.session()):
+            miuc_server = Server()
+            text = "https://www.zhihu.com/question/1\n"
+            response = miuc_server.handle({"id": 1, "method": "prefetch", "text": text})
+            self.assertEqual(response["result"], {"queued": 1})
+            self.assertTrue(miuc_server.prefetcher.join(5))
+            self.assertEqual(miuc_server.handle({"id": 2, "method": "stats"})["result"]["prefetch"]["resolved"], 1)
+            miuc_server.shutdown()
+        offline = Server(offline=True)
+        self.assertEqual(offline.handle({"id": 1, "method": "prefetch", "text": text})["result"], {"queued": 0})
+        offline.shutdown()
+
+
+PLUGIN_MANIFEST = """
+SITES = {r"^https://plugin\\.example/.*": "fixture_plugin_processor:Example"}
+"""
+
+PLUGIN_PROCESSOR = """
+from miuc.site_processor import Processor, url_only
+
+
+class Example(Processor):
+    class Context(Processor.Context):
+        __slots__ = ("name",)
+
+    def __init__(self, max_time_limit=5, session=None):
+        super().__init__(max_time_limit, session)
+        self.urls_re = [url_only(r"^https://plugin\\.example/(?P<name>[^/]+)$")]
+
+    def parse(self, res):
+        self.name = res.group("name")
+
+    def format(self):
+        return self.name
+"""
+
+
+class SitePluginUnitTest(unittest.TestCase):
+    def run_probe(self, code: str, path: str = None) -> list:
+        env = dict(os.environ)
+        cwd = os.path.dirname(os.path.abspath(__file__))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [cwd, path]))
+        output = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True, stdout=subprocess.PIPE)
+        return output.stdout.decode().splitlines()
+
+    def test_lazy_sites(self):
+        code = (
+            "import sys\n"
+            "from miuc import parse_url\n"
+            "print(parse_url('https://en.wikipedia.org/wiki/GCC', use_cache=False))\n"
+            "print(' '.join(sorted(m for m in sys.modules if m.startswith('miuc.sites.'))))\n"
+            "print('importlib.metadata' in sys.modules)\n"
+        )
+        # only the processor of the host is imported, the plugins are not looked for
+        self.assertEqual(self.run_probe(code), ["[GCC](https://en.wikipedia.org/wiki/GCC)", "miuc.sites.wiki", "False"])
+
+    def test_entry_point(self):
+        path = tempfile.mkdtemp()
+        with open(os.path.join(path, "fixture_plugin.py"), "w", encoding="utf-8") as f:
+            f.write(PLUGIN_MANIFEST)
+        with open(os.path.join(path, "fixture_plugin_processor.py"), "w", encoding="utf-8") as f:
+            f.write(PLUGIN_PROCESSOR)
+        os.makedirs(os.path.join(path, "fixture_plugin-1.0.dist-info"))
+        with open(os.path.join(path, "fixture_plugin-1.0.dist-info", "METADATA"), "w", encoding="utf-8") as f:
+            f.write("Metadata-Version: 2.1\nName: fixture-plugin\nVersion: 1.0\n")
+        with open(os.path.join(path, "fixture_plugin-1.0.dist-info", "entry_points.txt"), "w", encoding="utf-8") as f:
+            f.write("[miuc.sites]\nfixture = fixture_plugin:SITES\nbroken = fixture_plugin_missing:SITES\n")
+        code = (
+            "import sys\n"
+            "from miuc import parse_url\n"
+            "parse_url('https://en.wikipedia.org/wiki/GCC', use_cache=False)\n"
+            "print('fixture_plugin' in sys.modules)\n"
+            "print(parse_url('https://plugin.example/hello', use_cache=False))\n"
+            "print(parse_url('https://github.com/luzhixing12345/miuc', use_cache=False))\n"
+        )
+        lines = self.run_probe(code, path)
+        self.assertEqual(
+            lines,
+            ["False", "[hello](https://plugin.example/hello)", "[miuc](https://github.com/luzhixing12345/miuc)"],
+        )
+
+    def test_load(self):
+        self.assertIs(load_site("Wiki"), Wiki)
+        self.assertIs(load_site("miuc.sites.wiki:Wiki"), Wiki)
+        with self.assertRaises(ValueError):
+            load_site("NoSuchSite")
+        with self.assertRaises(AttributeError):
+            miuc.site_processor.NoSuchSite
+
+
 if __name__ == "__main__":
     unittest.main()